@@ -0,0 +1,298 @@
+import time
+from langchain_core.messages import AIMessage, HumanMessage
+from agents.instrumentation import get_default_tracer, usage_from_message
+from agents.llm_backend import get_default_backend
+from agents.llm_cache import NullCache, get_default_cache, make_cache_key
+from agents.model_router import get_default_router
+from agents.output_parsing import OutputParseError, parse_structured
+from agents.prompt_compaction import compact_payloads, count_tokens, truncate
+from agents.rate_limit import get_default_guard
+
+REPAIR_PROMPT = """Your previous reply could not be used: {error}
+
+Reply again with ONLY the corrected JSON object, no prose or markdown."""
+
+def _prompt_tokens(messages):
+    return sum(count_tokens(message.content) for message in messages)
+
+def _step_config(step):
+    # Tags the call with its step for callbacks and the offline backends
+    return {"metadata": {"step": step}}
+
+def _total_tokens(message):
+    return sum(count or 0 for count in usage_from_message(message))
+
+class LowConfidenceOutput(Exception):
+    """Valid output rejected by a step's acceptance check; the next tier is tried"""
+
+class BaseAgent:
+    """Shared LLM plumbing for the consultant agents
+
+    Every model call goes through the response cache and the tracer, tagged
+    with the calling step name (usually the public agent method). The model
+    router picks the model tier per step, and the provider guard applies
+    rate limits, retries and request coalescing shared by all agents.
+    """
+    temperature = 0.1
+    # Use the provider's JSON mode for structured calls
+    json_mode = True
+    # Extra round-trips allowed to fix output that fails schema validation
+    max_repair_attempts = 2
+    # Steps whose prompt payloads are clipped (long strings/lists) when compacted.
+    # Opt-in: clipping drops content, so only steps that tolerate it are listed.
+    summarize_steps = frozenset()
+
+    def __init__(self, api_key, cache=None, tracer=None, router=None, guard=None, backend=None):
+        self.api_key = api_key
+        self.backend = backend if backend is not None else get_default_backend()
+        self.tracer = tracer if tracer is not None else get_default_tracer()
+        self.router = router if router is not None else get_default_router()
+        self.guard = guard if guard is not None else get_default_guard()
+        if cache is None:
+            # Simulated responses must not land in the shared cache, and recording must see every call
+            cache = get_default_cache() if self.backend.use_cache else NullCache()
+        self.cache = cache
+        # Model name -> chat client, built on first use of each tier
+        self.llms = {}
+
+    def _llm(self, model):
+        if model not in self.llms:
+            self.llms[model] = self.backend.chat_model(model, self.temperature, self.api_key)
+        return self.llms[model]
+
+    def _payload(self, step, **payloads):
+        """Compact JSON prompt inputs for this step and record the token savings"""
+        inputs, report = compact_payloads(step, payloads, truncate if step in self.summarize_steps else None)
+        self.tracer.record_compaction(report)
+        return inputs
+
+    def _lookup(self, messages, step, tier, trace=True):
+        """Return (cache_key, cached_text_or_None) for the tier's model, tracing cache hits unless trace is false"""
+        key = make_cache_key(self.router.model(tier), self.temperature, messages)
+        cached = self.cache.get(key)
+        if cached is not None and trace:
+            self._trace_hit(step, tier, key)
+        return key, cached
+
+    def _trace_hit(self, step, tier, key):
+        self.tracer.record_cache_hit(step, self.router.model(tier), key[:12], tier=tier)
+
+    def _call(self, llm, messages, step, key, tier, **attributes):
+        model = self.router.model(tier)
+        with self.tracer.span(step, model, key[:12], tier=tier, **attributes) as record:
+            message, shared = self.guard.call(
+                model, lambda: llm.invoke(messages, config=_step_config(step)), prompt_tokens=_prompt_tokens(messages),
+                key=make_cache_key(model, self.temperature, messages), usage=_total_tokens
+            )
+            self._record_usage(record, message, shared)
+        return message.content
+
+    async def _acall(self, llm, messages, step, key, tier, **attributes):
+        model = self.router.model(tier)
+        with self.tracer.span(step, model, key[:12], tier=tier, **attributes) as record:
+            message, shared = await self.guard.acall(
+                model, lambda: llm.ainvoke(messages, config=_step_config(step)), prompt_tokens=_prompt_tokens(messages),
+                key=make_cache_key(model, self.temperature, messages), usage=_total_tokens
+            )
+            self._record_usage(record, message, shared)
+        return message.content
+
+    def _record_usage(self, record, message, shared):
+        if shared:
+            # Served by an identical call already in flight; its own record carries the tokens
+            record["cache"] = "coalesced"
+            record["prompt_tokens"] = record["completion_tokens"] = 0
+        else:
+            record["prompt_tokens"], record["completion_tokens"] = usage_from_message(message)
+
+    def _invoke(self, prompt, inputs, step):
+        """Render the prompt and return the model's text, served from cache when possible"""
+        messages = prompt.format_messages(**inputs)
+        tier = self.router.tier(step)
+        key, cached = self._lookup(messages, step, tier)
+        if cached is not None:
+            return cached
+
+        content = self._call(self._llm(self.router.model(tier)), messages, step, key, tier)
+        self.cache.set(key, content)
+        return content
+
+    async def _ainvoke(self, prompt, inputs, step):
+        """Async variant of _invoke"""
+        messages = prompt.format_messages(**inputs)
+        tier = self.router.tier(step)
+        key, cached = self._lookup(messages, step, tier)
+        if cached is not None:
+            return cached
+
+        content = await self._acall(self._llm(self.router.model(tier)), messages, step, key, tier)
+        self.cache.set(key, content)
+        return content
+
+    def _structured_llm(self, tier):
+        llm = self._llm(self.router.model(tier))
+        if self.json_mode:
+            return llm.bind(response_format={"type": "json_object"})
+        return llm
+
+    def _repair_messages(self, messages, content, error):
+        return messages + [
+            AIMessage(content=content),
+            HumanMessage(content=REPAIR_PROMPT.format(error=error))
+        ]
+
+    def _cached_structured(self, messages, schema, step, tier):
+        # Only a cached entry that still parses counts as a hit; otherwise the model is called
+        key, cached = self._lookup(messages, step, tier, trace=False)
+        if cached is not None:
+            try:
+                result = parse_structured(cached, schema)
+            except OutputParseError:
+                return key, None
+            self._trace_hit(step, tier, key)
+            return key, result
+        return key, None
+
+    def _cached_cascade(self, messages, schema, step, tiers):
+        """Cache key per tier and the first cached result along the cascade, if any"""
+        keys = {}
+        for tier in tiers:
+            keys[tier], result = self._cached_structured(messages, schema, step, tier)
+            if result is not None:
+                return keys, result
+        return keys, None
+
+    def _invoke_structured(self, prompt, inputs, schema, step, accept=None):
+        """Invoke in JSON mode and return a dict validated against schema
+
+        Tiers from the router's cascade are tried in order: a cheaper tier
+        escalates to the next on invalid output, or when accept(result) is
+        false, without spending repair round-trips. On the last tier invalid
+        output is sent back to the model for repair up to max_repair_attempts
+        times. Only accepted output is cached. Raises OutputParseError
+        (carrying the last raw output) when repair fails.
+        """
+        messages = prompt.format_messages(**inputs)
+        tiers = self.router.cascade_tiers(step)
+        keys, result = self._cached_cascade(messages, schema, step, tiers)
+        if result is not None:
+            return result
+
+        for position, tier in enumerate(tiers):
+            last = position == len(tiers) - 1
+            try:
+                return self._structured_attempt(
+                    messages, schema, step, tier, keys[tier], last, None if last else accept, escalated=position > 0
+                )
+            except (OutputParseError, LowConfidenceOutput):
+                if last:
+                    raise
+
+    def _structured_attempt(self, messages, schema, step, tier, key, last, accept, escalated=False):
+        llm = self._structured_llm(tier)
+        # Calls made after a cheaper tier was rejected are tagged for the tier report
+        attributes = {"escalated": True} if escalated else {}
+        content = self._call(llm, messages, step, key, tier, **attributes)
+        repair_attempts = self.max_repair_attempts if last else 0
+        for attempt in range(repair_attempts + 1):
+            try:
+                result = parse_structured(content, schema)
+            except OutputParseError as e:
+                if attempt == repair_attempts:
+                    raise
+                repair = self._repair_messages(messages, content, e)
+                content = self._call(llm, repair, step, key, tier, repair_attempt=attempt + 1, **attributes)
+            else:
+                break
+        if accept is not None and not accept(result):
+            raise LowConfidenceOutput(step)
+        self.cache.set(key, content)
+        return result
+
+    async def _ainvoke_structured(self, prompt, inputs, schema, step, accept=None):
+        """Async variant of _invoke_structured"""
+        messages = prompt.format_messages(**inputs)
+        tiers = self.router.cascade_tiers(step)
+        keys, result = self._cached_cascade(messages, schema, step, tiers)
+        if result is not None:
+            return result
+
+        for position, tier in enumerate(tiers):
+            last = position == len(tiers) - 1
+            try:
+                return await self._astructured_attempt(
+                    messages, schema, step, tier, keys[tier], last, None if last else accept, escalated=position > 0
+                )
+            except (OutputParseError, LowConfidenceOutput):
+                if last:
+                    raise
+
+    async def _astructured_attempt(self, messages, schema, step, tier, key, last, accept, escalated=False):
+        llm = self._structured_llm(tier)
+        attributes = {"escalated": True} if escalated else {}
+        content = await self._acall(llm, messages, step, key, tier, **attributes)
+        repair_attempts = self.max_repair_attempts if last else 0
+        for attempt in range(repair_attempts + 1):
+            try:
+                result = parse_structured(content, schema)
+            except OutputParseError as e:
+                if attempt == repair_attempts:
+                    raise
+                repair = self._repair_messages(messages, content, e)
+                content = await self._acall(llm, repair, step, key, tier, repair_attempt=attempt + 1, **attributes)
+            else:
+                break
+        if accept is not None and not accept(result):
+            raise LowConfidenceOutput(step)
+        self.cache.set(key, content)
+        return result
+
+    def _stream(self, prompt, inputs, step):
+        """Yield the model's text in chunks as it is generated, caching the full response"""
+        messages = prompt.format_messages(**inputs)
+        tier = self.router.tier(step)
+        key, cached = self._lookup(messages, step, tier)
+        if cached is not None:
+            yield cached
+            return
+
+        chunks = []
+        started = time.perf_counter()
+        model = self.router.model(tier)
+        with self.tracer.span(step, model, key[:12], tier=tier, streamed=True) as record:
+            chunk_stream = self.guard.stream(
+                model, lambda: self._llm(model).stream(messages, config=_step_config(step)), prompt_tokens=_prompt_tokens(messages)
+            )
+            for chunk in chunk_stream:
+                if not chunks:
+                    record["first_token_ms"] = round((time.perf_counter() - started) * 1000, 1)
+                if chunk.usage_metadata:
+                    record["prompt_tokens"], record["completion_tokens"] = usage_from_message(chunk)
+                chunks.append(chunk.content)
+                yield chunk.content
+        self.cache.set(key, "".join(chunks))
+
+    async def _astream(self, prompt, inputs, step):
+        """Async variant of _stream"""
+        messages = prompt.format_messages(**inputs)
+        tier = self.router.tier(step)
+        key, cached = self._lookup(messages, step, tier)
+        if cached is not None:
+            yield cached
+            return
+
+        chunks = []
+        started = time.perf_counter()
+        model = self.router.model(tier)
+        with self.tracer.span(step, model, key[:12], tier=tier, streamed=True) as record:
+            chunk_stream = self.guard.astream(
+                model, lambda: self._llm(model).astream(messages, config=_step_config(step)), prompt_tokens=_prompt_tokens(messages)
+            )
+            async for chunk in chunk_stream:
+                if not chunks:
+                    record["first_token_ms"] = round((time.perf_counter() - started) * 1000, 1)
+                if chunk.usage_metadata:
+                    record["prompt_tokens"], record["completion_tokens"] = usage_from_message(chunk)
+                chunks.append(chunk.content)
+                yield chunk.content
+        self.cache.set(key, "".join(chunks))
@@ -0,0 +1,43 @@
+import asyncio
+import threading
+import httpx
+
+# Connection limits for the pool shared by every agent and Streamlit session
+POOL_LIMITS = httpx.Limits(max_connections=100, max_keepalive_connections=20, keepalive_expiry=60)
+
+_lock = threading.Lock()
+_http_client = None
+_http_async_client = None
+_loop = None
+
+def get_http_client():
+    """Process-wide sync HTTP client so agents reuse sockets and TLS sessions"""
+    global _http_client
+    with _lock:
+        if _http_client is None:
+            _http_client = httpx.Client(limits=POOL_LIMITS)
+        return _http_client
+
+def get_http_async_client():
+    """Process-wide async HTTP client, bound to the background event loop"""
+    global _http_async_client
+    with _lock:
+        if _http_async_client is None:
+            _http_async_client = httpx.AsyncClient(limits=POOL_LIMITS)
+        return _http_async_client
+
+def _get_loop():
+    global _loop
+    with _lock:
+        if _loop is None:
+            _loop = asyncio.new_event_loop()
+            threading.Thread(target=_loop.run_forever, name="agents-event-loop", daemon=True).start()
+        return _loop
+
+def run_sync(coro):
+    """Run a coroutine on the shared background loop and block for its result
+
+    asyncio.run() would create a fresh loop per call, which strands pooled
+    async connections that belong to the previous loop.
+    """
+    return asyncio.run_coroutine_threadsafe(coro, _get_loop()).result()
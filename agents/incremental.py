@@ -0,0 +1,125 @@
+import hashlib
+
+from agents.prompt_compaction import dedupe_requirements, drop_keys_for, prune, to_prompt_json
+
+# Sections of the structured requirements (StructuredRequirements fields)
+REQUIREMENT_SECTIONS = (
+    "primary_use_case", "business_objectives", "technical_requirements", "compliance_requirements",
+    "stakeholder_concerns", "budget_and_timeline", "success_criteria"
+)
+
+# Sentinel: the field can change any section, so the whole form is re-analyzed
+ALL_SECTIONS = "*"
+
+# Step 1 form field ("group.field" in detailed_requirements) -> requirement sections it feeds
+FIELD_SECTIONS = {
+    "organization.company_size": ("technical_requirements", "stakeholder_concerns"),
+    "organization.team_size": ("technical_requirements",),
+    "organization.country": ("compliance_requirements",),
+    "organization.industry": ("compliance_requirements", "stakeholder_concerns"),
+    "requirements.description": ALL_SECTIONS,
+    "requirements.use_case": ("primary_use_case", "business_objectives"),
+    "requirements.integrations": ("technical_requirements",),
+    "requirements.compliance": ("compliance_requirements",),
+    "requirements.priority": ("budget_and_timeline",),
+    "budget_timeline.budget_range": ("budget_and_timeline",),
+    "budget_timeline.max_time_to_decision": ("budget_and_timeline",),
+    "budget_timeline.deployment_preference": ("technical_requirements",),
+    "budget_timeline.support_level": ("technical_requirements",),
+    "additional_context.pain_points": ("business_objectives", "stakeholder_concerns"),
+    "additional_context.success_criteria": ("success_criteria",),
+}
+
+# Session artifact -> (agent step that reads its inputs, artifacts it is built from),
+# in dependency order. Mirrors build_consultant_workflow; final_report holds the
+# recommendation and its confidence score.
+ARTIFACT_INPUTS = {
+    "requirements": (None, ()),
+    "rfp": ("generate_rfp", ("requirements",)),
+    "vendors": ("match_vendors", ("requirements",)),
+    "poc_rubric": ("create_poc_rubric", ("requirements", "vendors")),
+    "evaluations": ("simulate_poc_evaluation", ("poc_rubric", "vendors")),
+    "final_report": ("generate_final_recommendation", ("requirements", "vendors", "poc_rubric", "evaluations")),
+}
+
+def diff_fields(old, new):
+    """Sorted "group.field" paths whose values differ between two step 1 form dicts"""
+    changed = []
+    for group in sorted(set(old or {}) | set(new or {})):
+        old_group, new_group = (old or {}).get(group) or {}, (new or {}).get(group) or {}
+        for field in sorted(set(old_group) | set(new_group)):
+            if old_group.get(field) != new_group.get(field):
+                changed.append(f"{group}.{field}")
+    return changed
+
+def changed_sections(previous_input, detailed_input, previous_requirements=None):
+    """Requirement sections to re-extract after a form edit, or None to re-analyze everything
+
+    An empty list means nothing that feeds the requirements changed.
+    """
+    if previous_input is None or "parse_error" in (previous_requirements or {}):
+        return None
+    sections = set()
+    for path in diff_fields(previous_input, detailed_input):
+        fed = FIELD_SECTIONS.get(path, ALL_SECTIONS)
+        if fed == ALL_SECTIONS:
+            return None
+        sections.update(fed)
+    if len(sections) == len(REQUIREMENT_SECTIONS):
+        # A targeted update of every section costs as much as a fresh analysis
+        return None
+    return [section for section in REQUIREMENT_SECTIONS if section in sections]
+
+def merge_requirements(previous, update, sections, detailed_input=None):
+    """Previous structured requirements with the re-extracted sections swapped in"""
+    merged = {**previous, **{section: update[section] for section in sections}}
+    if detailed_input is not None:
+        merged["detailed_input"] = detailed_input
+    return merged
+
+def input_fingerprint(step, value, name=None):
+    """Hash of value (the artifact called name) as the step's prompt sees it
+
+    Fields the step never receives (the raw form copy, display-only keys,
+    the keys drop_keys_for removes) do not count as changes.
+    """
+    view = prune(dedupe_requirements(value), drop_keys_for(step, name))
+    return hashlib.sha1(to_prompt_json(view).encode("utf-8")).hexdigest()
+
+def input_fingerprints(artifact, values):
+    """{input artifact: fingerprint} for the inputs artifact would be built from now"""
+    step, inputs = ARTIFACT_INPUTS[artifact]
+    return {name: input_fingerprint(step, values.get(name), name) for name in inputs}
+
+def check_artifacts(values, recorded):
+    """(stale, pending) artifact names given current values and their recorded input fingerprints
+
+    Stale artifacts were built from inputs that have since changed and must
+    be recomputed. Pending ones have an input that is missing (e.g. stale and
+    cleared); they are kept, and become usable again if the input is rebuilt
+    with the same content. An artifact with no recorded fingerprints (saved
+    by a background job, or by an older version) is unknown, not stale.
+    """
+    stale, pending = [], []
+    for artifact, (_, inputs) in ARTIFACT_INPUTS.items():
+        if values.get(artifact) is None or not inputs:
+            continue
+        if any(values.get(name) is None or name in stale or name in pending for name in inputs):
+            pending.append(artifact)
+        elif artifact in recorded and recorded[artifact] != input_fingerprints(artifact, values):
+            stale.append(artifact)
+    return stale, pending
+
+def backfill_fingerprints(values, recorded):
+    """recorded plus fingerprints for present artifacts that have none
+
+    Used when a saved run is loaded: its artifacts were built from the
+    values saved with them, so later edits can be compared against those.
+    """
+    recorded = dict(recorded or {})
+    for artifact, (_, inputs) in ARTIFACT_INPUTS.items():
+        if artifact not in recorded and values.get(artifact) is not None and all(
+            values.get(name) is not None for name in inputs
+        ):
+            recorded[artifact] = input_fingerprints(artifact, values)
+    return recorded
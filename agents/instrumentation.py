@@ -0,0 +1,175 @@
+import json
+import os
+import statistics
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+
+from agents.model_router import estimate_cost
+
+def usage_from_message(message):
+    """(prompt_tokens, completion_tokens) reported by the provider, if any"""
+    usage = getattr(message, "usage_metadata", None)
+    if usage:
+        return usage.get("input_tokens"), usage.get("output_tokens")
+    token_usage = (getattr(message, "response_metadata", None) or {}).get("token_usage") or {}
+    return token_usage.get("prompt_tokens"), token_usage.get("completion_tokens")
+
+def _load_otel_tracer():
+    try:
+        from opentelemetry import trace
+    except ImportError:
+        return None
+    return trace.get_tracer("saasitis.agents")
+
+class Tracer:
+    """Records one entry per LLM call (or cache hit) with tokens, latency and step
+
+    Records are kept in a bounded in-memory buffer for the UI, optionally
+    appended to a JSON-lines trace file, and optionally mirrored as
+    OpenTelemetry spans when the opentelemetry API is installed.
+    """
+
+    def __init__(self, trace_path=None, max_records=2000, otel=False):
+        self.trace_path = trace_path
+        if trace_path and os.path.dirname(trace_path):
+            os.makedirs(os.path.dirname(trace_path), exist_ok=True)
+        self._records = deque(maxlen=max_records)
+        self._compaction = {}
+        self._lock = threading.Lock()
+        self._otel = _load_otel_tracer() if otel else None
+
+    @contextmanager
+    def span(self, step, model, prompt_key=None, **attributes):
+        """Time one LLM call; the yielded record can be filled in by the caller"""
+        record = {
+            "timestamp": time.time(),
+            "step": step,
+            "model": model,
+            "prompt_key": prompt_key,
+            "cache": "miss",
+            "prompt_tokens": None,
+            "completion_tokens": None,
+            "status": "ok",
+            **attributes
+        }
+        otel_span = self._otel.start_span(f"llm.{step}") if self._otel else None
+        started = time.perf_counter()
+        try:
+            yield record
+        except BaseException as e:
+            record["status"] = "error" if isinstance(e, Exception) else "cancelled"
+            record["error"] = repr(e)
+            raise
+        finally:
+            record["wall_ms"] = round((time.perf_counter() - started) * 1000, 1)
+            record["cost_usd"] = estimate_cost(model, record["prompt_tokens"], record["completion_tokens"])
+            if otel_span is not None:
+                for name, value in record.items():
+                    if value is not None:
+                        otel_span.set_attribute(f"llm.{name}", value)
+                otel_span.end()
+            self._emit(record)
+
+    def record_cache_hit(self, step, model, prompt_key=None, **attributes):
+        with self.span(step, model, prompt_key, **attributes) as record:
+            record["cache"] = "hit"
+            record["prompt_tokens"] = 0
+            record["completion_tokens"] = 0
+
+    def record_compaction(self, report):
+        """Keep the latest prompt compaction report per step"""
+        with self._lock:
+            self._compaction[report["step"]] = report
+
+    def compaction_reports(self):
+        with self._lock:
+            return list(self._compaction.values())
+
+    def _emit(self, record):
+        with self._lock:
+            self._records.append(record)
+            if self.trace_path:
+                with open(self.trace_path, "a", encoding="utf-8") as f:
+                    f.write(json.dumps(record, default=str) + "\n")
+
+    def records(self):
+        with self._lock:
+            return list(self._records)
+
+    def clear(self):
+        with self._lock:
+            self._records.clear()
+            self._compaction.clear()
+
+    def summary(self):
+        """Per-step aggregates: call counts, cache hits, latency and token totals"""
+        by_step = {}
+        for record in self.records():
+            by_step.setdefault(record["step"], []).append(record)
+
+        rows = []
+        for step, records in by_step.items():
+            # Cache hits and coalesced duplicates were served without a call of their own
+            calls = [r for r in records if r["cache"] == "miss"]
+            wall = [r["wall_ms"] for r in calls] or [0.0]
+            rows.append({
+                "step": step,
+                "llm_calls": len(calls),
+                "cache_hits": len(records) - len(calls),
+                "errors": sum(1 for r in records if r["status"] != "ok"),
+                "p50_ms": round(statistics.median(wall), 1),
+                "max_ms": max(wall),
+                "prompt_tokens": sum(r["prompt_tokens"] or 0 for r in records),
+                "completion_tokens": sum(r["completion_tokens"] or 0 for r in records)
+            })
+        return sorted(rows, key=lambda row: row["prompt_tokens"] + row["completion_tokens"], reverse=True)
+
+    def tier_summary(self):
+        """Per model tier: calls, escalations, latency, tokens and estimated cost"""
+        by_tier = {}
+        for record in self.records():
+            if record["cache"] == "miss":
+                by_tier.setdefault((record.get("tier") or "-", record["model"]), []).append(record)
+
+        rows = []
+        for (tier, model), records in by_tier.items():
+            wall = [r["wall_ms"] for r in records]
+            costs = [r.get("cost_usd") for r in records]
+            rows.append({
+                "tier": tier,
+                "model": model,
+                "llm_calls": len(records),
+                "escalated_calls": sum(1 for r in records if r.get("escalated")),
+                "p50_ms": round(statistics.median(wall), 1),
+                "p95_ms": round(_percentile(wall, 95), 1),
+                "prompt_tokens": sum(r["prompt_tokens"] or 0 for r in records),
+                "completion_tokens": sum(r["completion_tokens"] or 0 for r in records),
+                "cost_usd": None if None in costs else round(sum(costs), 4)
+            })
+        return sorted(rows, key=lambda row: (row["tier"], row["model"]))
+
+def _percentile(values, percent):
+    """Nearest-rank percentile of a non-empty list"""
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, max(0, -(-percent * len(ordered) // 100) - 1))]
+
+_default_tracer = None
+_default_tracer_lock = threading.Lock()
+
+def get_default_tracer():
+    """Process-wide tracer configured by SAASITIS_TRACE_FILE and SAASITIS_OTEL"""
+    global _default_tracer
+    with _default_tracer_lock:
+        if _default_tracer is None:
+            _default_tracer = Tracer(
+                trace_path=os.getenv("SAASITIS_TRACE_FILE") or None,
+                otel=os.getenv("SAASITIS_OTEL", "").lower() in ("1", "true", "yes")
+            )
+        return _default_tracer
+
+def set_default_tracer(tracer):
+    global _default_tracer
+    with _default_tracer_lock:
+        _default_tracer = tracer
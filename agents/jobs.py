@@ -0,0 +1,160 @@
+import os
+import threading
+import time
+import uuid
+from collections import OrderedDict
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+
+QUEUED = "queued"
+RUNNING = "running"
+DONE = "done"
+FAILED = "failed"
+CANCELLED = "cancelled"
+FINISHED = (DONE, FAILED, CANCELLED)
+
+class JobCancelled(Exception):
+    """Raised inside a job function once cancellation has been requested"""
+
+class Job:
+    """State of one queued unit of work, updated by the worker and read by the UI"""
+
+    def __init__(self, name):
+        self.id = uuid.uuid4().hex[:12]
+        self.name = name
+        self.status = QUEUED
+        self.progress = 0.0
+        self.message = "Queued"
+        # Partial output published while running, e.g. streamed report text
+        self.partial = None
+        self.result = None
+        self.error = None
+        self.created_at = time.time()
+        self.started_at = None
+        self.finished_at = None
+        self.future = None
+        self._cancel = threading.Event()
+
+    @property
+    def finished(self):
+        return self.status in FINISHED
+
+    @property
+    def cancel_requested(self):
+        return self._cancel.is_set()
+
+    def set_progress(self, progress, message=None):
+        self.progress = max(0.0, min(1.0, progress))
+        if message is not None:
+            self.message = message
+
+    def check_cancelled(self):
+        """Call between units of work; raises JobCancelled when cancel() was requested"""
+        if self._cancel.is_set():
+            raise JobCancelled(self.name)
+
+    def elapsed(self):
+        if self.started_at is None:
+            return 0.0
+        return (self.finished_at or time.time()) - self.started_at
+
+class JobQueue:
+    """In-process job queue backed by a thread pool
+
+    submit() returns a job id immediately; the function runs on a worker as
+    func(job, *args, **kwargs) and can report progress and check for
+    cancellation through the job. Finished jobs are kept until max_jobs is
+    exceeded, oldest first.
+    """
+
+    def __init__(self, max_workers=4, max_jobs=500):
+        self.max_jobs = max_jobs
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="jobs")
+        self._jobs = OrderedDict()
+        self._lock = threading.Lock()
+
+    def submit(self, name, func, *args, **kwargs):
+        job = Job(name)
+        with self._lock:
+            self._jobs[job.id] = job
+            self._evict()
+        job.future = self._executor.submit(self._run, job, func, args, kwargs)
+        return job.id
+
+    def _run(self, job, func, args, kwargs):
+        if job.cancel_requested:
+            self._finish(job, CANCELLED, "Cancelled")
+            return
+        job.status = RUNNING
+        job.started_at = time.time()
+        job.message = "Running"
+        try:
+            job.result = func(job, *args, **kwargs)
+        except JobCancelled:
+            self._finish(job, CANCELLED, "Cancelled")
+        except Exception as e:
+            job.error = repr(e)
+            self._finish(job, FAILED, f"Failed: {e}")
+        else:
+            job.progress = 1.0
+            self._finish(job, DONE, "Done")
+
+    def _finish(self, job, status, message):
+        job.finished_at = time.time()
+        job.message = message
+        job.status = status
+
+    def _evict(self):
+        finished = [job_id for job_id, job in self._jobs.items() if job.finished]
+        for job_id in finished[:max(0, len(self._jobs) - self.max_jobs)]:
+            del self._jobs[job_id]
+
+    def get(self, job_id):
+        with self._lock:
+            return self._jobs.get(job_id)
+
+    def cancel(self, job_id):
+        """Request cancellation; queued jobs never start, running jobs stop at their next check"""
+        job = self.get(job_id)
+        if job is None or job.finished:
+            return False
+        job._cancel.set()
+        if job.future is not None and job.future.cancel():
+            self._finish(job, CANCELLED, "Cancelled")
+        return True
+
+    def jobs(self):
+        with self._lock:
+            return list(self._jobs.values())
+
+    def stats(self):
+        counts = {status: 0 for status in (QUEUED, RUNNING) + FINISHED}
+        for job in self.jobs():
+            counts[job.status] += 1
+        return counts
+
+def wait_for_nodes(job, run, nodes, poll_interval=0.5):
+    """Block a job on workflow nodes, reporting progress as each one finishes
+
+    Cancellation is checked between nodes; a node already talking to the
+    model finishes in the background and its result is discarded.
+    """
+    futures = {run.futures[name]: name for name in nodes}
+    pending = set(futures)
+    while pending:
+        job.check_cancelled()
+        done = len(futures) - len(pending)
+        running = ", ".join(sorted(futures[f] for f in pending))
+        job.set_progress(done / len(futures), f"Waiting for {running}")
+        _, pending = wait(pending, timeout=poll_interval, return_when=FIRST_COMPLETED)
+    return {name: future.result() for future, name in futures.items()}
+
+_default_queue = None
+_default_queue_lock = threading.Lock()
+
+def get_job_queue():
+    """Process-wide job queue sized by SAASITIS_JOB_WORKERS"""
+    global _default_queue
+    with _default_queue_lock:
+        if _default_queue is None:
+            _default_queue = JobQueue(max_workers=int(os.getenv("SAASITIS_JOB_WORKERS", "4")))
+        return _default_queue
@@ -0,0 +1,190 @@
+import json
+import os
+import threading
+import time
+
+DEFAULT_FIXTURES_PATH = os.path.join("fixtures", "llm_responses.jsonl")
+
+class LatencyProfile:
+    """Simulated model timing: time to first token, then a steady token rate
+
+    jitter is a +/- fraction applied to every delay, drawn from the same
+    seeded generator as the response so runs stay reproducible.
+    """
+
+    def __init__(self, first_token_s=0.0, tokens_per_s=0.0, jitter=0.0):
+        self.first_token_s = first_token_s
+        self.tokens_per_s = tokens_per_s
+        self.jitter = jitter
+
+    def scale(self, seconds, rng):
+        if not self.jitter:
+            return seconds
+        return seconds * (1 + rng.uniform(-self.jitter, self.jitter))
+
+    def token_delay(self, tokens, rng):
+        """Seconds to generate tokens after the first one arrives"""
+        if not self.tokens_per_s:
+            return 0.0
+        return self.scale(tokens / self.tokens_per_s, rng)
+
+class FixtureStore:
+    """Recorded model responses keyed by prompt, in an append-only JSON-lines file"""
+
+    def __init__(self, path=DEFAULT_FIXTURES_PATH):
+        self.path = path
+        self._responses = None
+        self._lock = threading.Lock()
+
+    def _ensure_loaded(self):
+        if self._responses is None:
+            self._responses = {}
+            if os.path.exists(self.path):
+                with open(self.path, encoding="utf-8") as f:
+                    for line in f:
+                        if line.strip():
+                            record = json.loads(line)
+                            self._responses[record["key"]] = record
+        return self._responses
+
+    def get(self, key):
+        with self._lock:
+            return self._ensure_loaded().get(key)
+
+    def add(self, key, content, model, step=None, prompt_tokens=None, completion_tokens=None):
+        record = {
+            "key": key,
+            "model": model,
+            "step": step,
+            "content": content,
+            "prompt_tokens": prompt_tokens,
+            "completion_tokens": completion_tokens,
+            "recorded_at": time.time()
+        }
+        with self._lock:
+            self._ensure_loaded()[key] = record
+            directory = os.path.dirname(self.path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+            with open(self.path, "a", encoding="utf-8") as f:
+                f.write(json.dumps(record) + "\n")
+
+    def __len__(self):
+        with self._lock:
+            return len(self._ensure_loaded())
+
+class OpenAIBackend:
+    """Live OpenAI chat models over the shared connection pool"""
+    name = "openai"
+    requires_api_key = True
+    use_cache = True
+
+    def chat_model(self, model, temperature, api_key):
+        from langchain_openai import ChatOpenAI
+        from agents.http_pool import get_http_async_client, get_http_client
+        return ChatOpenAI(
+            model=model,
+            api_key=api_key,
+            temperature=temperature,
+            stream_usage=True,
+            # Retries are handled by the guard so they respect the shared rate limits
+            max_retries=0,
+            http_client=get_http_client(),
+            http_async_client=get_http_async_client()
+        )
+
+class StubBackend:
+    """Deterministic offline responses shaped like each step's real output"""
+    name = "stub"
+    requires_api_key = False
+    use_cache = False
+
+    def __init__(self, latency=None, seed=0):
+        self.latency = latency or LatencyProfile()
+        self.seed = seed
+
+    def chat_model(self, model, temperature, api_key):
+        from agents.simulated_llm import StubChatModel
+        return StubChatModel(model_name=model, temperature=temperature, latency=self.latency, seed=self.seed)
+
+class RecordBackend:
+    """Live calls through another backend, saving every response as a fixture"""
+    name = "record"
+    use_cache = False
+
+    def __init__(self, fixtures, inner=None):
+        self.fixtures = fixtures
+        self.inner = inner or OpenAIBackend()
+        self.requires_api_key = self.inner.requires_api_key
+
+    def chat_model(self, model, temperature, api_key):
+        from agents.simulated_llm import RecordingChatModel
+        return RecordingChatModel(
+            model_name=model, temperature=temperature, fixtures=self.fixtures,
+            inner=self.inner.chat_model(model, temperature, api_key)
+        )
+
+class ReplayBackend:
+    """Recorded fixtures served offline with simulated latency
+
+    Prompts without a fixture raise FixtureMissingError, or get a stub
+    response when fallback_to_stub is set.
+    """
+    name = "replay"
+    requires_api_key = False
+    use_cache = False
+
+    def __init__(self, fixtures, latency=None, fallback_to_stub=False, seed=0):
+        self.fixtures = fixtures
+        self.latency = latency or LatencyProfile()
+        self.fallback_to_stub = fallback_to_stub
+        self.seed = seed
+
+    def chat_model(self, model, temperature, api_key):
+        from agents.simulated_llm import ReplayChatModel
+        return ReplayChatModel(
+            model_name=model, temperature=temperature, latency=self.latency, seed=self.seed,
+            fixtures=self.fixtures, fallback_to_stub=self.fallback_to_stub
+        )
+
+def _latency_from_env():
+    return LatencyProfile(
+        first_token_s=float(os.getenv("SAASITIS_STUB_LATENCY", "0")),
+        tokens_per_s=float(os.getenv("SAASITIS_STUB_TOKENS_PER_S", "0")),
+        jitter=float(os.getenv("SAASITIS_STUB_JITTER", "0"))
+    )
+
+def build_backend_from_env():
+    """Backend selected by SAASITIS_LLM_BACKEND (openai, stub, record or replay)
+
+    Stub and replay timing comes from SAASITIS_STUB_LATENCY (seconds to first
+    token), SAASITIS_STUB_TOKENS_PER_S and SAASITIS_STUB_JITTER; fixtures
+    live in SAASITIS_LLM_FIXTURES.
+    """
+    mode = os.getenv("SAASITIS_LLM_BACKEND", "openai").lower()
+    seed = int(os.getenv("SAASITIS_STUB_SEED", "0"))
+    fixtures = FixtureStore(os.getenv("SAASITIS_LLM_FIXTURES") or DEFAULT_FIXTURES_PATH)
+    if mode == "stub":
+        return StubBackend(_latency_from_env(), seed)
+    if mode == "record":
+        return RecordBackend(fixtures)
+    if mode == "replay":
+        fallback = os.getenv("SAASITIS_REPLAY_FALLBACK", "").lower() == "stub"
+        return ReplayBackend(fixtures, _latency_from_env(), fallback, seed)
+    return OpenAIBackend()
+
+_default_backend = None
+_default_backend_lock = threading.Lock()
+
+def get_default_backend():
+    """Process-wide LLM backend shared by all agents"""
+    global _default_backend
+    with _default_backend_lock:
+        if _default_backend is None:
+            _default_backend = build_backend_from_env()
+        return _default_backend
+
+def set_default_backend(backend):
+    global _default_backend
+    with _default_backend_lock:
+        _default_backend = backend
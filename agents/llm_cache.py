@@ -0,0 +1,226 @@
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+
+DEFAULT_CACHE_PATH = os.path.join(".cache", "llm_responses.sqlite")
+DEFAULT_TTL_SECONDS = 7 * 24 * 3600
+
+def make_cache_key(model, temperature, messages):
+    """Content-address a rendered prompt together with the model settings"""
+    payload = json.dumps({
+        "model": model,
+        "temperature": temperature,
+        "messages": [[message.type, message.content] for message in messages]
+    }, sort_keys=True)
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+class BaseCache:
+    """Common hit/miss bookkeeping for response caches"""
+
+    def __init__(self):
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key):
+        value = self._get(key)
+        if value is None:
+            self.misses += 1
+        else:
+            self.hits += 1
+        return value
+
+    def set(self, key, value):
+        self._set(key, value)
+
+    def stats(self):
+        total = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": round(self.hits / total, 3) if total else 0.0
+        }
+
+    def _get(self, key):
+        raise NotImplementedError
+
+    def _set(self, key, value):
+        raise NotImplementedError
+
+    def clear(self):
+        raise NotImplementedError
+
+class NullCache(BaseCache):
+    """Cache that never stores anything (caching disabled)"""
+
+    def _get(self, key):
+        return None
+
+    def _set(self, key, value):
+        pass
+
+    def clear(self):
+        pass
+
+class MemoryCache(BaseCache):
+    """In-process LRU tier with optional TTL"""
+
+    def __init__(self, max_entries=512, ttl=DEFAULT_TTL_SECONDS):
+        super().__init__()
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def _get(self, key):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            value, created_at = entry
+            if self.ttl and time.time() - created_at > self.ttl:
+                del self._entries[key]
+                return None
+            self._entries.move_to_end(key)
+            return value
+
+    def _set(self, key, value):
+        with self._lock:
+            self._entries[key] = (value, time.time())
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def __len__(self):
+        return len(self._entries)
+
+class SQLiteCache(BaseCache):
+    """On-disk tier that survives restarts, evicting least recently used rows"""
+
+    def __init__(self, path=DEFAULT_CACHE_PATH, max_entries=10000, ttl=DEFAULT_TTL_SECONDS):
+        super().__init__()
+        self.path = path
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self._lock = threading.Lock()
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute("""
+            CREATE TABLE IF NOT EXISTS responses (
+                key TEXT PRIMARY KEY,
+                value TEXT NOT NULL,
+                created_at REAL NOT NULL,
+                accessed_at REAL NOT NULL
+            )
+        """)
+        self._conn.execute("CREATE INDEX IF NOT EXISTS idx_responses_accessed ON responses(accessed_at)")
+        self._conn.commit()
+
+    def _get(self, key):
+        now = time.time()
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT value, created_at FROM responses WHERE key = ?", (key,)
+            ).fetchone()
+            if row is None:
+                return None
+            value, created_at = row
+            if self.ttl and now - created_at > self.ttl:
+                self._conn.execute("DELETE FROM responses WHERE key = ?", (key,))
+                self._conn.commit()
+                return None
+            self._conn.execute("UPDATE responses SET accessed_at = ? WHERE key = ?", (now, key))
+            self._conn.commit()
+            return value
+
+    def _set(self, key, value):
+        now = time.time()
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO responses (key, value, created_at, accessed_at) VALUES (?, ?, ?, ?)",
+                (key, value, now, now)
+            )
+            if self.ttl:
+                self._conn.execute("DELETE FROM responses WHERE created_at < ?", (now - self.ttl,))
+            self._conn.execute("""
+                DELETE FROM responses WHERE key IN (
+                    SELECT key FROM responses ORDER BY accessed_at DESC LIMIT -1 OFFSET ?
+                )
+            """, (self.max_entries,))
+            self._conn.commit()
+
+    def clear(self):
+        with self._lock:
+            self._conn.execute("DELETE FROM responses")
+            self._conn.commit()
+
+    def __len__(self):
+        with self._lock:
+            return self._conn.execute("SELECT COUNT(*) FROM responses").fetchone()[0]
+
+class TieredCache(BaseCache):
+    """Checks tiers in order and promotes lower-tier hits into the faster tiers"""
+
+    def __init__(self, tiers):
+        super().__init__()
+        self.tiers = tiers
+
+    def _get(self, key):
+        for i, tier in enumerate(self.tiers):
+            value = tier.get(key)
+            if value is not None:
+                for faster in self.tiers[:i]:
+                    faster.set(key, value)
+                return value
+        return None
+
+    def _set(self, key, value):
+        for tier in self.tiers:
+            tier.set(key, value)
+
+    def clear(self):
+        for tier in self.tiers:
+            tier.clear()
+
+    def stats(self):
+        stats = super().stats()
+        stats["tiers"] = {type(tier).__name__: tier.stats() for tier in self.tiers}
+        return stats
+
+_default_cache = None
+_default_cache_lock = threading.Lock()
+
+def build_cache_from_env():
+    """Build the cache selected by SAASITIS_LLM_CACHE (sqlite, memory or off)"""
+    mode = os.getenv("SAASITIS_LLM_CACHE", "sqlite").lower()
+    ttl = float(os.getenv("SAASITIS_LLM_CACHE_TTL", DEFAULT_TTL_SECONDS))
+    if mode == "off":
+        return NullCache()
+    memory = MemoryCache(ttl=ttl)
+    if mode == "memory":
+        return memory
+    path = os.getenv("SAASITIS_LLM_CACHE_PATH", DEFAULT_CACHE_PATH)
+    return TieredCache([memory, SQLiteCache(path, ttl=ttl)])
+
+def get_default_cache():
+    """Process-wide cache shared by all agents"""
+    global _default_cache
+    with _default_cache_lock:
+        if _default_cache is None:
+            _default_cache = build_cache_from_env()
+        return _default_cache
+
+def set_default_cache(cache):
+    """Swap the process-wide cache, e.g. for a custom backend or to disable caching"""
+    global _default_cache
+    with _default_cache_lock:
+        _default_cache = cache
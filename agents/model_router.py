@@ -0,0 +1,122 @@
+import os
+import threading
+
+FAST = "fast"
+LARGE = "large"
+
+# Tier -> model used unless overridden by SAASITIS_MODEL_<TIER>
+DEFAULT_TIERS = {
+    FAST: "gpt-4o-mini",
+    LARGE: "gpt-4-turbo-preview"
+}
+
+# Agent step -> tier. Structured extraction and scoring run on the fast tier;
+# long-form writing stays on the large model.
+DEFAULT_ROUTES = {
+    "gather_requirements": FAST,
+    "update_requirements": FAST,
+    "match_vendors": FAST,
+    "create_poc_rubric": FAST,
+    "simulate_poc_evaluation": FAST,
+    "generate_adoption_prediction": FAST,
+    "generate_rfp": LARGE,
+    "generate_vendor_comparison": LARGE,
+    "synthesize_evaluations": LARGE,
+    "generate_final_recommendation": LARGE
+}
+
+# USD per million (prompt, completion) tokens, for cost estimates only
+MODEL_PRICES = {
+    "gpt-4o-mini": (0.15, 0.60),
+    "gpt-4o": (2.50, 10.00),
+    "gpt-4-turbo": (10.00, 30.00),
+    "gpt-4-turbo-preview": (10.00, 30.00),
+    "gpt-3.5-turbo": (0.50, 1.50)
+}
+
+def estimate_cost(model, prompt_tokens, completion_tokens):
+    """Estimated USD cost of one call, or None for a model without a known price"""
+    prices = MODEL_PRICES.get(model)
+    if prices is None:
+        return None
+    return ((prompt_tokens or 0) * prices[0] + (completion_tokens or 0) * prices[1]) / 1_000_000
+
+class ModelRouter:
+    """Maps each agent step to a model tier and, optionally, a cascade of tiers
+
+    With cascade enabled, structured steps routed below the large tier try
+    their own tier first and escalate to the large model when the output
+    fails schema validation or the step's acceptance check. Free-text steps
+    cannot be checked, so they always use a single tier.
+    """
+
+    def __init__(self, tiers=None, routes=None, default_tier=LARGE, cascade=True):
+        self.tiers = {**DEFAULT_TIERS, **(tiers or {})}
+        self.routes = {**DEFAULT_ROUTES, **(routes or {})}
+        self.default_tier = default_tier
+        self.cascade = cascade
+
+    def tier(self, step):
+        tier = self.routes.get(step, self.default_tier)
+        return tier if tier in self.tiers else self.default_tier
+
+    def model(self, tier):
+        return self.tiers[tier]
+
+    def cascade_tiers(self, step):
+        """Tiers to try in order for a structured step"""
+        tier = self.tier(step)
+        if self.cascade and tier != LARGE:
+            return [tier, LARGE]
+        return [tier]
+
+def _parse_routes(value, tiers=DEFAULT_TIERS):
+    """'step=tier,step=tier' -> {step: tier}; raises ValueError on a tier not in tiers"""
+    routes = {}
+    for item in (value or "").split(","):
+        step, _, tier = item.partition("=")
+        if step.strip() and tier.strip():
+            tier = tier.strip().lower()
+            if tier not in tiers:
+                raise ValueError(
+                    f"SAASITIS_MODEL_ROUTES: unknown tier {tier!r} for {step.strip()!r} "
+                    f"(expected one of: {', '.join(tiers)})"
+                )
+            routes[step.strip()] = tier
+    return routes
+
+def build_router_from_env():
+    """Router configured by SAASITIS_MODEL_FAST/_LARGE, SAASITIS_MODEL_ROUTES and SAASITIS_MODEL_CASCADE
+
+    Setting SAASITIS_MODEL_ROUTES=*=large sends every step to the large model.
+    An unknown tier, for * or a single step, raises ValueError at startup
+    rather than on the first model call.
+    """
+    tiers = {tier: os.getenv(f"SAASITIS_MODEL_{tier.upper()}") for tier in DEFAULT_TIERS}
+    routes = _parse_routes(os.getenv("SAASITIS_MODEL_ROUTES"))
+    default_tier = LARGE
+    if "*" in routes:
+        default_tier = routes.pop("*")
+        routes = {**dict.fromkeys(DEFAULT_ROUTES, default_tier), **routes}
+    return ModelRouter(
+        tiers={tier: model for tier, model in tiers.items() if model},
+        routes=routes,
+        default_tier=default_tier,
+        cascade=os.getenv("SAASITIS_MODEL_CASCADE", "on").lower() not in ("0", "off", "false", "no")
+    )
+
+_default_router = None
+_default_router_lock = threading.Lock()
+
+def get_default_router():
+    """Process-wide model router shared by all agents"""
+    global _default_router
+    with _default_router_lock:
+        if _default_router is None:
+            _default_router = build_router_from_env()
+        return _default_router
+
+def set_default_router(router):
+    global _default_router
+    with _default_router_lock:
+        _default_router = router
@@ -0,0 +1,66 @@
+import json
+from pydantic import ValidationError
+
+class OutputParseError(ValueError):
+    """Model output could not be turned into a valid structured result"""
+
+    def __init__(self, message, raw_output=None):
+        super().__init__(message)
+        self.raw_output = raw_output
+
+def iter_json_objects(text):
+    """Yield each balanced top-level {...} span in text in a single pass
+
+    Braces inside JSON strings are ignored, so prose before/after the object,
+    markdown fences and '}' characters in values don't confuse the scan.
+    """
+    depth = 0
+    start = None
+    in_string = False
+    escaped = False
+    for i, ch in enumerate(text):
+        if in_string:
+            if escaped:
+                escaped = False
+            elif ch == "\\":
+                escaped = True
+            elif ch == '"':
+                in_string = False
+        elif ch == '"' and depth > 0:
+            in_string = True
+        elif ch == "{":
+            if depth == 0:
+                start = i
+            depth += 1
+        elif ch == "}" and depth > 0:
+            depth -= 1
+            if depth == 0:
+                yield text[start:i + 1]
+
+def extract_json(text):
+    """Return the first JSON object embedded in text"""
+    try:
+        value = json.loads(text)
+        if isinstance(value, dict):
+            return value
+    except (json.JSONDecodeError, TypeError):
+        pass
+    for candidate in iter_json_objects(text or ""):
+        try:
+            return json.loads(candidate)
+        except json.JSONDecodeError:
+            continue
+    raise OutputParseError("No valid JSON object found in model output", text)
+
+def parse_structured(text, schema=None):
+    """Extract a JSON object from text and validate it against a pydantic schema
+
+    Returns a plain dict so results stay JSON-serializable for session state.
+    """
+    data = extract_json(text)
+    if schema is None:
+        return data
+    try:
+        return schema.model_validate(data).model_dump()
+    except ValidationError as e:
+        raise OutputParseError(f"Output does not match {schema.__name__}: {e}", text) from e
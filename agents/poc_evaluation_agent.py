@@ -1,14 +1,17 @@
-from langchain_openai import ChatOpenAI
 from langchain.prompts import ChatPromptTemplate
-import json
+import asyncio
+from agents.base_agent import BaseAgent
+from agents.http_pool import run_sync
+from agents.output_parsing import OutputParseError
+from agents.rubric_scoring import Rubric, apply_scores, rank_vendors
+from agents.schemas import POCEvaluation, POCRubric
 
-class POCEvaluationAgent:
-    def __init__(self, api_key):
-        self.llm = ChatOpenAI(
-            model="gpt-4-turbo-preview",
-            api_key=api_key,
-            temperature=0.1
-        )
+class POCEvaluationAgent(BaseAgent):
+    # Defaults for the concurrent per-vendor evaluation path
+    max_concurrency = 5
+    evaluation_timeout = 90
+    # Share of rubric criteria a fast-tier evaluation must score before it is accepted
+    min_criterion_coverage = 0.8
     
     def create_poc_rubric(self, requirements, vendors):
         """Generate custom POC evaluation rubric based on requirements"""
@@ -33,30 +36,82 @@ Customize weights based on requirement priorities:
 - Performance critical = higher Performance weight
 - Compliance heavy = higher Security weight
 
-Return ONLY valid JSON.
+Return ONLY a valid JSON object with:
+- "categories": list of categories, each with "name", "weight" (percent; all weights sum to 100)
+  and "criteria" (list of criteria, each with "name", "description", "threshold" as the minimum
+  acceptable 1-5 score, and "stakeholders")
+- "scoring_scale": what each score from 1 to 5 means
         """)
         
-        chain = prompt | self.llm
-        result = chain.invoke({
-            "requirements": json.dumps(requirements, indent=2),
-            "vendors": json.dumps(vendors, indent=2)
-        })
-        
         try:
-            content = result.content
-            start_idx = content.find('{')
-            end_idx = content.rfind('}') + 1
-            if start_idx != -1 and end_idx > start_idx:
-                json_str = content[start_idx:end_idx]
-                return json.loads(json_str)
-            else:
-                return {"rubric": content}
-        except:
-            return {"rubric": result.content}
+            return self._invoke_structured(
+                prompt,
+                self._payload("create_poc_rubric", requirements=requirements, vendors=vendors),
+                POCRubric,
+                step="create_poc_rubric"
+            )
+        except OutputParseError as e:
+            return {"rubric": e.raw_output, "parse_error": str(e)}
     
     def simulate_poc_evaluation(self, rubric, vendor_name):
-        """Simulate POC evaluation scores for demo purposes"""
-        prompt = ChatPromptTemplate.from_template("""
+        """Simulate POC evaluation scores for demo purposes
+        
+        The model only scores criteria; category scores, the weighted total and
+        threshold checks are computed locally from the rubric.
+        """
+        try:
+            evaluation = self._invoke_structured(
+                self._evaluation_prompt(),
+                {"vendor_name": vendor_name, **self._payload("simulate_poc_evaluation", rubric=rubric)},
+                POCEvaluation,
+                step="simulate_poc_evaluation",
+                accept=self._covers_rubric(rubric)
+            )
+        except OutputParseError as e:
+            return self._evaluation_fallback(e)
+        return apply_scores(rubric, {vendor_name: evaluation})[vendor_name]
+    
+    async def asimulate_poc_evaluations(self, rubric, vendor_names, max_concurrency=None, timeout=None):
+        """Simulate POC evaluations for several vendors concurrently
+        
+        Returns a dict keyed by vendor name. Vendors whose call fails or times out
+        get an {"error": ...} entry instead of aborting the whole batch.
+        """
+        max_concurrency = max_concurrency or self.max_concurrency
+        timeout = timeout or self.evaluation_timeout
+        prompt = self._evaluation_prompt()
+        rubric_input = self._payload("simulate_poc_evaluation", rubric=rubric)
+        accept = self._covers_rubric(rubric)
+        semaphore = asyncio.Semaphore(max_concurrency)
+        
+        async def evaluate(vendor_name):
+            async with semaphore:
+                try:
+                    return await asyncio.wait_for(
+                        self._ainvoke_structured(
+                            prompt, {"vendor_name": vendor_name, **rubric_input}, POCEvaluation,
+                            step="simulate_poc_evaluation", accept=accept
+                        ),
+                        timeout
+                    )
+                except OutputParseError as e:
+                    return self._evaluation_fallback(e)
+                except asyncio.TimeoutError:
+                    return {"error": f"Evaluation timed out after {timeout}s"}
+                except Exception as e:
+                    return {"error": str(e)}
+        
+        results = await asyncio.gather(*(evaluate(name) for name in vendor_names))
+        return apply_scores(rubric, dict(zip(vendor_names, results)))
+    
+    def simulate_poc_evaluations(self, rubric, vendor_names, max_concurrency=None, timeout=None):
+        """Blocking wrapper around asimulate_poc_evaluations for Streamlit handlers"""
+        return run_sync(
+            self.asimulate_poc_evaluations(rubric, vendor_names, max_concurrency, timeout)
+        )
+    
+    def _evaluation_prompt(self):
+        return ChatPromptTemplate.from_template("""
 Simulate realistic POC evaluation scores for {vendor_name} based on this rubric:
 
 {rubric}
@@ -70,41 +125,54 @@ Generate realistic scores (1-5) for each criterion that reflect:
 Include:
 - Individual criterion scores with brief justification
 - Stakeholder-specific feedback
-- Overall category scores
-- Weighted total score
 - Key strengths and concerns identified
 
+Do not compute category or weighted totals; they are calculated from your criterion scores.
+
 Make it realistic - no vendor is perfect, include both positives and areas for improvement.
-Return ONLY valid JSON.
+Return ONLY a valid JSON object with:
+- "criterion_scores": list with one entry per rubric criterion: "criterion", "category",
+  "score" (1-5) and "justification"
+- "stakeholder_feedback": feedback keyed by stakeholder
+- "strengths" and "concerns": lists of key strengths and concerns
         """)
+    
+    def _covers_rubric(self, rubric):
+        """Acceptance check for the model cascade: enough rubric criteria were scored"""
+        parsed = Rubric.from_dict(rubric)
+        if parsed is None or not parsed.criteria:
+            return None
+        expected = set(parsed.criterion_names)
         
-        chain = prompt | self.llm
-        result = chain.invoke({
-            "vendor_name": vendor_name,
-            "rubric": json.dumps(rubric, indent=2)
-        })
-        
-        try:
-            content = result.content
-            start_idx = content.find('{')
-            end_idx = content.rfind('}') + 1
-            if start_idx != -1 and end_idx > start_idx:
-                json_str = content[start_idx:end_idx]
-                return json.loads(json_str)
-            else:
-                return {"evaluation": content}
-        except:
-            return {"evaluation": result.content}
+        def accept(evaluation):
+            scored = {item["criterion"] for item in evaluation["criterion_scores"]}
+            return len(expected & scored) >= self.min_criterion_coverage * len(expected)
+        return accept
     
-    def synthesize_evaluations(self, evaluations):
-        """Synthesize multiple vendor evaluations into final recommendations"""
+    def _evaluation_fallback(self, error):
+        return {"evaluation": error.raw_output, "parse_error": str(error)}
+    
+    def synthesize_evaluations(self, evaluations, rubric=None):
+        """Synthesize multiple vendor evaluations into final recommendations
+        
+        With a rubric the ranking is computed locally by rank_vendors and the
+        model only writes the narrative around it (use rank_vendors directly
+        when no narrative is needed). Without one the model ranks the vendors.
+        """
+        ranking = rank_vendors(rubric, evaluations) if rubric is not None else []
+        ranking_section = """
+Vendor ranking by weighted rubric score (already computed, do not recalculate):
+
+{ranking}
+""" if ranking else ""
+        first_item = "Explanation of the ranking and the score gaps" if ranking else "Vendor ranking with overall scores"
         prompt = ChatPromptTemplate.from_template("""
 Synthesize these POC evaluation results into final recommendations:
 
 {evaluations}
-
+""" + ranking_section + """
 Provide:
-1. Vendor ranking with overall scores
+1. """ + first_item + """
 2. Strengths and weaknesses comparison
 3. Risk assessment for each vendor
 4. Implementation complexity analysis
@@ -120,9 +188,10 @@ Consider:
 - Change management implications
         """)
         
-        chain = prompt | self.llm
-        result = chain.invoke({"evaluations": json.dumps(evaluations, indent=2)})
-        return result.content
+        payloads = {"evaluations": evaluations, "ranking": ranking} if ranking else {"evaluations": evaluations}
+        return self._invoke(
+            prompt, self._payload("synthesize_evaluations", **payloads), step="synthesize_evaluations"
+        )
     
     def generate_stakeholder_feedback(self, vendor, criteria):
         """Generate realistic stakeholder feedback for different personas"""
@@ -0,0 +1,126 @@
+import json
+import threading
+
+# Display-only fields that never help the model
+PRESENTATION_KEYS = {"icon", "website"}
+
+# Extra fields each consumer (agent step) does not need
+CONSUMER_DROP_KEYS = {
+    # Budget and timeline weigh in on the final decision, not on how vendors are tested
+    "create_poc_rubric": {"match_breakdown", "pros", "cons", "budget_and_timeline"},
+    "simulate_poc_evaluation": {"scoring_scale"},
+    "generate_vendor_comparison": {"match_breakdown"},
+    "synthesize_evaluations": {"justification"},
+    "generate_final_recommendation": {"justification", "match_breakdown", "scoring_scale"},
+    "generate_adoption_prediction": {"match_breakdown", "justification"},
+}
+
+# Vendor record fields a consumer does not need. Applied to vendor payloads
+# only: the same names in the requirements (e.g. the organization's country)
+# still matter.
+VENDOR_DROP_KEYS = {
+    "match_vendors": {"funding", "year_founded", "location", "city", "country"},
+    "create_poc_rubric": {"funding", "year_founded", "location", "city", "country"},
+}
+
+# Payload (and session artifact) names that hold vendor records
+VENDOR_PAYLOADS = {"vendors", "vendor_db", "vendor_matches", "matched_vendors", "recommended_vendor"}
+
+# Size limits applied by truncate
+MAX_STRING_CHARS = 800
+MAX_LIST_ITEMS = 15
+
+def drop_keys_for(consumer, payload):
+    """Keys removed from one named payload before it is sent to consumer"""
+    drop_keys = PRESENTATION_KEYS | CONSUMER_DROP_KEYS.get(consumer, set())
+    if payload in VENDOR_PAYLOADS:
+        drop_keys = drop_keys | VENDOR_DROP_KEYS.get(consumer, set())
+    return drop_keys
+
+def prune(value, drop_keys):
+    """Recursively remove drop_keys from nested dicts"""
+    if isinstance(value, dict):
+        return {k: prune(v, drop_keys) for k, v in value.items() if k not in drop_keys}
+    if isinstance(value, list):
+        return [prune(item, drop_keys) for item in value]
+    return value
+
+def dedupe_requirements(requirements):
+    """Drop the raw form copy app.py attaches once the structured sections exist
+
+    gather_requirements already folded every form field into the structured
+    output, so re-sending detailed_input duplicates the whole form. It is kept
+    only when parsing failed and the raw text is all we have.
+    """
+    if isinstance(requirements, dict) and "detailed_input" in requirements and "parse_error" not in requirements:
+        return {k: v for k, v in requirements.items() if k != "detailed_input"}
+    return requirements
+
+def truncate(value, max_chars=MAX_STRING_CHARS, max_items=MAX_LIST_ITEMS):
+    """Summarizer that clips long strings and long lists"""
+    if isinstance(value, dict):
+        return {k: truncate(v, max_chars, max_items) for k, v in value.items()}
+    if isinstance(value, list):
+        items = [truncate(item, max_chars, max_items) for item in value[:max_items]]
+        if len(value) > max_items:
+            items.append(f"... {len(value) - max_items} more")
+        return items
+    if isinstance(value, str) and len(value) > max_chars:
+        return value[:max_chars] + " ..."
+    return value
+
+def to_prompt_json(value):
+    """Minified JSON for prompts"""
+    return json.dumps(value, separators=(",", ":"), ensure_ascii=False)
+
+_encoding = None
+_encoding_loaded = False
+_encoding_lock = threading.Lock()
+
+def _get_encoding():
+    # tiktoken downloads its BPE files on first use; remember a failure so
+    # offline machines fall back to the estimate without retrying every call
+    global _encoding, _encoding_loaded
+    with _encoding_lock:
+        if not _encoding_loaded:
+            _encoding_loaded = True
+            try:
+                import tiktoken
+                _encoding = tiktoken.get_encoding("cl100k_base")
+            except Exception:
+                _encoding = None
+        return _encoding
+
+def count_tokens(text):
+    """Token count via tiktoken, or a ~4 chars/token estimate when unavailable"""
+    encoding = _get_encoding()
+    if encoding is not None:
+        return len(encoding.encode(text))
+    return max(1, len(text) // 4)
+
+def compact_payloads(consumer, payloads, summarizer=None):
+    """Serialize prompt payloads compactly for one consumer
+
+    Returns (inputs, report): inputs maps each payload name to its compact
+    JSON string, report compares token counts against the old indent=2 dump.
+    summarizer (e.g. truncate) is applied only when given, since clipping
+    loses content the step may need.
+    """
+    inputs = {}
+    before = after = 0
+    for name, value in payloads.items():
+        compact = prune(dedupe_requirements(value), drop_keys_for(consumer, name))
+        if summarizer is not None:
+            compact = summarizer(compact)
+        inputs[name] = to_prompt_json(compact)
+        before += count_tokens(json.dumps(value, indent=2))
+        after += count_tokens(inputs[name])
+
+    report = {
+        "step": consumer,
+        "tokens_before": before,
+        "tokens_after": after,
+        "saved_pct": round(100 * (before - after) / before, 1) if before else 0.0,
+        "exact": _get_encoding() is not None
+    }
+    return inputs, report
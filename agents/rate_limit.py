@@ -0,0 +1,400 @@
+import asyncio
+import os
+import random
+import threading
+import time
+from concurrent.futures import Future
+
+# Completion tokens reserved per call before the real usage is known
+COMPLETION_TOKEN_ESTIMATE = 800
+
+# HTTP statuses worth retrying: throttling, timeouts and server-side failures
+RETRYABLE_STATUS = {408, 409, 429, 500, 502, 503, 504}
+
+class CircuitOpenError(Exception):
+    """Calls to a model are short-circuited after repeated provider failures"""
+
+    def __init__(self, model, retry_in):
+        super().__init__(f"{model} is unavailable after repeated failures; retrying in {retry_in:.0f}s")
+        self.model = model
+        self.retry_in = retry_in
+
+class _LeaderAbandoned(Exception):
+    """Set on a coalesced call's future when its leader was cancelled or timed out
+
+    Followers did not ask for that, so they rejoin and one of them makes the call.
+    """
+
+def _shareable(error):
+    # Cancellation and timeouts belong to the leader's caller, not to the request
+    return isinstance(error, Exception) and not isinstance(error, TimeoutError)
+
+class TokenBucket:
+    """Thread-safe token bucket refilled continuously at per_minute / 60 per second
+
+    reserve() takes the amount immediately and returns how long the caller
+    must wait before using it, so sync and async callers share one bucket
+    and queue up fairly instead of polling. per_minute of 0 disables it.
+    """
+
+    def __init__(self, per_minute, capacity=None):
+        self.per_minute = per_minute
+        self.rate = per_minute / 60
+        self.capacity = capacity or per_minute
+        self.tokens = self.capacity
+        self.updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def _refill(self):
+        now = time.monotonic()
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+
+    def reserve(self, amount=1):
+        if not self.per_minute:
+            return 0.0
+        with self._lock:
+            self._refill()
+            # A single request larger than the bucket waits for a full bucket, not forever
+            self.tokens -= min(amount, self.capacity)
+            return max(0.0, -self.tokens / self.rate)
+
+    def adjust(self, amount):
+        """Charge (positive) or refund (negative) the difference once the real cost is known"""
+        if not self.per_minute:
+            return
+        with self._lock:
+            self._refill()
+            self.tokens = min(self.capacity, self.tokens - amount)
+
+class CircuitBreaker:
+    """Opens after failure_threshold consecutive provider failures
+
+    While open, calls fail fast with CircuitOpenError. After reset_timeout
+    one trial call is let through (half-open); its success closes the
+    circuit and its failure opens it again.
+    """
+
+    def __init__(self, failure_threshold=5, reset_timeout=30):
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.failures = 0
+        self.opened_at = None
+        self._trial_started = None
+        self._lock = threading.Lock()
+
+    @property
+    def state(self):
+        if self.opened_at is None:
+            return "closed"
+        if time.monotonic() - self.opened_at >= self.reset_timeout:
+            return "half-open"
+        return "open"
+
+    def before_call(self, model):
+        with self._lock:
+            state = self.state
+            if state == "closed":
+                return
+            now = time.monotonic()
+            # A trial that never reported back (e.g. cancelled) does not block the next one
+            trial_free = self._trial_started is None or now - self._trial_started >= self.reset_timeout
+            if state == "half-open" and trial_free:
+                self._trial_started = now
+                return
+            retry_in = max(0.0, self.reset_timeout - (now - self.opened_at))
+        raise CircuitOpenError(model, retry_in)
+
+    def record_success(self):
+        with self._lock:
+            self.failures = 0
+            self.opened_at = None
+            self._trial_started = None
+
+    def record_failure(self):
+        with self._lock:
+            self.failures += 1
+            if self._trial_started is not None or self.failures >= self.failure_threshold:
+                self.opened_at = time.monotonic()
+            self._trial_started = None
+
+def is_retryable(error):
+    """Transient provider errors: throttling, timeouts, dropped connections and 5xx"""
+    # Imported here so the app can show guard stats without loading the OpenAI SDK
+    import httpx
+    import openai
+    if isinstance(error, openai.RateLimitError) and getattr(error, "code", None) == "insufficient_quota":
+        # Out of credits, not throttled; retrying cannot succeed
+        return False
+    if isinstance(error, (openai.APIConnectionError, httpx.TimeoutException, httpx.NetworkError)):
+        return True
+    return getattr(error, "status_code", None) in RETRYABLE_STATUS
+
+def retry_after(error):
+    """Seconds the provider asked us to wait, from the Retry-After header"""
+    response = getattr(error, "response", None)
+    try:
+        return float(response.headers.get("retry-after"))
+    except (AttributeError, TypeError, ValueError):
+        return None
+
+class _Lane:
+    """Request and token buckets plus the circuit breaker for one model"""
+
+    def __init__(self, rpm, tpm, failure_threshold, reset_timeout):
+        self.requests = TokenBucket(rpm)
+        self.tokens = TokenBucket(tpm)
+        self.breaker = CircuitBreaker(failure_threshold, reset_timeout)
+
+class ProviderGuard:
+    """Shared client layer in front of every model call
+
+    Per model it enforces requests- and tokens-per-minute budgets, retries
+    transient errors with jittered exponential backoff (honouring
+    Retry-After), and trips a circuit breaker when the provider keeps
+    failing. Identical requests already in flight are coalesced: concurrent
+    callers wait for the first one and share its response (or error; if
+    the first caller is cancelled or times out, a waiting one takes over).
+    """
+
+    def __init__(self, rpm=500, tpm=150_000, max_retries=4, base_delay=1.0, max_delay=30.0,
+                 failure_threshold=5, reset_timeout=30):
+        self.rpm = rpm
+        self.tpm = tpm
+        self.max_retries = max_retries
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self._lanes = {}
+        self._inflight = {}
+        self._lock = threading.Lock()
+        self._stats = {"calls": 0, "retries": 0, "coalesced": 0, "throttled_s": 0.0, "short_circuited": 0}
+
+    def _lane(self, model):
+        with self._lock:
+            if model not in self._lanes:
+                self._lanes[model] = _Lane(self.rpm, self.tpm, self.failure_threshold, self.reset_timeout)
+            return self._lanes[model]
+
+    def _count(self, name, amount=1):
+        with self._lock:
+            self._stats[name] += amount
+
+    def _admit(self, lane, model, estimate):
+        """Check the breaker and reserve budget; returns seconds to wait before calling"""
+        try:
+            lane.breaker.before_call(model)
+        except CircuitOpenError:
+            self._count("short_circuited")
+            raise
+        wait = max(lane.requests.reserve(1), lane.tokens.reserve(estimate))
+        self._count("calls")
+        if wait:
+            self._count("throttled_s", wait)
+        return wait
+
+    def _backoff(self, attempt, error):
+        delay = min(self.max_delay, self.base_delay * 2 ** attempt)
+        # Equal jitter keeps retries from many sessions from arriving in lockstep
+        delay = delay / 2 + random.uniform(0, delay / 2)
+        return max(delay, retry_after(error) or 0)
+
+    def _record_failure(self, lane, error):
+        # Throttling means the provider is up and asking us to slow down; backoff handles it
+        if getattr(error, "status_code", None) != 429:
+            lane.breaker.record_failure()
+
+    def _settle(self, lane, estimate, usage):
+        if usage:
+            lane.tokens.adjust(usage - estimate)
+
+    def _join(self, key):
+        """(future, leader): the leader makes the call, everyone else waits on its future"""
+        if key is None:
+            return Future(), True
+        with self._lock:
+            if key in self._inflight:
+                self._stats["coalesced"] += 1
+                return self._inflight[key], False
+            future = self._inflight[key] = Future()
+            return future, True
+
+    def _leave(self, key, future, result=None, error=None):
+        if key is not None:
+            with self._lock:
+                self._inflight.pop(key, None)
+        if error is None:
+            future.set_result(result)
+        else:
+            future.set_exception(error if _shareable(error) else _LeaderAbandoned())
+
+    def call(self, model, func, prompt_tokens=0, key=None, usage=None):
+        """(result, shared) of func() under the model's limits; shared is True for a coalesced result
+
+        usage(result) returns the tokens actually used so the token bucket
+        can be corrected after the call.
+        """
+        future, leader = self._join(key)
+        while not leader:
+            try:
+                return future.result(), True
+            except _LeaderAbandoned:
+                future, leader = self._join(key)
+        try:
+            result = self._call_with_retries(model, func, prompt_tokens, usage)
+        except BaseException as e:
+            self._leave(key, future, error=e)
+            raise
+        self._leave(key, future, result)
+        return result, False
+
+    def _call_with_retries(self, model, func, prompt_tokens, usage):
+        lane = self._lane(model)
+        estimate = prompt_tokens + COMPLETION_TOKEN_ESTIMATE
+        for attempt in range(self.max_retries + 1):
+            time.sleep(self._admit(lane, model, estimate))
+            try:
+                result = func()
+            except Exception as e:
+                if not is_retryable(e):
+                    # The provider answered, so it is up even though this request was bad
+                    lane.breaker.record_success()
+                    raise
+                self._record_failure(lane, e)
+                if attempt == self.max_retries:
+                    raise
+                self._count("retries")
+                time.sleep(self._backoff(attempt, e))
+            else:
+                lane.breaker.record_success()
+                self._settle(lane, estimate, usage(result) if usage else None)
+                return result
+
+    async def acall(self, model, func, prompt_tokens=0, key=None, usage=None):
+        """Async variant of call; func returns a coroutine"""
+        future, leader = self._join(key)
+        while not leader:
+            try:
+                # Shielded so a cancelled follower does not cancel the shared future
+                return await asyncio.shield(asyncio.wrap_future(future)), True
+            except _LeaderAbandoned:
+                future, leader = self._join(key)
+        try:
+            result = await self._acall_with_retries(model, func, prompt_tokens, usage)
+        except BaseException as e:
+            self._leave(key, future, error=e)
+            raise
+        self._leave(key, future, result)
+        return result, False
+
+    async def _acall_with_retries(self, model, func, prompt_tokens, usage):
+        lane = self._lane(model)
+        estimate = prompt_tokens + COMPLETION_TOKEN_ESTIMATE
+        for attempt in range(self.max_retries + 1):
+            await asyncio.sleep(self._admit(lane, model, estimate))
+            try:
+                result = await func()
+            except Exception as e:
+                if not is_retryable(e):
+                    # The provider answered, so it is up even though this request was bad
+                    lane.breaker.record_success()
+                    raise
+                self._record_failure(lane, e)
+                if attempt == self.max_retries:
+                    raise
+                self._count("retries")
+                await asyncio.sleep(self._backoff(attempt, e))
+            else:
+                lane.breaker.record_success()
+                self._settle(lane, estimate, usage(result) if usage else None)
+                return result
+
+    def stream(self, model, open_stream, prompt_tokens=0):
+        """Yield chunks from open_stream() under the model's limits
+
+        A stream is only retried if it fails before its first chunk; after
+        that the caller has already shown partial output.
+        """
+        lane = self._lane(model)
+        estimate = prompt_tokens + COMPLETION_TOKEN_ESTIMATE
+        for attempt in range(self.max_retries + 1):
+            time.sleep(self._admit(lane, model, estimate))
+            started = False
+            try:
+                for chunk in open_stream():
+                    started = True
+                    yield chunk
+            except Exception as e:
+                if not is_retryable(e):
+                    # The provider answered, so it is up even though this request was bad
+                    lane.breaker.record_success()
+                    raise
+                self._record_failure(lane, e)
+                if started or attempt == self.max_retries:
+                    raise
+                self._count("retries")
+                time.sleep(self._backoff(attempt, e))
+            else:
+                lane.breaker.record_success()
+                return
+
+    async def astream(self, model, open_stream, prompt_tokens=0):
+        """Async variant of stream"""
+        lane = self._lane(model)
+        estimate = prompt_tokens + COMPLETION_TOKEN_ESTIMATE
+        for attempt in range(self.max_retries + 1):
+            await asyncio.sleep(self._admit(lane, model, estimate))
+            started = False
+            try:
+                async for chunk in open_stream():
+                    started = True
+                    yield chunk
+            except Exception as e:
+                if not is_retryable(e):
+                    # The provider answered, so it is up even though this request was bad
+                    lane.breaker.record_success()
+                    raise
+                self._record_failure(lane, e)
+                if started or attempt == self.max_retries:
+                    raise
+                self._count("retries")
+                await asyncio.sleep(self._backoff(attempt, e))
+            else:
+                lane.breaker.record_success()
+                return
+
+    def stats(self):
+        """Call, retry, coalescing and throttling counters plus each model's breaker state"""
+        with self._lock:
+            stats = dict(self._stats)
+            lanes = dict(self._lanes)
+        stats["throttled_s"] = round(stats["throttled_s"], 1)
+        stats["circuits"] = {model: lane.breaker.state for model, lane in lanes.items()}
+        return stats
+
+_default_guard = None
+_default_guard_lock = threading.Lock()
+
+def build_guard_from_env():
+    """Guard configured by SAASITIS_RPM, SAASITIS_TPM, SAASITIS_MAX_RETRIES and SAASITIS_BREAKER_*"""
+    return ProviderGuard(
+        rpm=int(os.getenv("SAASITIS_RPM", "500")),
+        tpm=int(os.getenv("SAASITIS_TPM", "150000")),
+        max_retries=int(os.getenv("SAASITIS_MAX_RETRIES", "4")),
+        failure_threshold=int(os.getenv("SAASITIS_BREAKER_FAILURES", "5")),
+        reset_timeout=float(os.getenv("SAASITIS_BREAKER_RESET", "30"))
+    )
+
+def get_default_guard():
+    """Process-wide guard shared by all agents and sessions, so limits are global"""
+    global _default_guard
+    with _default_guard_lock:
+        if _default_guard is None:
+            _default_guard = build_guard_from_env()
+        return _default_guard
+
+def set_default_guard(guard):
+    global _default_guard
+    with _default_guard_lock:
+        _default_guard = guard
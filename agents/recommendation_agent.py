@@ -1,18 +1,52 @@
-from langchain_openai import ChatOpenAI
 from langchain.prompts import ChatPromptTemplate
-import json
-
-class RecommendationAgent:
-    def __init__(self, api_key):
-        self.llm = ChatOpenAI(
-            model="gpt-4-turbo-preview",
-            api_key=api_key,
-            temperature=0.1
-        )
+import numpy as np
+from agents.base_agent import BaseAgent
+from agents.output_parsing import OutputParseError
+from agents.rubric_scoring import Rubric, rubric_score_matrix, scored_evaluations
+from agents.schemas import AdoptionPrediction
+
+# Score given to a factor the available data cannot measure
+NEUTRAL_FACTOR_SCORE = 50.0
+# Gap between the top two vendor totals (1-5 scale) that counts as fully differentiated
+DIFFERENTIATION_FULL_GAP = 1.0
+
+def _vendor_totals(evaluations, vendors, matrix):
+    """Reported weighted totals (1-5) when every vendor has one, else mean criterion scores"""
+    reported = [evaluations[vendor].get("weighted_total") for vendor in vendors]
+    if all(total is not None and 1 <= total <= 5 for total in reported):
+        return np.array(reported, dtype=float)
+    return np.nan_to_num(np.nanmean(matrix, axis=0), nan=1.0)
+
+class RecommendationAgent(BaseAgent):
+    # Decisions below this confidence should be re-evaluated before acting on them
+    reevaluation_threshold = 65
     
     def generate_final_recommendation(self, requirements, vendor_matches, poc_evaluations):
         """Generate comprehensive final recommendation report"""
-        prompt = ChatPromptTemplate.from_template("""
+        return self._invoke(
+            self._recommendation_prompt(),
+            self._recommendation_inputs(requirements, vendor_matches, poc_evaluations),
+            step="generate_final_recommendation"
+        )
+    
+    def stream_final_recommendation(self, requirements, vendor_matches, poc_evaluations):
+        """Streaming variant of generate_final_recommendation that yields text chunks"""
+        return self._stream(
+            self._recommendation_prompt(),
+            self._recommendation_inputs(requirements, vendor_matches, poc_evaluations),
+            step="generate_final_recommendation"
+        )
+    
+    def _recommendation_inputs(self, requirements, vendor_matches, poc_evaluations):
+        return self._payload(
+            "generate_final_recommendation",
+            requirements=requirements,
+            vendor_matches=vendor_matches,
+            poc_evaluations=poc_evaluations
+        )
+    
+    def _recommendation_prompt(self):
+        return ChatPromptTemplate.from_template("""
 You are a senior enterprise technology advisor with 20+ years experience.
 
 Create an executive-level recommendation report based on:
@@ -55,18 +89,17 @@ Generate a comprehensive report with:
 
 Make it executive-ready with clear action items and decision rationale.
         """)
-        
-        chain = prompt | self.llm
-        result = chain.invoke({
-            "requirements": json.dumps(requirements, indent=2),
-            "vendor_matches": json.dumps(vendor_matches, indent=2),
-            "poc_evaluations": json.dumps(poc_evaluations, indent=2)
-        })
-        return result.content
     
-    def calculate_confidence_score(self, evaluation_data):
-        """Calculate decision confidence based on evaluation quality and consensus"""
-        # Simplified confidence calculation for MVP
+    def calculate_confidence_score(self, evaluation_data, rubric=None):
+        """Calculate decision confidence based on evaluation quality and consensus
+        
+        Factors come from one pass over the criterion x vendor score matrix:
+        completeness is rubric coverage, consensus is how tightly each vendor's
+        criterion scores cluster (the only per-evaluator signal available),
+        differentiation is the gap between the top two vendor totals, clarity is
+        the share of rubric criteria with a threshold and risk assessment is the
+        share of vendors with identified concerns.
+        """
         factors = {
             "evaluation_completeness": 0.3,
             "stakeholder_consensus": 0.25,
@@ -75,14 +108,33 @@ Make it executive-ready with clear action items and decision rationale.
             "risk_assessment": 0.1
         }
         
-        # Mock scoring for demo - would be based on actual evaluation data
-        scores = {
-            "evaluation_completeness": 85,  # Based on rubric coverage
-            "stakeholder_consensus": 78,    # Based on score variance
-            "vendor_differentiation": 82,   # Based on score gaps
-            "requirement_clarity": 90,      # Based on requirement structure
-            "risk_assessment": 75           # Based on identified risks
-        }
+        evaluations = scored_evaluations(evaluation_data)
+        rubric = rubric if isinstance(rubric, Rubric) else Rubric.from_dict(rubric)
+        rubric_criteria = rubric.criteria if rubric else ()
+        criteria, vendors, matrix = rubric_score_matrix(rubric, evaluations)
+        
+        if not vendors:
+            scores = dict.fromkeys(factors, 0.0)
+        else:
+            scored = ~np.isnan(matrix)
+            totals = _vendor_totals(evaluations, vendors, matrix)
+            top_two = np.sort(totals)[::-1][:2]
+            # A vendor's criterion scores span at most 2 standard deviations on a 1-5 scale
+            spread = np.nanstd(matrix, axis=0)
+            scores = {
+                "evaluation_completeness": 100 * scored.mean() if criteria else 0.0,
+                "stakeholder_consensus": 100 * (1 - np.nanmean(spread) / 2),
+                "vendor_differentiation": (
+                    100 * min(1.0, (top_two[0] - top_two[1]) / DIFFERENTIATION_FULL_GAP)
+                    if len(vendors) > 1 else NEUTRAL_FACTOR_SCORE
+                ),
+                "requirement_clarity": (
+                    100 * np.mean([criterion.threshold is not None for criterion in rubric_criteria])
+                    if rubric_criteria else NEUTRAL_FACTOR_SCORE
+                ),
+                "risk_assessment": 100 * np.mean([bool(evaluations[vendor].get("concerns")) for vendor in vendors])
+            }
+            scores = {factor: round(float(score), 1) for factor, score in scores.items()}
         
         weighted_score = sum(scores[factor] * weight for factor, weight in factors.items())
         
@@ -90,7 +142,8 @@ Make it executive-ready with clear action items and decision rationale.
             "confidence_score": round(weighted_score, 1),
             "confidence_level": self._get_confidence_level(weighted_score),
             "contributing_factors": scores,
-            "improvement_areas": [factor for factor, score in scores.items() if score < 80]
+            "improvement_areas": [factor for factor, score in scores.items() if score < 80],
+            "needs_reevaluation": weighted_score < self.reevaluation_threshold
         }
     
     def _get_confidence_level(self, score):
@@ -127,26 +180,23 @@ Base predictions on:
 - Organizational change readiness
 - Technical integration challenges
 
-Return as JSON.
+Return as a JSON object with keys "adoption_probability" (0-100), "success_factors",
+"risks", "timeline", "success_metrics" and "change_management".
         """)
         
-        chain = prompt | self.llm
-        result = chain.invoke({
-            "recommended_vendor": json.dumps(recommended_vendor, indent=2),
-            "requirements": json.dumps(requirements, indent=2)
-        })
-        
         try:
-            content = result.content
-            start_idx = content.find('{')
-            end_idx = content.rfind('}') + 1
-            if start_idx != -1 and end_idx > start_idx:
-                json_str = content[start_idx:end_idx]
-                return json.loads(json_str)
-            else:
-                return {"adoption_prediction": content}
-        except:
-            return {"adoption_prediction": result.content}
+            return self._invoke_structured(
+                prompt,
+                self._payload(
+                    "generate_adoption_prediction",
+                    recommended_vendor=recommended_vendor,
+                    requirements=requirements
+                ),
+                AdoptionPrediction,
+                step="generate_adoption_prediction"
+            )
+        except OutputParseError as e:
+            return {"adoption_prediction": e.raw_output, "parse_error": str(e)}
     
     def create_implementation_roadmap(self, recommended_vendor, requirements):
         """Create detailed implementation roadmap"""
@@ -0,0 +1,34 @@
+import importlib
+import threading
+
+# Agent name -> (module, class). Modules are imported on first use so that
+# langchain/openai are not loaded until a workflow step needs them.
+AGENT_CLASSES = {
+    'requirements': ('agents.requirements_agent', 'RequirementsAgent'),
+    'vendor_matching': ('agents.vendor_matching_agent', 'VendorMatchingAgent'),
+    'poc_evaluation': ('agents.poc_evaluation_agent', 'POCEvaluationAgent'),
+    'recommendation': ('agents.recommendation_agent', 'RecommendationAgent')
+}
+
+class AgentRegistry:
+    """Dict-like registry that imports and builds each agent on first access"""
+
+    def __init__(self, api_key):
+        self.api_key = api_key
+        self._agents = {}
+        self._lock = threading.Lock()
+
+    def __getitem__(self, name):
+        with self._lock:
+            if name not in self._agents:
+                module_name, class_name = AGENT_CLASSES[name]
+                agent_class = getattr(importlib.import_module(module_name), class_name)
+                self._agents[name] = agent_class(self.api_key)
+            return self._agents[name]
+
+    def __contains__(self, name):
+        return name in AGENT_CLASSES
+
+    def loaded(self):
+        """Names of the agents built so far"""
+        return list(self._agents)
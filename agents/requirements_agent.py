@@ -1,16 +1,11 @@
-from langchain_openai import ChatOpenAI
 from langchain.prompts import ChatPromptTemplate
-from langchain.output_parsers import StructuredOutputParser, ResponseSchema
 import json
+from agents.base_agent import BaseAgent
+from agents.output_parsing import OutputParseError
+from agents.incremental import merge_requirements
+from agents.schemas import StructuredRequirements, requirements_update_schema
 
-class RequirementsAgent:
-    def __init__(self, api_key):
-        self.llm = ChatOpenAI(
-            model="gpt-4-turbo-preview",
-            api_key=api_key,
-            temperature=0.1
-        )
-        
+class RequirementsAgent(BaseAgent):
     def gather_requirements(self, user_input):
         """Convert conversational input into structured requirements"""
         prompt = ChatPromptTemplate.from_template("""
@@ -29,29 +24,68 @@ Extract and structure the following:
 5. Budget constraints and timeline
 6. Success criteria and KPIs
 
-Return ONLY a valid JSON object with these categories.
+Return ONLY a valid JSON object with exactly these keys, one per category above:
+"primary_use_case", "business_objectives", "technical_requirements",
+"compliance_requirements", "stakeholder_concerns", "budget_and_timeline",
+"success_criteria"
         """)
         
-        chain = prompt | self.llm
-        result = chain.invoke({"user_input": user_input})
+        try:
+            return self._invoke_structured(
+                prompt, {"user_input": user_input}, StructuredRequirements, step="gather_requirements"
+            )
+        except OutputParseError as e:
+            return {"raw_requirements": e.raw_output, "parse_error": str(e)}
+    
+    def update_requirements(self, previous, user_input, sections):
+        """Re-extract only the given sections of previously structured requirements
         
+        Used after a form edit that only touches some fields; the other
+        sections are kept verbatim so artifacts built from them stay valid.
+        Falls back to a full gather_requirements when the update can't be parsed.
+        """
+        prompt = ChatPromptTemplate.from_template("""
+You are an expert enterprise software consultant with 15+ years experience helping 
+Fortune 500 companies select SaaS tools.
+
+The client edited their requirements form. Updated input:
+
+User Input: {user_input}
+
+Requirements previously structured from the old input: {previous}
+
+Re-extract ONLY these sections from the updated input, keeping the same
+level of detail and structure as before: {sections}
+
+Return ONLY a valid JSON object with exactly these keys: {sections}
+        """)
+        
+        inputs = self._payload("update_requirements", previous=previous)
         try:
-            # Try to parse JSON from the response
-            content = result.content
-            # Find JSON in the response
-            start_idx = content.find('{')
-            end_idx = content.rfind('}') + 1
-            if start_idx != -1 and end_idx > start_idx:
-                json_str = content[start_idx:end_idx]
-                return json.loads(json_str)
-            else:
-                return {"raw_requirements": content}
-        except:
-            return {"raw_requirements": result.content}
+            update = self._invoke_structured(
+                prompt,
+                {**inputs, "user_input": user_input, "sections": ", ".join(f'"{s}"' for s in sections)},
+                requirements_update_schema(tuple(sections)),
+                step="update_requirements"
+            )
+        except OutputParseError:
+            return self.gather_requirements(user_input)
+        return merge_requirements(previous, update, sections)
     
     def generate_rfp(self, structured_requirements):
         """Generate a comprehensive RFP from structured requirements"""
-        prompt = ChatPromptTemplate.from_template("""
+        return self._invoke(
+            self._rfp_prompt(), self._payload("generate_rfp", requirements=structured_requirements), step="generate_rfp"
+        )
+    
+    def stream_rfp(self, structured_requirements):
+        """Streaming variant of generate_rfp that yields text chunks as they arrive"""
+        return self._stream(
+            self._rfp_prompt(), self._payload("generate_rfp", requirements=structured_requirements), step="generate_rfp"
+        )
+    
+    def _rfp_prompt(self):
+        return ChatPromptTemplate.from_template("""
 You are an expert enterprise software consultant creating RFP documents.
 
 Create a comprehensive Request for Proposal (RFP) document based on these requirements:
@@ -72,10 +106,6 @@ Generate an RFP that includes:
 
 Make it professional and comprehensive for enterprise procurement.
         """)
-        
-        chain = prompt | self.llm
-        result = chain.invoke({"requirements": json.dumps(structured_requirements, indent=2)})
-        return result.content
     
     def identify_stakeholders(self, requirements):
         """Identify key stakeholders based on requirements"""
@@ -0,0 +1,198 @@
+from collections import Counter
+from dataclasses import dataclass
+
+import numpy as np
+from pydantic import ValidationError
+
+from agents.schemas import POCRubric
+
+@dataclass(frozen=True, slots=True)
+class Criterion:
+    name: str
+    category: str
+    # Minimum acceptable 1-5 score, None when the rubric sets none
+    threshold: float | None = None
+
+@dataclass(frozen=True, slots=True)
+class Rubric:
+    """Weighted POC rubric: categories with weights and the criteria scored under each"""
+    categories: tuple
+    # Category weights normalized to sum to 1, in category order
+    weights: tuple
+    criteria: tuple
+
+    @classmethod
+    def from_dict(cls, data):
+        """Rubric from create_poc_rubric output, or None for a parse fallback"""
+        try:
+            parsed = POCRubric.model_validate(data)
+        except ValidationError:
+            return None
+        categories = tuple(category.name for category in parsed.categories)
+        weights = [category.weight for category in parsed.categories]
+        total = sum(weights)
+        # Equal weights when the model left them all at zero
+        weights = tuple(w / total for w in weights) if total else (1 / len(categories),) * len(categories)
+        criteria = tuple(
+            Criterion(criterion.name, category.name, criterion.threshold)
+            for category in parsed.categories for criterion in category.criteria
+        )
+        return cls(categories, weights, criteria)
+
+    @property
+    def criterion_names(self):
+        return [criterion.name for criterion in self.criteria]
+
+    @property
+    def criterion_keys(self):
+        """(category, criterion) per criterion; names alone repeat across categories"""
+        return [(criterion.category, criterion.name) for criterion in self.criteria]
+
+def _criterion_names(evaluation):
+    return [item.get("criterion") for item in evaluation.get("criterion_scores") or []]
+
+def score_matrix(evaluations, criteria=(), row_keys=_criterion_names):
+    """(criteria, vendors, matrix) with matrix[i, j] = vendor j's score on criterion i
+
+    Rows start with the given criteria (e.g. from the rubric) followed by any
+    other criterion the evaluations scored; missing scores are NaN and repeated
+    scores for the same criterion are averaged. row_keys(evaluation) gives the
+    row key of each of its criterion scores (by default the criterion name).
+    """
+    criteria = list(dict.fromkeys(criteria))
+    vendors = list(evaluations)
+    rows = {criterion: i for i, criterion in enumerate(criteria)}
+    cells = {}
+    for j, vendor in enumerate(vendors):
+        items = evaluations[vendor].get("criterion_scores") or []
+        for key, item in zip(row_keys(evaluations[vendor]), items):
+            if key not in rows:
+                rows[key] = len(rows)
+            cells.setdefault((rows[key], j), []).append(item["score"])
+
+    matrix = np.full((len(rows), len(vendors)), np.nan)
+    if cells:
+        index = np.array(list(cells))
+        matrix[index[:, 0], index[:, 1]] = [sum(values) / len(values) for values in cells.values()]
+    return list(rows), vendors, matrix
+
+def scored_evaluations(evaluations):
+    """Evaluations that carry criterion scores (no errors or parse fallbacks)"""
+    return {
+        vendor: evaluation for vendor, evaluation in (evaluations or {}).items()
+        if isinstance(evaluation, dict) and evaluation.get("criterion_scores")
+    }
+
+def _rubric_row_keys(rubric):
+    """row_keys for score_matrix mapping each criterion score to a rubric (category, criterion) key
+
+    A name used in several categories is matched by the category the model
+    reported, else by order of appearance. Criteria the model renamed keep
+    the category it reported for them.
+    """
+    by_name = {}
+    for key in rubric.criterion_keys:
+        by_name.setdefault(key[1], []).append(key)
+
+    def row_keys(evaluation):
+        seen = Counter()
+        keys = []
+        for item in evaluation.get("criterion_scores") or []:
+            name, category = item.get("criterion"), item.get("category")
+            candidates = by_name.get(name)
+            if not candidates or (category, name) in candidates:
+                keys.append((category, name))
+            else:
+                keys.append(candidates[min(seen[name], len(candidates) - 1)])
+                seen[name] += 1
+        return keys
+
+    return row_keys
+
+def _row_label(key, keys):
+    """Criterion name, qualified by its category when the name repeats"""
+    category, name = key
+    return name if sum(other[1] == name for other in keys) == 1 else f"{category} / {name}"
+
+def rubric_score_matrix(rubric, evaluations):
+    """score_matrix with rubric rows keyed by (category, criterion), as rank_vendors scores them
+
+    Without a rubric, rows are keyed by criterion name.
+    """
+    if rubric is None:
+        return score_matrix(evaluations)
+    return score_matrix(evaluations, rubric.criterion_keys, _rubric_row_keys(rubric))
+
+def score_evaluations(rubric, evaluations):
+    """Category scores, weighted totals and threshold checks for every vendor
+
+    Category scores are the mean of the category's criterion scores and the
+    weighted total is the weight-averaged category score (1-5), renormalized
+    over the categories that were actually scored. Returns {vendor: scores};
+    vendors without criterion scores are left out.
+    """
+    rubric = rubric if isinstance(rubric, Rubric) else Rubric.from_dict(rubric)
+    evaluations = scored_evaluations(evaluations)
+    if rubric is None or not evaluations:
+        return {}
+
+    rows, vendors, matrix = rubric_score_matrix(rubric, evaluations)
+    position = {name: i for i, name in enumerate(rubric.categories)}
+    row_categories = np.array([position.get(category, -1) for category, _ in rows], dtype=int)
+    membership = (row_categories[None, :] == np.arange(len(rubric.categories))[:, None]).astype(float)
+    scored = ~np.isnan(matrix)
+    counts = membership @ scored
+    sums = membership @ np.where(scored, matrix, 0.0)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        category_scores = sums / counts
+    weights = np.array(rubric.weights)[:, None] * (counts > 0)
+    weight_totals = weights.sum(axis=0)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        totals = np.where(weight_totals > 0, np.nansum(weights * category_scores, axis=0) / weight_totals, np.nan)
+
+    # One threshold per matrix row; criteria outside the rubric have none
+    threshold_by_key = {}
+    for criterion in rubric.criteria:
+        threshold_by_key.setdefault((criterion.category, criterion.name), criterion.threshold)
+    thresholds = np.array([threshold_by_key.get(key) for key in rows], dtype=float)
+    with np.errstate(invalid="ignore"):
+        below = matrix < thresholds[:, None]
+
+    results = {}
+    for j, vendor in enumerate(vendors):
+        failures = [_row_label(rows[i], rows) for i in np.flatnonzero(below[:, j])]
+        results[vendor] = {
+            "category_scores": {
+                name: round(float(category_scores[c, j]), 2)
+                for c, name in enumerate(rubric.categories) if counts[c, j]
+            },
+            "weighted_total": None if np.isnan(totals[j]) else round(float(totals[j]), 2),
+            "threshold_failures": failures,
+            "meets_thresholds": not failures
+        }
+    return results
+
+def apply_scores(rubric, evaluations):
+    """Evaluations with locally computed category_scores, weighted_total and threshold checks"""
+    scores = score_evaluations(rubric, evaluations)
+    return {
+        vendor: {**evaluation, **scores[vendor]} if vendor in scores else evaluation
+        for vendor, evaluation in evaluations.items()
+    }
+
+def rank_vendors(rubric, evaluations):
+    """Vendors best first: those meeting every threshold, then by weighted total
+
+    Each entry has rank, vendor, weighted_total, meets_thresholds and
+    threshold_failures.
+    """
+    scores = score_evaluations(rubric, evaluations)
+    ordered = sorted(
+        scores.items(),
+        key=lambda item: (not item[1]["meets_thresholds"], -(item[1]["weighted_total"] or 0), item[0])
+    )
+    return [
+        {"rank": rank, "vendor": vendor, "weighted_total": result["weighted_total"],
+         "meets_thresholds": result["meets_thresholds"], "threshold_failures": result["threshold_failures"]}
+        for rank, (vendor, result) in enumerate(ordered, start=1)
+    ]
@@ -0,0 +1,188 @@
+"""
+Headless batch mode for the consultant pipeline.
+
+Reads one requirements input per line from a JSON-lines file, shaped like
+the detailed_requirements dict built in step 1 of the app (optionally with
+an "id" key), runs requirements -> vendor matching -> rubric -> evaluations
+-> recommendation for each, and appends one JSON result per line to the
+output file as requests finish. Usage:
+
+    python -m agents.run requests.jsonl -o results.jsonl --concurrency 4
+
+Every finished step is checkpointed to the run store, so after a crash the
+same command skips requests already in the output file with status ok and
+resumes the others from their last finished step. Requests where a step
+fell back to raw output or a vendor evaluation failed are written with
+status partial and retried the same way.
+"""
+import argparse
+import hashlib
+import json
+import os
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+
+from dotenv import load_dotenv
+
+from agents.llm_backend import get_default_backend
+from agents.registry import AgentRegistry
+from agents.rubric_scoring import rank_vendors
+from agents.run_store import SQLiteRunStore
+from agents.workflow import build_consultant_workflow, compile_request_text, split_evaluations
+
+DEFAULT_CHECKPOINT_PATH = os.path.join(".cache", "batch_runs.sqlite")
+
+# Workflow nodes a batch run needs; the RFP is only drafted with --rfp
+TARGETS = ["recommendation", "confidence"]
+
+# Most workflow nodes one request runs at once (rfp beside vendor_matches,
+# recommendation beside confidence); sizes the node pool for --concurrency
+NODES_PER_REQUEST = 2
+
+def read_requests(path):
+    """[(request_id, detailed_input)] from a JSON-lines file; ids default to the line number"""
+    requests = []
+    with open(path, encoding="utf-8") as f:
+        for line_number, line in enumerate(f, start=1):
+            if not line.strip():
+                continue
+            data = json.loads(line)
+            request_id = str(data.pop("id", line_number))
+            requests.append((request_id, data))
+    return requests
+
+def completed_ids(path):
+    """Ids already written to the output file with status ok (partial and error results are retried)"""
+    if not os.path.exists(path):
+        return set()
+    ids = set()
+    with open(path, encoding="utf-8") as f:
+        for line in f:
+            try:
+                record = json.loads(line)
+            except json.JSONDecodeError:
+                # A line cut short by a crash; the request is simply run again
+                continue
+            if record.get("status") == "ok":
+                ids.add(record["id"])
+    return ids
+
+def checkpoint_run_id(request_id, detailed_input):
+    """Stable run id, so an edited input never resumes from stale checkpoints"""
+    payload = json.dumps(detailed_input, sort_keys=True, default=str)
+    return f"batch-{request_id}-" + hashlib.sha1(payload.encode("utf-8")).hexdigest()[:10]
+
+def is_incomplete(name, value):
+    """True for a step result that fell back to raw output, or evaluations with failed vendors"""
+    if isinstance(value, dict) and "parse_error" in value:
+        return True
+    return name == "evaluations" and bool(split_evaluations(value)[1])
+
+def run_request(agents, store, request_id, detailed_input, targets=TARGETS, executor=None):
+    """Run the pipeline for one input, seeding and saving workflow checkpoints
+
+    Incomplete results (see is_incomplete) and everything built from them are
+    not checkpointed, and the record gets status "partial", so rerunning the
+    command retries those steps instead of keeping the gaps.
+    """
+    started = time.perf_counter()
+    run_id = checkpoint_run_id(request_id, detailed_input)
+    seeded = store.load(run_id) or {}
+    workflow = build_consultant_workflow(agents, executor=executor)
+    run = workflow.start(
+        {"request_text": compile_request_text(detailed_input), "detailed_input": detailed_input, **seeded},
+        targets=targets
+    )
+
+    def incomplete(name):
+        # A node's dependencies have finished by the time its own result is in
+        if is_incomplete(name, run.result(name)):
+            return True
+        return any(incomplete(dep) for dep in workflow.nodes[name].deps if dep in workflow.nodes)
+
+    def save(name):
+        def callback(future):
+            if future.exception() is None and not incomplete(name):
+                store.save(run_id, name, future.result())
+        return callback
+
+    for name in workflow.nodes:
+        if name in run.futures and name not in seeded:
+            run.futures[name].add_done_callback(save(name))
+
+    run.wait(include_background=True)
+    results = run.results()
+    evaluations, failed = split_evaluations(results["evaluations"])
+    partial = not evaluations or any(incomplete(name) for name in targets)
+    return {
+        "id": request_id,
+        "status": "partial" if partial else "ok",
+        "run_id": run_id,
+        "resumed_steps": sorted(name for name in seeded if name in workflow.nodes),
+        "requirements": results["requirements"],
+        "vendor_matches": results["vendor_matches"],
+        "rubric": results["rubric"],
+        "evaluations": evaluations,
+        "failed_evaluations": failed,
+        "ranking": rank_vendors(results["rubric"], evaluations),
+        "recommendation": results["recommendation"],
+        "confidence": results["confidence"],
+        "rfp": results.get("rfp"),
+        "elapsed_s": round(time.perf_counter() - started, 2)
+    }
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("input", help="JSON-lines file of requirement inputs")
+    parser.add_argument("-o", "--output", required=True, help="JSON-lines file results are appended to")
+    parser.add_argument("--concurrency", type=int, default=4,
+                        help="requests processed at the same time (their workflow steps get a pool sized to match)")
+    parser.add_argument("--checkpoints", default=DEFAULT_CHECKPOINT_PATH, help="SQLite file of step checkpoints")
+    parser.add_argument("--rfp", action="store_true", help="also draft an RFP for every request")
+    parser.add_argument("--limit", type=int, default=0, help="process at most N pending requests")
+    args = parser.parse_args()
+
+    load_dotenv()
+    api_key = os.getenv("OPENAI_API_KEY")
+    if not api_key and get_default_backend().requires_api_key:
+        sys.exit("OPENAI_API_KEY is not set (see .env.example, or SAASITIS_LLM_BACKEND=stub to run offline)")
+
+    done = completed_ids(args.output)
+    pending = [(request_id, data) for request_id, data in read_requests(args.input) if request_id not in done]
+    if args.limit:
+        pending = pending[:args.limit]
+    print(f"{len(done)} already done, {len(pending)} to run", file=sys.stderr)
+
+    agents = AgentRegistry(api_key)
+    store = SQLiteRunStore(args.checkpoints)
+    targets = TARGETS + ["rfp"] if args.rfp else TARGETS
+    failures = 0
+
+    # Requests wait on their workflow nodes, so the nodes need their own pool;
+    # the shared workflow executor would cap every request at MAX_WORKERS nodes
+    nodes = ThreadPoolExecutor(max_workers=args.concurrency * NODES_PER_REQUEST, thread_name_prefix="batch-node")
+    with open(args.output, "a", encoding="utf-8") as output, nodes, ThreadPoolExecutor(max_workers=args.concurrency) as pool:
+        futures = {
+            pool.submit(run_request, agents, store, request_id, data, targets, nodes): request_id
+            for request_id, data in pending
+        }
+        for finished, future in enumerate(as_completed(futures), start=1):
+            request_id = futures[future]
+            try:
+                record = future.result()
+            except Exception as e:
+                record = {"id": request_id, "status": "error", "error": repr(e)}
+            if record["status"] != "ok":
+                failures += 1
+            output.write(json.dumps(record, default=str) + "\n")
+            output.flush()
+            elapsed = f" in {record['elapsed_s']}s" if "elapsed_s" in record else ""
+            print(f"[{finished}/{len(pending)}] {request_id}: {record['status']}{elapsed}", file=sys.stderr)
+
+    if failures:
+        print(f"{failures} request(s) failed or are partial; rerun the same command to retry them", file=sys.stderr)
+        sys.exit(1)
+
+if __name__ == "__main__":
+    main()
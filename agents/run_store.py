@@ -0,0 +1,217 @@
+import json
+import os
+import sqlite3
+import threading
+import time
+import uuid
+
+DEFAULT_RUN_STORE_PATH = os.path.join(".cache", "runs.sqlite")
+
+def new_run_id():
+    return uuid.uuid4().hex[:12]
+
+class BaseRunStore:
+    """Checkpoints of each workflow step's output, grouped by run id
+
+    Values must be JSON-serializable. save() upserts one key of a run, so a
+    run can be resumed from whatever steps finished before a reload or
+    restart.
+    """
+
+    def create_run(self, title=""):
+        run_id = new_run_id()
+        self._create(run_id, title)
+        return run_id
+
+    def _create(self, run_id, title):
+        raise NotImplementedError
+
+    def save(self, run_id, key, value):
+        raise NotImplementedError
+
+    def save_many(self, run_id, values):
+        for key, value in values.items():
+            self.save(run_id, key, value)
+
+    def load(self, run_id):
+        """All checkpoints of a run as {key: value}, or None when the run is unknown"""
+        raise NotImplementedError
+
+    def list_runs(self, limit=20, run_ids=None):
+        """Most recently updated runs as dicts with run_id, title, created_at, updated_at
+
+        run_ids restricts the list to those runs (e.g. the ones a browser
+        session created), since the store is shared by every session.
+        """
+        raise NotImplementedError
+
+    def delete(self, run_id):
+        raise NotImplementedError
+
+class NullRunStore(BaseRunStore):
+    """Store that keeps nothing (persistence disabled)"""
+
+    def _create(self, run_id, title):
+        pass
+
+    def save(self, run_id, key, value):
+        pass
+
+    def load(self, run_id):
+        return None
+
+    def list_runs(self, limit=20, run_ids=None):
+        return []
+
+    def delete(self, run_id):
+        pass
+
+class MemoryRunStore(BaseRunStore):
+    """Process-local store; survives reruns and reloads but not restarts"""
+
+    def __init__(self):
+        self._runs = {}
+        self._lock = threading.Lock()
+
+    def _create(self, run_id, title):
+        now = time.time()
+        with self._lock:
+            self._runs[run_id] = {"title": title, "created_at": now, "updated_at": now, "values": {}}
+
+    def save(self, run_id, key, value):
+        # Round-trip through JSON so callers never share mutable state with the store
+        encoded = json.dumps(value, default=str)
+        with self._lock:
+            run = self._runs.setdefault(
+                run_id, {"title": "", "created_at": time.time(), "updated_at": 0, "values": {}}
+            )
+            run["values"][key] = encoded
+            run["updated_at"] = time.time()
+
+    def load(self, run_id):
+        with self._lock:
+            run = self._runs.get(run_id)
+            if run is None:
+                return None
+            return {key: json.loads(value) for key, value in run["values"].items()}
+
+    def list_runs(self, limit=20, run_ids=None):
+        with self._lock:
+            runs = [
+                {"run_id": run_id, "title": run["title"],
+                 "created_at": run["created_at"], "updated_at": run["updated_at"]}
+                for run_id, run in self._runs.items()
+                if run_ids is None or run_id in run_ids
+            ]
+        return sorted(runs, key=lambda run: run["updated_at"], reverse=True)[:limit]
+
+    def delete(self, run_id):
+        with self._lock:
+            self._runs.pop(run_id, None)
+
+class SQLiteRunStore(BaseRunStore):
+    """On-disk store that survives browser refreshes and server restarts"""
+
+    def __init__(self, path=DEFAULT_RUN_STORE_PATH):
+        self.path = path
+        self._lock = threading.Lock()
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.executescript("""
+            CREATE TABLE IF NOT EXISTS runs (
+                run_id TEXT PRIMARY KEY,
+                title TEXT NOT NULL DEFAULT '',
+                created_at REAL NOT NULL,
+                updated_at REAL NOT NULL
+            );
+            CREATE TABLE IF NOT EXISTS checkpoints (
+                run_id TEXT NOT NULL,
+                key TEXT NOT NULL,
+                value TEXT NOT NULL,
+                updated_at REAL NOT NULL,
+                PRIMARY KEY (run_id, key)
+            );
+            CREATE INDEX IF NOT EXISTS idx_runs_updated ON runs(updated_at);
+        """)
+        self._conn.commit()
+
+    def _create(self, run_id, title):
+        now = time.time()
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR IGNORE INTO runs (run_id, title, created_at, updated_at) VALUES (?, ?, ?, ?)",
+                (run_id, title, now, now)
+            )
+            self._conn.commit()
+
+    def save(self, run_id, key, value):
+        now = time.time()
+        encoded = json.dumps(value, default=str)
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR IGNORE INTO runs (run_id, title, created_at, updated_at) VALUES (?, '', ?, ?)",
+                (run_id, now, now)
+            )
+            self._conn.execute(
+                "INSERT OR REPLACE INTO checkpoints (run_id, key, value, updated_at) VALUES (?, ?, ?, ?)",
+                (run_id, key, encoded, now)
+            )
+            self._conn.execute("UPDATE runs SET updated_at = ? WHERE run_id = ?", (now, run_id))
+            self._conn.commit()
+
+    def load(self, run_id):
+        with self._lock:
+            if self._conn.execute("SELECT 1 FROM runs WHERE run_id = ?", (run_id,)).fetchone() is None:
+                return None
+            rows = self._conn.execute(
+                "SELECT key, value FROM checkpoints WHERE run_id = ?", (run_id,)
+            ).fetchall()
+        return {key: json.loads(value) for key, value in rows}
+
+    def list_runs(self, limit=20, run_ids=None):
+        query, params = "SELECT run_id, title, created_at, updated_at FROM runs", []
+        if run_ids is not None:
+            run_ids = list(run_ids)
+            if not run_ids:
+                return []
+            query += f" WHERE run_id IN ({', '.join('?' * len(run_ids))})"
+            params.extend(run_ids)
+        with self._lock:
+            rows = self._conn.execute(query + " ORDER BY updated_at DESC LIMIT ?", (*params, limit)).fetchall()
+        return [
+            {"run_id": run_id, "title": title, "created_at": created_at, "updated_at": updated_at}
+            for run_id, title, created_at, updated_at in rows
+        ]
+
+    def delete(self, run_id):
+        with self._lock:
+            self._conn.execute("DELETE FROM checkpoints WHERE run_id = ?", (run_id,))
+            self._conn.execute("DELETE FROM runs WHERE run_id = ?", (run_id,))
+            self._conn.commit()
+
+_default_store = None
+_default_store_lock = threading.Lock()
+
+def build_run_store_from_env():
+    """Build the store selected by SAASITIS_RUN_STORE (sqlite, memory or off)"""
+    mode = os.getenv("SAASITIS_RUN_STORE", "sqlite").lower()
+    if mode == "off":
+        return NullRunStore()
+    if mode == "memory":
+        return MemoryRunStore()
+    return SQLiteRunStore(os.getenv("SAASITIS_RUN_STORE_PATH", DEFAULT_RUN_STORE_PATH))
+
+def get_default_run_store():
+    """Process-wide run store shared by all sessions"""
+    global _default_store
+    with _default_store_lock:
+        if _default_store is None:
+            _default_store = build_run_store_from_env()
+        return _default_store
+
+def set_default_run_store(store):
+    global _default_store
+    with _default_store_lock:
+        _default_store = store
@@ -0,0 +1,86 @@
+from functools import lru_cache
+from typing import Any, Dict, List, Optional
+from pydantic import BaseModel, ConfigDict, Field, create_model, field_validator
+
+def _strip_percent(value):
+    """Accept '25%' / '4/5' style numbers that models like to emit"""
+    if isinstance(value, str):
+        value = value.strip().rstrip("%").split("/")[0].strip()
+    return value
+
+class Schema(BaseModel):
+    """Base for agent output schemas; unknown keys are kept, not rejected"""
+    model_config = ConfigDict(extra="allow")
+
+class StructuredRequirements(Schema):
+    primary_use_case: Any
+    business_objectives: Any
+    technical_requirements: Any
+    compliance_requirements: Any
+    stakeholder_concerns: Any
+    budget_and_timeline: Any
+    success_criteria: Any
+
+@lru_cache(maxsize=None)
+def requirements_update_schema(sections):
+    """StructuredRequirements restricted to a tuple of sections, for partial re-extraction"""
+    return create_model("RequirementsUpdate", __base__=Schema, **{section: (Any, ...) for section in sections})
+
+class VendorMatch(Schema):
+    name: str
+    fit_score: float = Field(ge=0, le=100)
+    strengths: List[Any] = []
+    gaps: List[Any] = []
+    reasoning: Any = ""
+
+    _parse_fit_score = field_validator("fit_score", mode="before")(_strip_percent)
+
+class VendorMatches(Schema):
+    vendors: List[VendorMatch]
+
+class RubricCriterion(Schema):
+    name: str
+    description: Any = ""
+    threshold: Optional[float] = Field(default=None, ge=1, le=5)
+    stakeholders: List[Any] = []
+
+    _parse_threshold = field_validator("threshold", mode="before")(_strip_percent)
+
+class RubricCategory(Schema):
+    name: str
+    weight: float = Field(ge=0)
+    criteria: List[RubricCriterion]
+
+    _parse_weight = field_validator("weight", mode="before")(_strip_percent)
+
+class POCRubric(Schema):
+    categories: List[RubricCategory] = Field(min_length=1)
+    scoring_scale: Any = None
+
+class CriterionScore(Schema):
+    criterion: str
+    category: str = ""
+    score: float = Field(ge=1, le=5)
+    justification: Any = ""
+
+    _parse_score = field_validator("score", mode="before")(_strip_percent)
+
+class POCEvaluation(Schema):
+    criterion_scores: List[CriterionScore] = Field(min_length=1)
+    category_scores: Dict[str, Any] = {}
+    weighted_total: Optional[float] = None
+    stakeholder_feedback: Any = None
+    strengths: List[Any] = []
+    concerns: List[Any] = []
+
+    _parse_total = field_validator("weighted_total", mode="before")(_strip_percent)
+
+class AdoptionPrediction(Schema):
+    adoption_probability: float = Field(ge=0, le=100)
+    success_factors: Any = None
+    risks: Any = None
+    timeline: Any = None
+    success_metrics: Any = None
+    change_management: Any = None
+
+    _parse_probability = field_validator("adoption_probability", mode="before")(_strip_percent)
@@ -0,0 +1,279 @@
+import asyncio
+import hashlib
+import json
+import random
+import re
+import time
+from typing import Any
+
+from langchain_core.language_models.chat_models import BaseChatModel
+from langchain_core.messages import AIMessage, AIMessageChunk
+from langchain_core.outputs import ChatGeneration, ChatGenerationChunk, ChatResult
+
+from agents.llm_cache import make_cache_key
+from agents.prompt_compaction import count_tokens
+
+# Words per streamed chunk
+STREAM_CHUNK_WORDS = 8
+
+class FixtureMissingError(LookupError):
+    """No recorded response for this prompt; record one with SAASITIS_LLM_BACKEND=record"""
+
+def _prompt_text(messages):
+    return "\n".join(str(message.content) for message in messages)
+
+def _usage(prompt, content):
+    prompt_tokens, completion_tokens = count_tokens(prompt), count_tokens(content)
+    return {"input_tokens": prompt_tokens, "output_tokens": completion_tokens,
+            "total_tokens": prompt_tokens + completion_tokens}
+
+def _step(run_manager):
+    """Agent step name BaseAgent passes in the call's metadata (not available when streaming)"""
+    return (getattr(run_manager, "metadata", None) or {}).get("step")
+
+# Stub responses, one per structured step. Each gets the prompt text and a
+# generator seeded from it and returns output that validates against the
+# step's schema.
+
+RUBRIC_CATEGORIES = [
+    ("Integration", 25), ("Performance", 20), ("Security", 20), ("UX", 15), ("Cost", 10), ("Operability", 10)
+]
+
+def _field(prompt, label):
+    match = re.search(rf"{re.escape(label)}:\s*(.+)", prompt)
+    return match.group(1).strip() if match else "Not specified"
+
+def _stub_requirements(prompt, rng):
+    return {
+        "primary_use_case": _field(prompt, "Use Cases"),
+        "business_objectives": ["Reduce manual effort", "Improve decision speed"],
+        "technical_requirements": {"integrations": _field(prompt, "Required Integrations"), "scalability": "Enterprise"},
+        "compliance_requirements": _field(prompt, "Compliance Requirements"),
+        "stakeholder_concerns": {"Engineering": "Integration effort", "Security": "Data handling"},
+        "budget_and_timeline": {"budget": _field(prompt, "Budget Range"), "timeline": _field(prompt, "Time to Decision")},
+        "success_criteria": _field(prompt, "Success Criteria")
+    }
+
+def _stub_requirements_update(prompt, rng):
+    sections = re.findall(r'"(\w+)"', prompt[prompt.rfind("exactly these keys:"):])
+    requirements = _stub_requirements(prompt, rng)
+    return {section: requirements.get(section, "Not specified") for section in sections}
+
+def _stub_vendor_matches(prompt, rng):
+    names = list(dict.fromkeys(re.findall(r'"name":\s*"([^"]+)"', prompt)))[:5]
+    return {"vendors": [
+        {"name": name, "fit_score": max(40, 92 - 6 * i - rng.randint(0, 3)),
+         "strengths": ["Strong category fit"], "gaps": ["Needs a security review"],
+         "reasoning": f"{name} covers the core requirements."}
+        for i, name in enumerate(names)
+    ]}
+
+def _stub_rubric(prompt, rng):
+    return {
+        "categories": [
+            {"name": name, "weight": weight, "criteria": [
+                {"name": f"{name} depth", "description": f"Depth of {name.lower()} capabilities",
+                 "threshold": 3, "stakeholders": ["Engineering"]},
+                {"name": f"{name} maturity", "description": f"Maturity of {name.lower()} practices",
+                 "threshold": 3, "stakeholders": ["Operations"]}
+            ]}
+            for name, weight in RUBRIC_CATEGORIES
+        ],
+        "scoring_scale": {"1": "Poor", "3": "Adequate", "5": "Excellent"}
+    }
+
+def _rubric_criteria(prompt):
+    """(criterion, category) pairs from the rubric JSON embedded in the evaluation prompt"""
+    start = prompt.find("{", prompt.find("based on this rubric:"))
+    try:
+        rubric, _ = json.JSONDecoder().raw_decode(prompt[start:])
+    except ValueError:
+        rubric = _stub_rubric(prompt, None)
+    return [
+        (criterion.get("name"), category.get("name", ""))
+        for category in rubric.get("categories") or [] if isinstance(category, dict)
+        for criterion in category.get("criteria") or [] if isinstance(criterion, dict) and criterion.get("name")
+    ] or [("Overall fit", "")]
+
+def _stub_evaluation(prompt, rng):
+    vendor = (re.search(r"scores for (.+?) based on this rubric", prompt) or [None, "the vendor"])[1]
+    scores = [
+        {"criterion": criterion, "category": category, "score": rng.randint(2, 5),
+         "justification": f"{vendor} performed {'well' if rng.random() > 0.3 else 'adequately'} on {criterion}."}
+        for criterion, category in _rubric_criteria(prompt)
+    ]
+    return {
+        "criterion_scores": scores,
+        "stakeholder_feedback": {"Engineering": "Reasonable integration effort", "Finance": "Pricing within range"},
+        "strengths": [f"{vendor} onboarding"],
+        "concerns": ["Contract terms"] if rng.random() > 0.5 else []
+    }
+
+def _stub_adoption(prompt, rng):
+    return {
+        "adoption_probability": rng.randint(55, 90),
+        "success_factors": ["Executive sponsorship", "Phased rollout"],
+        "risks": ["Change fatigue"],
+        "timeline": {"pilot": "4 weeks", "rollout": "3 months"},
+        "success_metrics": ["Weekly active users"],
+        "change_management": ["Champions program"]
+    }
+
+STUB_RESPONDERS = {
+    "gather_requirements": _stub_requirements,
+    "update_requirements": _stub_requirements_update,
+    "match_vendors": _stub_vendor_matches,
+    "create_poc_rubric": _stub_rubric,
+    "simulate_poc_evaluation": _stub_evaluation,
+    "generate_adoption_prediction": _stub_adoption
+}
+
+def _stub_text(step, rng):
+    title = (step or "response").replace("_", " ").title()
+    sections = ["Summary", "Analysis", "Risks", "Next Steps"]
+    body = "\n\n".join(
+        f"## {section}\n" + " ".join(
+            f"Point {i + 1}: the offline stub estimates a score of {rng.randint(60, 95)} for this item."
+            for i in range(3)
+        )
+        for section in sections
+    )
+    return f"# {title}\n\n{body}"
+
+def stub_response(step, prompt, seed=0):
+    """Deterministic stub output for a step: JSON for structured steps, markdown otherwise"""
+    rng = random.Random(hashlib.sha256(f"{seed}|{step}|{prompt}".encode("utf-8")).digest())
+    responder = STUB_RESPONDERS.get(step)
+    if responder is not None:
+        return json.dumps(responder(prompt, rng)), rng
+    return _stub_text(step, rng), rng
+
+class SimulatedChatModel(BaseChatModel):
+    """Chat model answering locally with simulated latency and token-rate streaming
+
+    Subclasses implement _respond(step, prompt, messages) -> (content, rng).
+    """
+    model_name: str
+    temperature: float = 0.0
+    latency: Any = None
+    seed: int = 0
+
+    @property
+    def _llm_type(self):
+        return "simulated"
+
+    def _respond(self, step, prompt, messages):
+        raise NotImplementedError
+
+    def _delays(self, content, rng):
+        if self.latency is None:
+            return 0.0, 0.0
+        return self.latency.scale(self.latency.first_token_s, rng), self.latency.token_delay(count_tokens(content), rng)
+
+    def _chunks(self, content):
+        words = content.split(" ")
+        return [" ".join(words[i:i + STREAM_CHUNK_WORDS]) + (" " if i + STREAM_CHUNK_WORDS < len(words) else "")
+                for i in range(0, len(words), STREAM_CHUNK_WORDS)]
+
+    def _result(self, prompt, content):
+        return ChatResult(generations=[ChatGeneration(message=AIMessage(content=content, usage_metadata=_usage(prompt, content)))])
+
+    def _generate(self, messages, stop=None, run_manager=None, **kwargs):
+        prompt = _prompt_text(messages)
+        content, rng = self._respond(_step(run_manager), prompt, messages)
+        first, rest = self._delays(content, rng)
+        time.sleep(first + rest)
+        return self._result(prompt, content)
+
+    async def _agenerate(self, messages, stop=None, run_manager=None, **kwargs):
+        prompt = _prompt_text(messages)
+        content, rng = self._respond(_step(run_manager), prompt, messages)
+        first, rest = self._delays(content, rng)
+        await asyncio.sleep(first + rest)
+        return self._result(prompt, content)
+
+    def _stream(self, messages, stop=None, run_manager=None, **kwargs):
+        prompt = _prompt_text(messages)
+        content, rng = self._respond(_step(run_manager), prompt, messages)
+        first, rest = self._delays(content, rng)
+        chunks = self._chunks(content)
+        time.sleep(first)
+        for chunk in chunks:
+            time.sleep(rest / len(chunks))
+            yield ChatGenerationChunk(message=AIMessageChunk(content=chunk))
+        yield ChatGenerationChunk(message=AIMessageChunk(content="", usage_metadata=_usage(prompt, content)))
+
+    async def _astream(self, messages, stop=None, run_manager=None, **kwargs):
+        prompt = _prompt_text(messages)
+        content, rng = self._respond(_step(run_manager), prompt, messages)
+        first, rest = self._delays(content, rng)
+        chunks = self._chunks(content)
+        await asyncio.sleep(first)
+        for chunk in chunks:
+            await asyncio.sleep(rest / len(chunks))
+            yield ChatGenerationChunk(message=AIMessageChunk(content=chunk))
+        yield ChatGenerationChunk(message=AIMessageChunk(content="", usage_metadata=_usage(prompt, content)))
+
+class StubChatModel(SimulatedChatModel):
+    """Offline model: deterministic, schema-valid output for every agent step"""
+
+    def _respond(self, step, prompt, messages):
+        return stub_response(step, prompt, self.seed)
+
+class ReplayChatModel(SimulatedChatModel):
+    """Serves responses recorded by RecordingChatModel, keyed like the response cache"""
+    fixtures: Any = None
+    fallback_to_stub: bool = False
+
+    def _respond(self, step, prompt, messages):
+        record = self.fixtures.get(make_cache_key(self.model_name, self.temperature, messages))
+        if record is not None:
+            rng = random.Random(hashlib.sha256(f"{self.seed}|{record['key']}".encode("utf-8")).digest())
+            return record["content"], rng
+        if self.fallback_to_stub:
+            return stub_response(step, prompt, self.seed)
+        raise FixtureMissingError(f"No recorded response for this {step or 'streamed'} prompt on {self.model_name}")
+
+class RecordingChatModel(BaseChatModel):
+    """Wraps a live chat model and saves each response to the fixture store"""
+    model_name: str
+    temperature: float = 0.0
+    inner: Any = None
+    fixtures: Any = None
+
+    @property
+    def _llm_type(self):
+        return "recording"
+
+    def _save(self, messages, message, step):
+        usage = getattr(message, "usage_metadata", None) or {}
+        self.fixtures.add(
+            make_cache_key(self.model_name, self.temperature, messages), message.content, self.model_name,
+            step, usage.get("input_tokens"), usage.get("output_tokens")
+        )
+
+    def _generate(self, messages, stop=None, run_manager=None, **kwargs):
+        message = self.inner.invoke(messages, stop=stop, **kwargs)
+        self._save(messages, message, _step(run_manager))
+        return ChatResult(generations=[ChatGeneration(message=message)])
+
+    async def _agenerate(self, messages, stop=None, run_manager=None, **kwargs):
+        message = await self.inner.ainvoke(messages, stop=stop, **kwargs)
+        self._save(messages, message, _step(run_manager))
+        return ChatResult(generations=[ChatGeneration(message=message)])
+
+    def _stream(self, messages, stop=None, run_manager=None, **kwargs):
+        full = None
+        for chunk in self.inner.stream(messages, stop=stop, **kwargs):
+            full = chunk if full is None else full + chunk
+            yield ChatGenerationChunk(message=chunk)
+        if full is not None:
+            self._save(messages, full, None)
+
+    async def _astream(self, messages, stop=None, run_manager=None, **kwargs):
+        full = None
+        async for chunk in self.inner.astream(messages, stop=stop, **kwargs):
+            full = chunk if full is None else full + chunk
+            yield ChatGenerationChunk(message=chunk)
+        if full is not None:
+            self._save(messages, full, None)
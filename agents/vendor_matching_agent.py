@@ -1,109 +1,39 @@
-from langchain_openai import ChatOpenAI
 from langchain.prompts import ChatPromptTemplate
-import json
-import pandas as pd
+import numpy as np
+from agents.base_agent import BaseAgent
+from agents.output_parsing import OutputParseError
+from agents.schemas import VendorMatches
+from agents.vendor_scoring import (
+    adoption_confidence_levels, adoption_penalty, adoption_probabilities, rank_vendors, requirements_text
+)
+from catalog.store import get_catalog, normalize
 
-class VendorMatchingAgent:
-    def __init__(self, api_key):
-        self.llm = ChatOpenAI(
-            model="gpt-4-turbo-preview",
-            api_key=api_key,
-            temperature=0.1
-        )
-        
-        # Sample vendor database for MVP
-        self.vendor_db = self._load_vendor_database()
+class VendorMatchingAgent(BaseAgent):
+    # Number of locally pre-ranked candidates sent to the LLM
+    top_k = 8
+    # Candidates retrieved by semantic similarity before local ranking
+    retrieval_k = 50
+    # Long catalog descriptions and feature lists can be clipped for matching
+    summarize_steps = frozenset({"match_vendors", "generate_vendor_comparison"})
     
-    def _load_vendor_database(self):
-        """Load sample vendor database for demo"""
-        return {
-            "ai_infrastructure": [
-                {
-                    "name": "Coactive AI",
-                    "category": "AI Infrastructure",
-                    "description": "Data labeling software",
-                    "strengths": ["AI-powered data labeling", "Computer vision support", "Model training optimization"],
-                    "integrations": ["Python", "TensorFlow", "PyTorch", "AWS", "GCP"],
-                    "compliance": ["SOC2", "GDPR"],
-                    "pricing_model": "Usage-based",
-                    "adoption_score": 88,
-                    "enterprise_fit": 92,
-                    "funding": "$44M",
-                    "year_founded": 2021,
-                    "location": "San Jose, United States",
-                    "icon": "🏷️"
-                },
-                {
-                    "name": "Cohere",
-                    "category": "AI Infrastructure",
-                    "description": "AI model developer",
-                    "strengths": ["Enterprise LLMs", "Customizable models", "Privacy-focused"],
-                    "integrations": ["REST API", "Python SDK", "AWS", "Azure", "GCP"],
-                    "compliance": ["SOC2", "GDPR", "HIPAA"],
-                    "pricing_model": "API-based",
-                    "adoption_score": 90,
-                    "enterprise_fit": 95,
-                    "funding": "$1B",
-                    "year_founded": 2019,
-                    "location": "Toronto, Canada",
-                    "icon": "🧠"
-                }
-            ],
-            "observability": [
-                {
-                    "name": "DataDog",
-                    "category": "Observability & Monitoring",
-                    "strengths": ["APM", "Infrastructure Monitoring", "Log Management"],
-                    "integrations": ["AWS", "Kubernetes", "GitHub", "Slack"],
-                    "compliance": ["SOC2", "GDPR", "HIPAA"],
-                    "pricing_model": "Usage-based",
-                    "adoption_score": 87,
-                    "enterprise_fit": 95
-                },
-                {
-                    "name": "New Relic",
-                    "category": "Observability & Monitoring", 
-                    "strengths": ["Full-stack Observability", "AI-powered Insights"],
-                    "integrations": ["AWS", "Azure", "GCP", "Jenkins"],
-                    "compliance": ["SOC2", "FedRAMP", "GDPR"],
-                    "pricing_model": "User-based",
-                    "adoption_score": 82,
-                    "enterprise_fit": 90
-                },
-                {
-                    "name": "Grafana",
-                    "category": "Observability & Monitoring",
-                    "strengths": ["Open Source", "Customizable Dashboards", "Cost-effective"],
-                    "integrations": ["Prometheus", "InfluxDB", "Elasticsearch"],
-                    "compliance": ["SOC2", "GDPR"],
-                    "pricing_model": "Freemium",
-                    "adoption_score": 78,
-                    "enterprise_fit": 75
-                }
-            ],
-            "crm": [
-                {
-                    "name": "Salesforce",
-                    "category": "CRM",
-                    "strengths": ["Market Leader", "Extensive Customization", "AppExchange"],
-                    "integrations": ["Microsoft", "Google", "Slack", "Tableau"],
-                    "compliance": ["SOC2", "GDPR", "HIPAA", "FedRAMP"],
-                    "pricing_model": "Per-user",
-                    "adoption_score": 89,
-                    "enterprise_fit": 98
-                },
-                {
-                    "name": "HubSpot",
-                    "category": "CRM",
-                    "strengths": ["User-friendly", "Marketing Automation", "Free Tier"],
-                    "integrations": ["Gmail", "Outlook", "Slack", "Zoom"],
-                    "compliance": ["SOC2", "GDPR"],
-                    "pricing_model": "Freemium",
-                    "adoption_score": 85,
-                    "enterprise_fit": 70
-                }
-            ]
-        }
+    def __init__(self, api_key, catalog=None, **kwargs):
+        super().__init__(api_key, **kwargs)
+        self.catalog = catalog if catalog is not None else get_catalog()
+    
+    def all_vendors(self):
+        """Every catalog vendor as a plain dict"""
+        return [record.to_dict() for record in self.catalog.all()]
+    
+    def retrieve_candidates(self, requirements):
+        """Vendors closest to the requirement text, or the whole catalog when it is small"""
+        if len(self.catalog) <= self.retrieval_k:
+            return self.all_vendors()
+        hits = self.catalog.semantic_search(requirements_text(requirements), self.retrieval_k)
+        return [record.to_dict() for record, _ in hits]
+    
+    def shortlist_vendors(self, requirements, top_k=None):
+        """Retrieve semantic candidates, rank them locally and keep the top_k"""
+        return rank_vendors(self.retrieve_candidates(requirements), requirements, top_k or self.top_k)
     
     def match_vendors(self, requirements):
         """Match requirements to suitable vendors"""
@@ -114,7 +44,8 @@ Based on these enterprise requirements, identify and rank the most suitable vend
 
 Requirements: {requirements}
 
-Available Vendor Database: {vendor_db}
+Candidate Vendors (pre-ranked by a local match_score over compliance, integrations,
+category, adoption and enterprise fit): {vendor_db}
 
 For each potential vendor match:
 1. Calculate fit score (0-100) based on requirements alignment
@@ -125,26 +56,30 @@ For each potential vendor match:
 6. Consider enterprise readiness
 
 Return top 3-5 vendors ranked by overall fit score with detailed reasoning.
-Format as JSON.
+Format as a JSON object with a "vendors" list. Each vendor has "name", "fit_score" (0-100),
+"strengths", "gaps", "integration_compatibility", "compliance_alignment",
+"enterprise_readiness" and "reasoning".
         """)
         
-        chain = prompt | self.llm
-        result = chain.invoke({
-            "requirements": json.dumps(requirements, indent=2),
-            "vendor_db": json.dumps(self.vendor_db, indent=2)
-        })
+        candidates = self.shortlist_vendors(requirements)
+        candidate_names = {normalize(vendor["name"]) for vendor in candidates}
+        
+        def only_candidates(result):
+            # A cheaper model that invents vendors is escalated to the large one
+            return bool(result["vendors"]) and all(
+                normalize(vendor["name"]) in candidate_names for vendor in result["vendors"]
+            )
         
         try:
-            content = result.content
-            start_idx = content.find('{')
-            end_idx = content.rfind('}') + 1
-            if start_idx != -1 and end_idx > start_idx:
-                json_str = content[start_idx:end_idx]
-                return json.loads(json_str)
-            else:
-                return {"vendor_analysis": content}
-        except:
-            return {"vendor_analysis": result.content}
+            return self._invoke_structured(
+                prompt,
+                self._payload("match_vendors", requirements=requirements, vendor_db=candidates),
+                VendorMatches,
+                step="match_vendors",
+                accept=only_candidates
+            )
+        except OutputParseError as e:
+            return {"vendor_analysis": e.raw_output, "parse_error": str(e)}
     
     def generate_vendor_comparison(self, matched_vendors):
         """Generate side-by-side vendor comparison"""
@@ -166,28 +101,61 @@ Create a comparison table including:
 Format as a structured comparison that helps decision-makers.
         """)
         
-        chain = prompt | self.llm
-        result = chain.invoke({"matched_vendors": json.dumps(matched_vendors, indent=2)})
-        return result.content
+        return self._invoke(
+            prompt,
+            self._payload("generate_vendor_comparison", matched_vendors=matched_vendors),
+            step="generate_vendor_comparison"
+        )
     
     def predict_adoption_success(self, vendor, requirements):
         """Predict likelihood of successful adoption"""
         # Simplified scoring algorithm for MVP
-        base_score = vendor.get("adoption_score", 70)
-        enterprise_fit = vendor.get("enterprise_fit", 70)
-        
-        # Adjust based on requirement complexity
-        complexity_penalty = 0
-        if "integration" in str(requirements).lower():
-            complexity_penalty += 5
-        if "compliance" in str(requirements).lower():
-            complexity_penalty += 3
-        
-        final_score = min(95, (base_score + enterprise_fit) / 2 - complexity_penalty)
+        final_score = float(adoption_probabilities(
+            vendor.get("adoption_score", 70), vendor.get("enterprise_fit", 70), adoption_penalty(requirements)
+        ))
+        return self._adoption_result(final_score, vendor.get("strengths", []))
+    
+    def predict_adoption_success_batch(self, vendors, requirements):
+        """Predict adoption for a whole vendor table at once, in input order
         
+        vendors is a list of vendor dicts or a pandas DataFrame with the same
+        columns. Requirement features are extracted once and the scores are
+        computed as array arithmetic. Missing (NaN) scores in a DataFrame get
+        the same default of 70 as missing dict keys.
+        """
+        if hasattr(vendors, "columns"):
+            vendors = vendors.fillna({"adoption_score": 70, "enterprise_fit": 70}).to_dict("records")
+        probabilities = adoption_probabilities(
+            [vendor.get("adoption_score", 70) for vendor in vendors],
+            [vendor.get("enterprise_fit", 70) for vendor in vendors],
+            adoption_penalty(requirements)
+        )
+        levels = adoption_confidence_levels(probabilities)
+        return [
+            dict(self._adoption_result(float(p), vendor.get("strengths", []), str(level)), name=vendor.get("name"))
+            for vendor, p, level in zip(vendors, probabilities, levels)
+        ]
+    
+    def rank_adoption(self, requirements, top_k=10):
+        """Rank the whole catalog by predicted adoption using its cached score columns"""
+        probabilities = adoption_probabilities(
+            self.catalog.numeric_column("adoption_score", 70),
+            self.catalog.numeric_column("enterprise_fit", 70),
+            adoption_penalty(requirements)
+        )
+        records = self.catalog.all()
+        top = np.argsort(-probabilities, kind="stable")[:top_k]
+        return [
+            dict(self._adoption_result(float(probabilities[i]), list(records[i].strengths)), name=records[i].name)
+            for i in top
+        ]
+    
+    def _adoption_result(self, final_score, strengths, confidence_level=None):
         return {
             "adoption_probability": final_score,
-            "confidence_level": "High" if final_score > 80 else "Medium" if final_score > 60 else "Low",
-            "key_success_factors": vendor.get("strengths", []),
+            "confidence_level": confidence_level or (
+                "High" if final_score > 80 else "Medium" if final_score > 60 else "Low"
+            ),
+            "key_success_factors": strengths,
             "potential_risks": ["Integration complexity", "Change management"] if final_score < 70 else []
         }
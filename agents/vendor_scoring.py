@@ -0,0 +1,143 @@
+import json
+import re
+import numpy as np
+
+# Relative weight of each signal in the local match score (sums to 1.0)
+SCORING_WEIGHTS = {
+    "compliance": 0.30,
+    "integrations": 0.25,
+    "category": 0.20,
+    "enterprise_fit": 0.15,
+    "adoption": 0.10
+}
+
+KNOWN_COMPLIANCE = ["SOC2", "ISO 27001", "GDPR", "HIPAA", "PCI DSS", "FedRAMP"]
+
+# Maps the step 1 use case options onto catalog category keywords
+USE_CASE_CATEGORIES = {
+    "Development & DevOps": ["development", "devops", "observability", "monitoring", "infrastructure"],
+    "Customer Support": ["customer", "service"],
+    "Sales & CRM": ["crm", "sales"],
+    "Marketing": ["marketing", "sales"],
+    "Analytics": ["analytics", "observability"],
+    "Collaboration": ["collaboration", "search"],
+    "Security": ["security"],
+    "HR Management": ["hr"],
+    "Finance & Accounting": ["finance"]
+}
+
+STOPWORDS = {"and", "the", "for", "of", "to", "a", "an", "in", "with", "our", "we", "need", "tools"}
+
+def tokenize(text):
+    """Lowercase alphanumeric tokens"""
+    return re.findall(r"[a-z0-9]+", str(text).lower())
+
+def _normalize(name):
+    return " ".join(tokenize(name))
+
+def build_requirement_profile(requirements, known_integrations=()):
+    """Extract the signals the local scorer matches on from structured requirements"""
+    requirements = requirements if isinstance(requirements, dict) else {"raw": requirements}
+    text = json.dumps(requirements).lower()
+    text_tokens = set(tokenize(text))
+    detailed = requirements.get("detailed_input") or {}
+    form = detailed.get("requirements") or {}
+
+    compliance = {_normalize(c) for c in form.get("compliance", []) if c != "None"}
+    if not compliance:
+        compliance = {_normalize(c) for c in KNOWN_COMPLIANCE if _normalize(c) in _normalize(text)}
+
+    integrations = form.get("integrations", "")
+    if isinstance(integrations, str):
+        integrations = integrations.split(",")
+    integrations = {_normalize(i) for i in integrations if i.strip()}
+    if not integrations:
+        integrations = {
+            _normalize(i) for i in known_integrations
+            if set(tokenize(i)) <= text_tokens
+        }
+
+    category_keywords = set()
+    for use_case in form.get("use_case", []):
+        category_keywords.update(USE_CASE_CATEGORIES.get(use_case, tokenize(use_case)))
+    category_keywords.update(tokenize(form.get("description", "")))
+    if not category_keywords:
+        category_keywords = text_tokens
+    category_keywords -= STOPWORDS
+
+    return {
+        "compliance": compliance,
+        "integrations": integrations,
+        "category_keywords": category_keywords
+    }
+
+def requirements_text(requirements):
+    """Free text of the requirements (string values only) for semantic retrieval"""
+    if isinstance(requirements, str):
+        return requirements
+    if isinstance(requirements, dict):
+        return " ".join(requirements_text(value) for value in requirements.values())
+    if isinstance(requirements, list):
+        return " ".join(requirements_text(value) for value in requirements)
+    return ""
+
+def _coverage(required, offered, partial=False):
+    """Fraction of required items the vendor offers (1.0 when nothing is required)"""
+    if not required:
+        return 1.0
+    if partial:
+        offered_tokens = [set(item.split()) for item in offered]
+        matched = sum(1 for item in required if any(set(item.split()) <= o for o in offered_tokens))
+    else:
+        matched = len(required & offered)
+    return matched / len(required)
+
+def score_vendor(vendor, profile):
+    """Score one vendor record (0-100) against a requirement profile"""
+    compliance = {_normalize(c) for c in vendor.get("compliance", [])}
+    integrations = {_normalize(i) for i in vendor.get("integrations", [])}
+    category_tokens = set(tokenize(vendor.get("category", ""))) - STOPWORDS
+
+    breakdown = {
+        "compliance": _coverage(profile["compliance"], compliance),
+        "integrations": _coverage(profile["integrations"], integrations, partial=True),
+        "category": (
+            len(category_tokens & profile["category_keywords"]) / len(category_tokens)
+            if category_tokens else 0.0
+        ),
+        "enterprise_fit": vendor.get("enterprise_fit", 70) / 100,
+        "adoption": vendor.get("adoption_score", 70) / 100
+    }
+    score = 100 * sum(SCORING_WEIGHTS[factor] * value for factor, value in breakdown.items())
+    return round(score, 1), {factor: round(value, 2) for factor, value in breakdown.items()}
+
+def rank_vendors(vendors, requirements, top_k=5):
+    """Rank vendor records locally and return the top_k with their match scores"""
+    vendors = list(vendors)
+    known_integrations = {i for vendor in vendors for i in vendor.get("integrations", [])}
+    profile = build_requirement_profile(requirements, known_integrations)
+
+    scored = []
+    for vendor in vendors:
+        score, breakdown = score_vendor(vendor, profile)
+        scored.append(dict(vendor, match_score=score, match_breakdown=breakdown))
+    scored.sort(key=lambda v: v["match_score"], reverse=True)
+    return scored[:top_k]
+
+# Adoption probability penalties for requirement complexity
+INTEGRATION_PENALTY = 5
+COMPLIANCE_PENALTY = 3
+MAX_ADOPTION_PROBABILITY = 95
+
+def adoption_penalty(requirements):
+    """Complexity penalty for a requirements object, extracted once per request"""
+    text = str(requirements).lower()
+    return INTEGRATION_PENALTY * ("integration" in text) + COMPLIANCE_PENALTY * ("compliance" in text)
+
+def adoption_probabilities(adoption_scores, enterprise_fit, penalty):
+    """Vectorized adoption probability for arrays of adoption_score and enterprise_fit"""
+    scores = (np.asarray(adoption_scores, dtype=float) + np.asarray(enterprise_fit, dtype=float)) / 2 - penalty
+    return np.minimum(MAX_ADOPTION_PROBABILITY, scores)
+
+def adoption_confidence_levels(probabilities):
+    return np.select([probabilities > 80, probabilities > 60], ["High", "Medium"], "Low")
@@ -0,0 +1,256 @@
+import threading
+import time
+from concurrent.futures import Future, ThreadPoolExecutor, wait
+
+# Worker threads shared by every workflow run in the process
+MAX_WORKERS = 8
+
+_executor = None
+_executor_lock = threading.Lock()
+
+def get_executor():
+    """Process-wide thread pool that runs workflow nodes"""
+    global _executor
+    with _executor_lock:
+        if _executor is None:
+            _executor = ThreadPoolExecutor(max_workers=MAX_WORKERS, thread_name_prefix="workflow")
+        return _executor
+
+class WorkflowError(Exception):
+    """A node could not run because a node it depends on failed"""
+
+class Node:
+    def __init__(self, name, func, deps=(), background=False):
+        self.name = name
+        self.func = func
+        self.deps = tuple(deps)
+        self.background = background
+
+class Workflow:
+    """Small DAG executor for the consultant pipeline
+
+    Each node is a function called with the results of its dependencies as
+    keyword arguments. Dependencies that are not nodes are inputs supplied
+    to start()/run(). Nodes run as soon as their dependencies finish, so
+    independent branches overlap; background nodes never block run().
+    """
+
+    def __init__(self, executor=None):
+        self.nodes = {}
+        self.executor = executor
+
+    def add(self, name, func, deps=(), background=False):
+        self.nodes[name] = Node(name, func, deps, background)
+        return self
+
+    def _required(self, targets):
+        """Targets plus every node they transitively depend on"""
+        required = set()
+        pending = list(targets)
+        while pending:
+            name = pending.pop()
+            if name in required or name not in self.nodes:
+                continue
+            required.add(name)
+            pending.extend(self.nodes[name].deps)
+        return required
+
+    def start(self, values, targets=None):
+        """Schedule the nodes needed for targets (default: all) and return immediately
+
+        values holds workflow inputs and may also seed results of nodes that
+        were already computed, e.g. earlier steps kept in session state.
+        """
+        unknown = [name for name in targets or () if name not in self.nodes]
+        if unknown:
+            raise KeyError(f"Unknown workflow node(s): {', '.join(unknown)}")
+        required = self._required(targets or self.nodes) - set(values)
+        missing = {
+            dep for name in required for dep in self.nodes[name].deps
+            if dep not in self.nodes and dep not in values
+        }
+        if missing:
+            raise ValueError(f"Missing workflow input(s): {', '.join(sorted(missing))}")
+
+        run = WorkflowRun(self, values, required, self.executor or get_executor())
+        run._schedule_ready()
+        return run
+
+    def run(self, values, targets=None, timeout=None):
+        """Run to completion and return all results; background nodes keep running"""
+        run = self.start(values, targets)
+        run.wait(timeout=timeout)
+        return run.results()
+
+class WorkflowRun:
+    """Handle on one execution: per-node futures, status and timings"""
+
+    def __init__(self, workflow, values, required, executor):
+        self.workflow = workflow
+        self.executor = executor
+        self.futures = {}
+        self.timings = {}
+        self._submitted = set()
+        self._lock = threading.Lock()
+
+        for name, value in values.items():
+            future = Future()
+            future.set_result(value)
+            self.futures[name] = future
+        for name in workflow.nodes:
+            if name in required:
+                self.futures[name] = Future()
+
+    def _deps_done(self, node):
+        return all(self.futures[dep].done() for dep in node.deps)
+
+    def _schedule_ready(self):
+        with self._lock:
+            ready = [
+                self.workflow.nodes[name] for name, future in self.futures.items()
+                if name in self.workflow.nodes and name not in self._submitted
+                and not future.done() and self._deps_done(self.workflow.nodes[name])
+            ]
+            self._submitted.update(node.name for node in ready)
+        for node in ready:
+            self.executor.submit(self._execute, node)
+
+    def _execute(self, node):
+        future = self.futures[node.name]
+        failed = [dep for dep in node.deps if self.futures[dep].exception() is not None]
+        if failed:
+            future.set_exception(WorkflowError(f"'{node.name}' skipped because '{failed[0]}' failed"))
+        else:
+            started = time.perf_counter()
+            try:
+                result = node.func(**{dep: self.futures[dep].result() for dep in node.deps})
+            except Exception as e:
+                future.set_exception(e)
+            else:
+                future.set_result(result)
+            finally:
+                self.timings[node.name] = round((time.perf_counter() - started) * 1000, 1)
+        self._schedule_ready()
+
+    def done(self, name):
+        return self.futures[name].done()
+
+    def result(self, name, timeout=None):
+        """Block until the node finishes and return its result (re-raising its error)"""
+        return self.futures[name].result(timeout=timeout)
+
+    def status(self):
+        """Node name -> pending, running, done or failed, in declaration order"""
+        statuses = {}
+        for name, future in self.futures.items():
+            if name not in self.workflow.nodes:
+                continue
+            if future.done():
+                statuses[name] = "failed" if future.exception() is not None else "done"
+            else:
+                statuses[name] = "running" if name in self._submitted else "pending"
+        return statuses
+
+    def wait(self, timeout=None, include_background=False):
+        """Wait for the foreground nodes (or all nodes) to finish
+
+        Re-raises the root failure rather than the WorkflowError of a node
+        that was skipped because of it.
+        """
+        futures = [
+            future for name, future in self.futures.items()
+            if include_background or not getattr(self.workflow.nodes.get(name), "background", False)
+        ]
+        _, not_done = wait(futures, timeout=timeout)
+        if not_done:
+            raise TimeoutError(f"Workflow still running after {timeout}s")
+        errors = [future.exception() for future in futures if future.exception() is not None]
+        if errors:
+            raise next((e for e in errors if not isinstance(e, WorkflowError)), errors[0])
+
+    def results(self):
+        """Results of every node that has finished successfully so far"""
+        return {
+            name: future.result() for name, future in self.futures.items()
+            if future.done() and future.exception() is None
+        }
+
+def compile_request_text(detailed_input):
+    """Prompt text for gather_requirements from the step 1 form fields (detailed_input)"""
+    organization = detailed_input.get("organization") or {}
+    requirements = detailed_input.get("requirements") or {}
+    budget = detailed_input.get("budget_timeline") or {}
+    context = detailed_input.get("additional_context") or {}
+    use_case = requirements.get("use_case")
+    compliance = requirements.get("compliance")
+    return f"""
+Organization Details:
+- Company Size: {organization.get("company_size")}
+- Team Size: {organization.get("team_size")} users
+- Country: {organization.get("country")}
+- Industry: {organization.get("industry")}
+
+Requirements:
+{requirements.get("description", "")}
+
+Use Cases: {', '.join(use_case) if use_case else 'Not specified'}
+Required Integrations: {requirements.get("integrations")}
+Compliance Requirements: {', '.join(compliance) if compliance else 'None'}
+Priority: {requirements.get("priority")}
+
+Budget & Timeline:
+- Budget Range: {budget.get("budget_range")}
+- Time to Decision: {budget.get("max_time_to_decision")}
+- Deployment: {budget.get("deployment_preference")}
+- Support Level: {budget.get("support_level")}
+
+Pain Points: {context.get("pain_points")}
+Success Criteria: {context.get("success_criteria")}
+"""
+
+def vendor_names(vendor_matches):
+    """Vendor names from either the app's top_matches shape or match_vendors output"""
+    vendors = vendor_matches.get("top_matches") or vendor_matches.get("vendors") or []
+    return [vendor["name"] for vendor in vendors if isinstance(vendor, dict) and vendor.get("name")]
+
+def split_evaluations(evaluations):
+    """(successful, failed_vendor_names) for simulate_poc_evaluations output"""
+    failed = [name for name, result in evaluations.items() if "error" in result or "parse_error" in result]
+    return {name: result for name, result in evaluations.items() if name not in failed}, failed
+
+def build_consultant_workflow(agents, executor=None):
+    """The consultant pipeline as a DAG over the agent registry
+
+    Inputs: request_text (the compiled form text) and detailed_input (the raw
+    form fields). The RFP is a background branch off requirements; confidence
+    and the recommendation both only need the evaluations and run side by side.
+    """
+    def requirements(request_text, detailed_input):
+        result = agents['requirements'].gather_requirements(request_text)
+        result['detailed_input'] = detailed_input
+        return result
+
+    def evaluations(rubric, vendor_matches):
+        return agents['poc_evaluation'].simulate_poc_evaluations(rubric, vendor_names(vendor_matches))
+
+    def recommendation(requirements, vendor_matches, evaluations):
+        successful, _ = split_evaluations(evaluations)
+        return agents['recommendation'].generate_final_recommendation(requirements, vendor_matches, successful)
+
+    def confidence(evaluations, rubric):
+        successful, _ = split_evaluations(evaluations)
+        return agents['recommendation'].calculate_confidence_score(successful, rubric)
+
+    return (
+        Workflow(executor)
+        .add("requirements", requirements, deps=("request_text", "detailed_input"))
+        .add("rfp", lambda requirements: agents['requirements'].generate_rfp(requirements),
+             deps=("requirements",), background=True)
+        .add("vendor_matches", lambda requirements: agents['vendor_matching'].match_vendors(requirements),
+             deps=("requirements",))
+        .add("rubric", lambda requirements, vendor_matches: agents['poc_evaluation'].create_poc_rubric(
+            requirements, vendor_matches), deps=("requirements", "vendor_matches"))
+        .add("evaluations", evaluations, deps=("rubric", "vendor_matches"))
+        .add("recommendation", recommendation, deps=("requirements", "vendor_matches", "evaluations"))
+        .add("confidence", confidence, deps=("evaluations", "rubric"))
+    )
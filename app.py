@@ -1,11 +1,22 @@
 import streamlit as st
 import os
 import json
+import time
+from html import escape
 from dotenv import load_dotenv
-from agents.requirements_agent import RequirementsAgent
-from agents.vendor_matching_agent import VendorMatchingAgent
-from agents.poc_evaluation_agent import POCEvaluationAgent
-from agents.recommendation_agent import RecommendationAgent
+from agents.incremental import (
+    ARTIFACT_INPUTS, backfill_fingerprints, changed_sections, check_artifacts, input_fingerprint, input_fingerprints
+)
+from agents.instrumentation import get_default_tracer
+from agents.jobs import CANCELLED, DONE, get_job_queue, wait_for_nodes
+from agents.llm_backend import get_default_backend
+from agents.llm_cache import get_default_cache
+from agents.rate_limit import get_default_guard
+from agents.registry import AgentRegistry
+from agents.run_store import get_default_run_store
+from agents.workflow import build_consultant_workflow, compile_request_text, split_evaluations
+from catalog.search_index import CatalogIndex
+from catalog.store import get_catalog
 
 # Load environment variables from .env file
 load_dotenv()
@@ -28,51 +39,91 @@ if 'poc_rubric' not in st.session_state:
     st.session_state.poc_rubric = None
 if 'evaluations' not in st.session_state:
     st.session_state.evaluations = None
+# Session keys checkpointed to the run store so an analysis survives reloads
+CHECKPOINT_KEYS = [
+    'step', 'requirements', 'vendors', 'rfp', 'poc_rubric', 'evaluations', 'failed_evaluations', 'final_report',
+    'detailed_requirements', 'artifact_inputs'
+]
+# Slot name -> job id of the background job currently running for it
+if 'active_jobs' not in st.session_state:
+    st.session_state.active_jobs = {}
+# Job id -> result, filled in once a job finishes
+if 'job_results' not in st.session_state:
+    st.session_state.job_results = {}
 
 def initialize_agents():
     """Initialize all agents with OpenAI API key"""
     api_key = os.getenv("OPENAI_API_KEY")
-    if not api_key:
-        st.error("Please set your OPENAI_API_KEY environment variable")
+    if not api_key and get_default_backend().requires_api_key:
+        st.error("Please set your OPENAI_API_KEY environment variable (or SAASITIS_LLM_BACKEND=stub to run offline)")
         st.stop()
     
+    return get_agents(api_key)
+
+@st.cache_resource
+def get_agents(api_key):
+    """Build the agent registry once per process and share it across reruns and sessions
+    
+    Agents (and langchain/openai) are imported lazily the first time a step uses them.
+    """
+    return AgentRegistry(api_key)
+
+# Demo shortlist shown in step 2: catalog vendor name -> fit score
+DEMO_MATCHES = {"Coactive AI": 92, "Cohere": 95}
+DEMO_REASONING = "Based on your requirements for AI infrastructure, these two vendors offer the best combination of enterprise readiness, compliance, and proven technology."
+
+def get_demo_matches():
+    """Demo vendor matches built from the catalog records"""
+    catalog = get_catalog()
     return {
-        'requirements': RequirementsAgent(api_key),
-        'vendor_matching': VendorMatchingAgent(api_key),
-        'poc_evaluation': POCEvaluationAgent(api_key),
-        'recommendation': RecommendationAgent(api_key)
+        "top_matches": [
+            dict(catalog.get(name).to_dict(), fit_score=fit_score) for name, fit_score in DEMO_MATCHES.items()
+        ],
+        "reasoning": DEMO_REASONING
     }
 
-def get_marketplace_data():
-    """Return marketplace data for all SaaS tools"""
-    return [
-        {"name": "Abridge", "description": "AI notetaker for doctors", "funding": "$458M", "year": 2018, "city": "San Francisco", "country": "United States", "category": "Healthcare", "icon": "🏥"},
-        {"name": "Anthropic", "description": "AI model developer", "funding": "$17B", "year": 2020, "city": "San Francisco", "country": "United States", "category": "AI Infrastructure", "icon": "🤖"},
-        {"name": "Anysphere", "description": "AI coding tools", "funding": "$176M", "year": 2022, "city": "San Francisco", "country": "United States", "category": "Development", "icon": "💻"},
-        {"name": "Baseten", "description": "AI app deployment software", "funding": "$135M", "year": 2019, "city": "San Francisco", "country": "United States", "category": "DevOps", "icon": "🚀"},
-        {"name": "Captions", "description": "Video editor", "funding": "$100M", "year": 2021, "city": "New York", "country": "United States", "category": "Media", "icon": "🎬"},
-        {"name": "Clay", "description": "AI go-to-market tools", "funding": "$104M", "year": 2017, "city": "New York", "country": "United States", "category": "Sales", "icon": "📊"},
-        {"name": "Coactive AI", "description": "Data labeling software", "funding": "$44M", "year": 2021, "city": "San Jose", "country": "United States", "category": "AI Infrastructure", "icon": "🏷️"},
-        {"name": "Cohere", "description": "AI model developer", "funding": "$1B", "year": 2019, "city": "Toronto", "country": "Canada", "category": "AI Infrastructure", "icon": "🧠"},
-        {"name": "Crusoe", "description": "AI infrastructure", "funding": "$1.6B", "year": 2018, "city": "San Francisco", "country": "United States", "category": "Infrastructure", "icon": "⚡"},
-        {"name": "Databricks", "description": "Data storage and analytics", "funding": "$19B", "year": 2013, "city": "San Francisco", "country": "United States", "category": "Analytics", "icon": "📈"},
-        {"name": "Decagon", "description": "AI agents for customer service", "funding": "$100M", "year": 2023, "city": "San Francisco", "country": "United States", "category": "Customer Service", "icon": "💬"},
-        {"name": "DeepL", "description": "Language translation service", "funding": "$420M", "year": 2017, "city": "Cologne", "country": "Germany", "category": "Translation", "icon": "🌐"},
-        {"name": "ElevenLabs", "description": "Voice generation software", "funding": "$281M", "year": 2022, "city": "London", "country": "United Kingdom", "category": "AI Tools", "icon": "🎙️"},
-        {"name": "Figure AI", "description": "Humanoid robots", "funding": "$750M", "year": 2022, "city": "San Jose", "country": "United States", "category": "Robotics", "icon": "🤖"},
-        {"name": "Fireworks AI", "description": "AI app development software", "funding": "$77M", "year": 2022, "city": "Redwood City", "country": "United States", "category": "Development", "icon": "🎆"},
-        {"name": "Glean", "description": "Enterprise search engine", "funding": "$600M", "year": 2019, "city": "Palo Alto", "country": "United States", "category": "Search", "icon": "🔍"},
-        {"name": "Harvey", "description": "Legal automation software", "funding": "$500M", "year": 2022, "city": "San Francisco", "country": "United States", "category": "Legal", "icon": "⚖️"},
-        {"name": "Hebbia", "description": "General purpose AI for finance and legal", "funding": "$160M", "year": 2020, "city": "New York", "country": "United States", "category": "Finance", "icon": "💼"},
-        {"name": "Hugging Face", "description": "Open-source library for AI models", "funding": "$395M", "year": 2016, "city": "New York", "country": "United States", "category": "AI Infrastructure", "icon": "🤗"},
-        {"name": "Lambda", "description": "AI cloud provider", "funding": "$863M", "year": 2012, "city": "San Jose", "country": "United States", "category": "Cloud", "icon": "☁️"},
-        {"name": "LangChain", "description": "AI app development tools", "funding": "$35M", "year": 2023, "city": "San Francisco", "country": "United States", "category": "Development", "icon": "🔗"},
-        {"name": "Luminance", "description": "Enterprise contract automation", "funding": "$165M", "year": 2015, "city": "Cambridge", "country": "United Kingdom", "category": "Legal", "icon": "📄"},
-        {"name": "Mercor", "description": "AI-powered hiring platform", "funding": "$135M", "year": 2023, "city": "San Francisco", "country": "United States", "category": "HR", "icon": "👥"},
-        {"name": "Midjourney", "description": "Image generation service", "funding": "$0M", "year": 2021, "city": "San Francisco", "country": "United States", "category": "AI Tools", "icon": "🎨"},
-    ]
+MARKETPLACE_PAGE_SIZES = [12, 24, 48, 96]
+# Nearest vendors fetched for a semantic marketplace search
+SEMANTIC_SEARCH_K = 96
+
+MARKETPLACE_CSS = """
+<style>
+.mp-grid { display: grid; grid-template-columns: repeat(3, minmax(0, 1fr)); gap: 24px; }
+.mp-card {
+    border: 1px solid #ddd; border-radius: 12px; padding: 20px; height: 280px;
+    background: linear-gradient(135deg, #f5f7fa 0%, #c3cfe2 100%);
+    box-shadow: 0 4px 6px rgba(0,0,0,0.1);
+}
+.mp-icon { font-size: 48px; text-align: center; margin-bottom: 10px; }
+.mp-card h3 { text-align: center; margin: 10px 0; color: #1f2937; }
+.mp-desc { text-align: center; color: #6b7280; font-size: 14px; margin: 8px 0; }
+.mp-meta { margin-top: 15px; padding-top: 15px; border-top: 1px solid #e5e7eb; }
+.mp-row { display: flex; justify-content: space-between; margin: 5px 0; font-size: 12px; }
+.mp-row span { color: #6b7280; }
+.mp-row b { color: #1f2937; }
+.mp-tag-row { text-align: center; margin-top: 10px; }
+.mp-tag {
+    background: #3b82f6; color: white; padding: 4px 12px;
+    border-radius: 12px; font-size: 11px; font-weight: 500;
+}
+.mp-list-row {
+    display: grid; grid-template-columns: 32px 160px 1fr 160px 220px; align-items: center;
+    gap: 12px; padding: 8px 12px; border-bottom: 1px solid #e5e7eb; font-size: 14px;
+}
+.mp-list-row .mp-desc { text-align: left; margin: 0; }
+.mp-list-row .mp-tag { justify-self: start; }
+.mp-list-icon { font-size: 22px; }
+</style>
+"""
+
+@st.cache_resource
+def get_marketplace_index():
+    """Build the marketplace search index over the listed catalog vendors once per process"""
+    return CatalogIndex([record.to_dict() for record in get_catalog().listed()])
 
 def main():
+    restore_run()
+    
     st.title("🤖 SaaSItIs - Multi-Agent Enterprise SaaS Consultant")
     st.markdown("*Transform your enterprise SaaS procurement with AI-powered agents*")
     
@@ -109,6 +160,17 @@ def render_consultant_workflow(agents):
     # Step 1: Requirements Gathering
     if st.session_state.step == 1:
         st.header("Step 1: Requirements Gathering")
+        
+        job = take_finished_job('requirements')
+        if job is not None and job.status == DONE:
+            # The RFP keeps drafting in the background after this
+            result = st.session_state.job_results[job.id]
+            st.session_state.workflow_run = result['workflow_run']
+            st.session_state.updated_sections = result['sections']
+            save_artifacts(requirements=result['requirements'], detailed_requirements=result['detailed_input'], step=2)
+            st.rerun()
+        elif job is not None:
+            show_job_failure(job, "Requirements analysis")
         st.markdown("Provide detailed information about your SaaS needs and our AI will structure them into comprehensive requirements.")
         
         # Check if we should use sample data
@@ -116,6 +178,9 @@ def render_consultant_workflow(agents):
         if use_sample:
             st.session_state.use_sample_data = False  # Reset flag
         
+        # Prefill with the last analyzed form so edits can be re-analyzed incrementally
+        form = {} if use_sample else (st.session_state.get('detailed_requirements') or {})
+        
         # Organization Details
         st.subheader("🏢 Organization Details")
         col1, col2 = st.columns(2)
@@ -124,21 +189,22 @@ def render_consultant_workflow(agents):
             company_size = st.selectbox(
                 "Company Size",
                 company_size_options,
-                index=2 if use_sample else 0
+                index=saved_index(form, "organization.company_size", company_size_options, 2 if use_sample else 0)
             )
-            team_size = st.number_input("Team Size (users who will use this tool)", min_value=1, max_value=10000, value=150 if use_sample else 50)
+            team_size = st.number_input("Team Size (users who will use this tool)", min_value=1, max_value=10000,
+                                        value=saved_field(form, "organization.team_size", 150 if use_sample else 50))
         with col2:
             country_options = ["United States", "United Kingdom", "Canada", "Germany", "France", "India", "Australia", "Singapore", "Other"]
             country = st.selectbox(
                 "Primary Country of Operations",
                 country_options,
-                index=0 if use_sample else 0
+                index=saved_index(form, "organization.country", country_options, 0)
             )
             industry_options = ["Technology", "Finance", "Healthcare", "E-commerce", "Manufacturing", "Education", "Media", "Other"]
             industry = st.selectbox(
                 "Industry",
                 industry_options,
-                index=0 if use_sample else 0
+                index=saved_index(form, "organization.industry", industry_options, 0)
             )
         
         # Requirements Details
@@ -155,7 +221,7 @@ We're building customer-facing AI features and need tools that can scale with ou
 
         user_input = st.text_area(
             "Describe your SaaS requirements:",
-            value=sample_requirements if use_sample else "",
+            value=saved_field(form, "requirements.description", sample_requirements if use_sample else ""),
             placeholder="Example: We need an observability platform that integrates with our GitHub workflow, provides <2s latency monitoring, and meets SOC2 compliance requirements...",
             height=120
         )
@@ -166,25 +232,25 @@ We're building customer-facing AI features and need tools that can scale with ou
             use_case = st.multiselect(
                 "Primary Use Case",
                 use_case_options,
-                default=["Development & DevOps", "Analytics"] if use_sample else []
+                default=saved_field(form, "requirements.use_case", ["Development & DevOps", "Analytics"] if use_sample else [])
             )
             compliance_options = ["SOC2", "ISO 27001", "GDPR", "HIPAA", "PCI DSS", "FedRAMP", "None"]
             compliance_requirements = st.multiselect(
                 "Compliance Requirements",
                 compliance_options,
-                default=["SOC2", "GDPR"] if use_sample else []
+                default=saved_field(form, "requirements.compliance", ["SOC2", "GDPR"] if use_sample else [])
             )
         with col4:
             integrations_needed = st.text_input(
                 "Required Integrations (comma-separated)",
-                value="Python, TensorFlow, PyTorch, AWS, GCP, REST API" if use_sample else "",
+                value=saved_field(form, "requirements.integrations", "Python, TensorFlow, PyTorch, AWS, GCP, REST API" if use_sample else ""),
                 placeholder="e.g., GitHub, Slack, Salesforce, AWS"
             )
             priority_options = ["Critical - Immediate Need", "High - Within 1 month", "Medium - Within 3 months", "Low - Exploratory"]
             priority = st.selectbox(
                 "Priority Level",
                 priority_options,
-                index=1 if use_sample else 0
+                index=saved_index(form, "requirements.priority", priority_options, 1 if use_sample else 0)
             )
         
         # Budget & Timeline
@@ -195,26 +261,26 @@ We're building customer-facing AI features and need tools that can scale with ou
             budget_range = st.selectbox(
                 "Annual Budget Range",
                 budget_options,
-                index=3 if use_sample else 0
+                index=saved_index(form, "budget_timeline.budget_range", budget_options, 3 if use_sample else 0)
             )
             time_options = ["1-2 weeks", "2-4 weeks", "1-2 months", "2-3 months", "3-6 months", "6+ months"]
             max_time_to_decision = st.selectbox(
                 "Maximum Time to Find Right Fit",
                 time_options,
-                index=2 if use_sample else 0
+                index=saved_index(form, "budget_timeline.max_time_to_decision", time_options, 2 if use_sample else 0)
             )
         with col6:
             deployment_options = ["Cloud (SaaS)", "On-Premise", "Hybrid", "No Preference"]
             deployment_preference = st.selectbox(
                 "Deployment Preference",
                 deployment_options,
-                index=0 if use_sample else 0
+                index=saved_index(form, "budget_timeline.deployment_preference", deployment_options, 0)
             )
             support_options = ["24/7 Enterprise Support", "Business Hours Support", "Community Support", "Self-Service"]
             support_level = st.selectbox(
                 "Required Support Level",
                 support_options,
-                index=0 if use_sample else 0
+                index=saved_index(form, "budget_timeline.support_level", support_options, 0)
             )
         
         # Additional Context
@@ -235,14 +301,14 @@ We're building customer-facing AI features and need tools that can scale with ou
 
         pain_points = st.text_area(
             "Current Pain Points (What problems are you trying to solve?)",
-            value=sample_pain_points if use_sample else "",
+            value=saved_field(form, "additional_context.pain_points", sample_pain_points if use_sample else ""),
             placeholder="e.g., Manual processes taking too long, lack of visibility, integration issues...",
             height=80
         )
         
         success_criteria = st.text_area(
             "Success Criteria (How will you measure success?)",
-            value=sample_success if use_sample else "",
+            value=saved_field(form, "additional_context.success_criteria", sample_success if use_sample else ""),
             placeholder="e.g., 50% reduction in deployment time, 99.9% uptime, improved team collaboration...",
             height=80
         )
@@ -251,7 +317,7 @@ We're building customer-facing AI features and need tools that can scale with ou
         
         col_btn1, col_btn2 = st.columns([1, 4])
         with col_btn1:
-            if st.button("🔍 Analyze Requirements", type="primary"):
+            if st.button("🔍 Analyze Requirements", type="primary", disabled='requirements' in st.session_state.active_jobs):
                 if user_input:
                     # Compile all inputs into structured format
                     detailed_requirements = {
@@ -280,47 +346,30 @@ We're building customer-facing AI features and need tools that can scale with ou
                         }
                     }
                     
-                    with st.spinner("AI is analyzing your detailed requirements..."):
-                        # Create comprehensive input for the agent
-                        full_input = f"""
-                        Organization Details:
-                        - Company Size: {company_size}
-                        - Team Size: {team_size} users
-                        - Country: {country}
-                        - Industry: {industry}
-                        
-                        Requirements:
-                        {user_input}
-                        
-                        Use Cases: {', '.join(use_case) if use_case else 'Not specified'}
-                        Required Integrations: {integrations_needed}
-                        Compliance Requirements: {', '.join(compliance_requirements) if compliance_requirements else 'None'}
-                        Priority: {priority}
-                        
-                        Budget & Timeline:
-                        - Budget Range: {budget_range}
-                        - Time to Decision: {max_time_to_decision}
-                        - Deployment: {deployment_preference}
-                        - Support Level: {support_level}
-                        
-                        Pain Points: {pain_points}
-                        Success Criteria: {success_criteria}
-                        """
-                        
-                        # Gather requirements
-                        requirements = agents['requirements'].gather_requirements(full_input)
-                        requirements['detailed_input'] = detailed_requirements
-                        st.session_state.requirements = requirements
-                        
-                        # Generate RFP
-                        rfp = agents['requirements'].generate_rfp(requirements)
-                        st.session_state.rfp = rfp
-                        
-                        st.session_state.step = 2
-                        st.rerun()
+                    # Create comprehensive input for the agent
+                    full_input = compile_request_text(detailed_requirements)
+                    
+                    # Structure requirements on a worker; the page polls for the result.
+                    # Re-analyzing an edited form stays in the same run and only redoes what changed.
+                    previous = None
+                    if st.session_state.get('run_id') and st.session_state.get('detailed_requirements') and st.session_state.get('requirements'):
+                        run_id = st.session_state.run_id
+                        previous = {
+                            "detailed_input": st.session_state.detailed_requirements,
+                            "requirements": st.session_state.requirements,
+                            "rfp": st.session_state.get('rfp')
+                        }
+                    else:
+                        run_id = start_run(user_input)
+                    start_job('requirements', "Analyze requirements", analyze_requirements_job,
+                              agents, full_input, detailed_requirements, run_id, previous)
+                    st.rerun()
                 else:
                     st.error("Please describe your requirements first.")
         
+        if 'requirements' in st.session_state.active_jobs:
+            render_job_progress('requirements')
+        
         # Show example
         with st.expander("💡 Load Sample Data"):
             if st.button("📝 Fill Form with Sample Data"):
@@ -342,6 +391,13 @@ We're building customer-facing AI features and need tools that can scale with ou
         st.header("Step 2: Vendor Matching & Analysis")
         
         if st.session_state.requirements:
+            sections = st.session_state.get('updated_sections')
+            if sections is not None:
+                st.info("♻️ Incremental update: " + (
+                    f"re-analyzed {', '.join(s.replace('_', ' ') for s in sections)}; other sections were kept."
+                    if sections else "no requirement fields changed; the previous analysis was kept."
+                ))
+            
             # Show structured requirements
             with st.expander("📋 Structured Requirements"):
                 st.json(st.session_state.requirements)
@@ -351,70 +407,37 @@ We're building customer-facing AI features and need tools that can scale with ou
                 if st.button("🎯 Find Matching Vendors", type="primary"):
                     with st.spinner("AI is analyzing vendor database..."):
                         # For demo, show Coactive AI and Cohere as top matches
-                        demo_vendors = {
-                            "top_matches": [
-                                {
-                                    "name": "Coactive AI",
-                                    "category": "AI Infrastructure",
-                                    "description": "Data labeling software",
-                                    "fit_score": 92,
-                                    "strengths": ["AI-powered data labeling", "Computer vision support", "Model training optimization"],
-                                    "integrations": ["Python", "TensorFlow", "PyTorch", "AWS", "GCP"],
-                                    "compliance": ["SOC2", "GDPR"],
-                                    "pricing_model": "Usage-based",
-                                    "adoption_score": 88,
-                                    "funding": "$44M",
-                                    "year_founded": 2021,
-                                    "location": "San Jose, United States",
-                                    "icon": "🏷️",
-                                    "website": "https://coactive.ai",
-                                    "pros": [
-                                        "Excellent for training ML models with high-quality labeled data",
-                                        "Strong computer vision capabilities",
-                                        "Scales well for enterprise needs"
-                                    ],
-                                    "cons": [
-                                        "Relatively new (founded 2021)",
-                                        "Smaller funding compared to competitors"
-                                    ]
-                                },
-                                {
-                                    "name": "Cohere",
-                                    "category": "AI Infrastructure",
-                                    "description": "AI model developer",
-                                    "fit_score": 95,
-                                    "strengths": ["Enterprise LLMs", "Customizable models", "Privacy-focused"],
-                                    "integrations": ["REST API", "Python SDK", "AWS", "Azure", "GCP"],
-                                    "compliance": ["SOC2", "GDPR", "HIPAA"],
-                                    "pricing_model": "API-based",
-                                    "adoption_score": 90,
-                                    "funding": "$1B",
-                                    "year_founded": 2019,
-                                    "location": "Toronto, Canada",
-                                    "icon": "🧠",
-                                    "website": "https://cohere.com",
-                                    "pros": [
-                                        "Industry-leading enterprise LLM capabilities",
-                                        "Strong focus on data privacy and security",
-                                        "Well-funded with proven track record",
-                                        "Excellent HIPAA compliance"
-                                    ],
-                                    "cons": [
-                                        "Higher pricing for premium features",
-                                        "Based in Canada (may affect data residency)"
-                                    ]
-                                }
-                            ],
-                            "reasoning": "Based on your requirements for AI infrastructure, these two vendors offer the best combination of enterprise readiness, compliance, and proven technology."
-                        }
-                        st.session_state.vendors = demo_vendors
-                        st.session_state.step = 3
+                        save_artifacts(vendors=get_demo_matches(), step=3)
                         st.rerun()
+                if artifact_ready('vendors') and st.button("➡️ Keep Current Matches"):
+                    checkpoint(step=3)
+                    st.rerun()
             
             with col2:
                 if st.button("⬅️ Back to Requirements"):
-                    st.session_state.step = 1
+                    checkpoint(step=1)
                     st.rerun()
+            
+            # Generated RFP, drafted in the background since step 1
+            st.subheader("📄 Request for Proposal")
+            run = st.session_state.get('workflow_run')
+            if not st.session_state.get('rfp') and run is not None:
+                if run.done('rfp'):
+                    try:
+                        save_artifacts(rfp=run.result('rfp'))
+                    except Exception as e:
+                        st.warning(f"RFP generation failed: {e}")
+                else:
+                    render_rfp_progress()
+            
+            if st.session_state.get('rfp'):
+                with st.expander("View generated RFP"):
+                    st.markdown(st.session_state.rfp)
+            elif run is None:
+                # Resumed run whose RFP was never saved
+                save_artifacts(rfp=st.write_stream(
+                    agents['requirements'].stream_rfp(st.session_state.requirements)
+                ))
         else:
             st.error("No requirements found. Please go back to Step 1.")
     
@@ -497,30 +520,42 @@ We're building customer-facing AI features and need tools that can scale with ou
             
             st.divider()
             
+            job = take_finished_job('poc')
+            if job is not None and job.status == DONE:
+                results = st.session_state.job_results[job.id]
+                evaluations, failed = split_evaluations(results["evaluations"])
+                if evaluations:
+                    save_artifacts(
+                        poc_rubric=results["rubric"],
+                        failed_evaluations=failed,
+                        evaluations=evaluations,
+                        step=4
+                    )
+                    st.rerun()
+                st.error("POC evaluation failed for all vendors. Please try again.")
+            elif job is not None:
+                show_job_failure(job, "POC evaluation")
+            
             col1, col2, col3 = st.columns([1, 1, 2])
             with col1:
-                if st.button("📊 Create POC Rubric", type="primary"):
-                    with st.spinner("Creating custom evaluation rubric..."):
-                        rubric = agents['poc_evaluation'].create_poc_rubric(
-                            st.session_state.requirements, 
-                            st.session_state.vendors
-                        )
-                        st.session_state.poc_rubric = rubric
-                        
-                        # Simulate evaluations for demo
-                        evaluations = {}
-                        for vendor in vendors:
-                            evaluations[vendor['name']] = agents['poc_evaluation'].simulate_poc_evaluation(
-                                rubric, vendor['name']
-                            )
-                        st.session_state.evaluations = evaluations
-                        st.session_state.step = 4
-                        st.rerun()
+                if st.button("📊 Create POC Rubric", type="primary", disabled='poc' in st.session_state.active_jobs):
+                    start_job('poc', "Create POC rubric", poc_evaluation_job,
+                              agents, st.session_state.requirements, st.session_state.vendors, st.session_state.run_id)
+                    st.rerun()
             
             with col2:
                 if st.button("⬅️ Back to Requirements"):
-                    st.session_state.step = 1
+                    checkpoint(step=1)
+                    st.rerun()
+            
+            with col3:
+                # Evaluations whose rubric and vendors are unchanged since they ran
+                if artifact_ready('evaluations') and st.button("➡️ Keep Current Evaluations"):
+                    checkpoint(step=4)
                     st.rerun()
+            
+            if 'poc' in st.session_state.active_jobs:
+                render_job_progress('poc')
         else:
             st.error("No vendor matches found. Please go back to Step 2.")
     
@@ -529,54 +564,77 @@ We're building customer-facing AI features and need tools that can scale with ou
         st.header("Step 4: Final Recommendations")
         
         if st.session_state.evaluations:
+            job = take_finished_job('report')
+            if job is not None and job.status == DONE:
+                save_artifacts(final_report=st.session_state.job_results[job.id])
+            elif job is not None:
+                show_job_failure(job, "Report generation")
+            
+            if st.session_state.get('failed_evaluations'):
+                st.warning(f"POC evaluation failed for: {', '.join(st.session_state.failed_evaluations)}. "
+                           "Results below cover the remaining vendors.")
+            
             # Show POC rubric
             with st.expander("📏 POC Evaluation Rubric"):
                 st.json(st.session_state.poc_rubric)
             
+            # Ranking computed locally from the rubric weights and criterion scores
+            # (imported here: numpy and pydantic are not needed before step 4)
+            from agents.rubric_scoring import rank_vendors
+            ranking = rank_vendors(st.session_state.poc_rubric, st.session_state.evaluations)
+            if ranking:
+                st.markdown("### 🏆 Weighted Rubric Ranking")
+                st.dataframe([
+                    {"Rank": row["rank"], "Vendor": row["vendor"], "Weighted Score (1-5)": row["weighted_total"],
+                     "Below Threshold": ", ".join(row["threshold_failures"]) or "—"}
+                    for row in ranking
+                ], hide_index=True, use_container_width=True)
+            
             # Show evaluations
             with st.expander("📈 POC Evaluation Results"):
                 st.json(st.session_state.evaluations)
             
             col1, col2, col3 = st.columns([1, 1, 2])
             with col1:
-                if st.button("🎯 Generate Final Report", type="primary"):
-                    with st.spinner("Synthesizing final recommendations..."):
-                        recommendation = agents['recommendation'].generate_final_recommendation(
-                            st.session_state.requirements,
-                            st.session_state.vendors,
-                            st.session_state.evaluations
-                        )
-                        
-                        # Display recommendation
-                        st.success("✅ Analysis Complete!")
-                        st.markdown("### 📊 Executive Recommendation Report")
-                        st.markdown(recommendation)
-                        
-                        # Show confidence score
-                        confidence = agents['recommendation'].calculate_confidence_score(
-                            st.session_state.evaluations
-                        )
-                        
-                        st.markdown("### 🎯 Decision Confidence")
-                        col_conf1, col_conf2 = st.columns(2)
-                        with col_conf1:
-                            st.metric("Confidence Score", f"{confidence['confidence_score']}%")
-                        with col_conf2:
-                            st.metric("Confidence Level", confidence['confidence_level'])
+                if st.button("🎯 Generate Final Report", type="primary", disabled='report' in st.session_state.active_jobs):
+                    start_job('report', "Generate final report", final_report_job, agents,
+                              st.session_state.requirements, st.session_state.vendors, st.session_state.evaluations,
+                              st.session_state.get('poc_rubric'), st.session_state.run_id)
+                    st.rerun()
             
             with col2:
                 if st.button("🔄 Start New Analysis"):
-                    # Reset session state
-                    for key in ['step', 'requirements', 'vendors', 'poc_rubric', 'evaluations']:
-                        if key in st.session_state:
-                            del st.session_state[key]
-                    st.session_state.step = 1
+                    # The finished run stays in the store and can be resumed from the sidebar
+                    reset_analysis()
                     st.rerun()
             
             with col3:
                 if st.button("⬅️ Back to POC"):
-                    st.session_state.step = 3
+                    checkpoint(step=3)
                     st.rerun()
+            
+            if 'report' in st.session_state.active_jobs:
+                # Streamed text appears as the worker receives it
+                st.markdown("### 📊 Executive Recommendation Report")
+                render_job_progress('report')
+            elif st.session_state.get('final_report'):
+                report = st.session_state.final_report
+                st.markdown("### 📊 Executive Recommendation Report")
+                st.markdown(report['report'])
+                st.success("✅ Analysis Complete!")
+                
+                # Show confidence score
+                confidence = report['confidence']
+                st.markdown("### 🎯 Decision Confidence")
+                col_conf1, col_conf2 = st.columns(2)
+                with col_conf1:
+                    st.metric("Confidence Score", f"{confidence['confidence_score']}%")
+                with col_conf2:
+                    st.metric("Confidence Level", confidence['confidence_level'])
+                if confidence.get('needs_reevaluation'):
+                    weakest = min(confidence['contributing_factors'], key=confidence['contributing_factors'].get)
+                    st.warning(f"⚠️ Low confidence — consider re-running the POC evaluations "
+                               f"(weakest factor: {weakest.replace('_', ' ')})")
         else:
             st.error("No evaluations found. Please go back to Step 3.")
     
@@ -611,102 +669,388 @@ We're building customer-facing AI features and need tools that can scale with ou
             ✅ Multi-stakeholder coordination
             ✅ Data-driven confidence scoring
             """)
+        
+        render_saved_runs()
+        render_telemetry_panel()
+
+def analyze_requirements_job(job, agents, full_input, detailed_requirements, run_id, previous=None):
+    """Structure the requirements and leave the RFP drafting in the background
+    
+    previous holds the run's last analysis (detailed_input, requirements and
+    rfp). Then only the requirement sections fed by edited form fields are
+    re-extracted, and the RFP is kept when the requirements it reads are
+    unchanged. result["sections"] lists the updated sections (None after a
+    full analysis).
+    """
+    values = {"request_text": full_input, "detailed_input": detailed_requirements}
+    sections = None
+    if previous is not None:
+        sections = changed_sections(previous["detailed_input"], detailed_requirements, previous["requirements"])
+    if sections is not None:
+        requirements = previous["requirements"]
+        if sections:
+            job.set_progress(0.2, "Updating " + ", ".join(s.replace("_", " ") for s in sections))
+            requirements = agents['requirements'].update_requirements(requirements, full_input, sections)
+        values["requirements"] = {**requirements, "detailed_input": detailed_requirements}
+        if previous.get("rfp") and (input_fingerprint("generate_rfp", values["requirements"])
+                                    == input_fingerprint("generate_rfp", previous["requirements"])):
+            values["rfp"] = previous["rfp"]
+    run = build_consultant_workflow(agents).start(values, targets=["requirements", "rfp"])
+    
+    def save_rfp(future):
+        # Persist the RFP even if the user never returns to step 2
+        if future.exception() is None:
+            save_job_results(run_id, {"rfp": future.result()}, {"requirements": run.result("requirements")})
+    
+    if "rfp" not in values:
+        run.futures["rfp"].add_done_callback(save_rfp)
+    results = wait_for_nodes(job, run, ["requirements"])
+    save_job_results(run_id, {
+        "requirements": results["requirements"], "detailed_requirements": detailed_requirements, "step": 2
+    })
+    return {
+        "requirements": results["requirements"],
+        "detailed_input": detailed_requirements,
+        "sections": sections,
+        "workflow_run": run
+    }
+
+def poc_evaluation_job(job, agents, requirements, vendors, run_id):
+    """Create the rubric, then simulate evaluations for all vendors in parallel"""
+    run = build_consultant_workflow(agents).start(
+        {"requirements": requirements, "vendor_matches": vendors},
+        targets=["evaluations"]
+    )
+    results = wait_for_nodes(job, run, ["rubric", "evaluations"])
+    evaluations, failed = split_evaluations(results["evaluations"])
+    if evaluations:
+        save_job_results(
+            run_id,
+            {"poc_rubric": results["rubric"], "evaluations": evaluations, "failed_evaluations": failed, "step": 4},
+            {"requirements": requirements, "vendors": vendors}
+        )
+    return results
+
+def final_report_job(job, agents, requirements, vendors, evaluations, rubric, run_id):
+    """Stream the final report into job.partial so the page can show it as it arrives"""
+    job.set_progress(0.1, "Writing the recommendation report")
+    chunks = []
+    for chunk in agents['recommendation'].stream_final_recommendation(requirements, vendors, evaluations):
+        job.check_cancelled()
+        chunks.append(chunk)
+        job.partial = "".join(chunks)
+    job.set_progress(0.9, "Scoring decision confidence")
+    confidence = agents['recommendation'].calculate_confidence_score(evaluations, rubric)
+    report = {"report": "".join(chunks), "confidence": confidence}
+    save_job_results(
+        run_id, {"final_report": report},
+        {"requirements": requirements, "vendors": vendors, "poc_rubric": rubric, "evaluations": evaluations}
+    )
+    return report
+
+def save_job_results(run_id, values, inputs=None):
+    """Persist a worker's results, with the fingerprints of what they were built from
+    
+    Workers save as soon as they finish, so a reload or closed tab during a
+    long job doesn't lose paid output. inputs holds the values the results
+    were computed from (the stored run's values are used for the rest).
+    """
+    store = get_default_run_store()
+    saved = store.load(run_id) or {}
+    state = {**saved, **(inputs or {}), **values}
+    recorded = dict(saved.get("artifact_inputs") or {})
+    for name, value in values.items():
+        if name in ARTIFACT_INPUTS and value is not None:
+            recorded[name] = input_fingerprints(name, state)
+    store.save_many(run_id, {**values, "artifact_inputs": recorded})
+
+def start_run(title):
+    """Start a new persisted run and expose its id in the URL so reloads resume it"""
+    run_id = get_default_run_store().create_run(title=" ".join(title.split())[:80])
+    st.session_state.run_id = run_id
+    st.session_state.own_runs = [*st.session_state.get('own_runs', []), run_id]
+    st.query_params["run"] = run_id
+    return run_id
+
+def checkpoint(**values):
+    """Update session state and persist the values under the current run"""
+    for key, value in values.items():
+        st.session_state[key] = value
+    if st.session_state.get('run_id'):
+        get_default_run_store().save_many(st.session_state.run_id, values)
+
+def save_artifacts(**values):
+    """checkpoint() for computed artifacts that also tracks what they were built from
+    
+    Each artifact in values records fingerprints of its inputs; artifacts
+    whose recorded inputs no longer match are cleared so their step runs
+    again. Artifacts waiting on a cleared input are kept and become usable
+    again if that input is rebuilt unchanged.
+    """
+    state = {name: st.session_state.get(name) for name in ARTIFACT_INPUTS}
+    state.update({name: value for name, value in values.items() if name in ARTIFACT_INPUTS})
+    recorded = dict(st.session_state.get('artifact_inputs') or {})
+    for name, value in values.items():
+        if name in ARTIFACT_INPUTS and value is not None:
+            recorded[name] = input_fingerprints(name, state)
+    stale, _ = check_artifacts(state, recorded)
+    cleared = {name: None for name in stale}
+    if 'evaluations' in stale:
+        cleared['failed_evaluations'] = None
+    for name in stale:
+        recorded.pop(name, None)
+    checkpoint(**values, **cleared, artifact_inputs=recorded)
+
+def artifact_ready(name):
+    """True when the artifact exists and none of its inputs is waiting to be recomputed"""
+    state = {key: st.session_state.get(key) for key in ARTIFACT_INPUTS}
+    _, pending = check_artifacts(state, st.session_state.get('artifact_inputs') or {})
+    return state.get(name) is not None and name not in pending
+
+def saved_field(form, path, default):
+    """Value at a "group.field" path of a saved step 1 form, or default"""
+    group, field = path.split(".")
+    return (form.get(group) or {}).get(field, default)
+
+def saved_index(form, path, options, default):
+    """Index of the saved value in a selectbox's options, or default"""
+    value = saved_field(form, path, None)
+    return options.index(value) if value in options else default
+
+def reset_analysis():
+    for key in CHECKPOINT_KEYS + ['run_id', 'workflow_run', 'updated_sections']:
+        if key in st.session_state:
+            del st.session_state[key]
+    st.session_state.step = 1
+    # Jobs still running for the previous run finish unobserved
+    st.session_state.active_jobs = {}
+    if "run" in st.query_params:
+        del st.query_params["run"]
+
+def restore_run():
+    """Load the run named in the URL (?run=...) into session state without recomputing anything"""
+    run_id = st.query_params.get("run")
+    if not run_id or run_id == st.session_state.get('run_id'):
+        return
+    values = get_default_run_store().load(run_id)
+    if values is None:
+        del st.query_params["run"]
+        return
+    reset_analysis()
+    for key, value in values.items():
+        st.session_state[key] = value
+    st.session_state.artifact_inputs = backfill_fingerprints(values, values.get('artifact_inputs'))
+    st.session_state.run_id = run_id
+    if run_id not in st.session_state.get('own_runs', []):
+        st.session_state.own_runs = [*st.session_state.get('own_runs', []), run_id]
+    st.query_params["run"] = run_id
+
+def render_saved_runs():
+    """Sidebar list of this session's persisted analyses that can be resumed
+    
+    The store is shared by every browser session, so only runs this session
+    created or opened by ?run= link are listed.
+    """
+    runs = get_default_run_store().list_runs(limit=10, run_ids=st.session_state.get('own_runs', []))
+    if not runs:
+        return
+    st.markdown("### 🗂️ Saved Analyses")
+    labels = {
+        run["run_id"]: f"{run['title'] or 'Untitled'} · {time.strftime('%b %d %H:%M', time.localtime(run['updated_at']))}"
+        for run in runs
+    }
+    selected = st.selectbox("Resume analysis", list(labels), format_func=labels.get, label_visibility="collapsed")
+    if st.button("↩️ Resume", disabled=selected == st.session_state.get('run_id')):
+        st.query_params["run"] = selected
+        st.rerun()
+
+def start_job(slot, name, func, *args):
+    """Queue work for a button and remember its job id under slot"""
+    st.session_state.active_jobs[slot] = get_job_queue().submit(name, func, *args)
+
+def take_finished_job(slot):
+    """Return the job in slot once it has finished, storing its result in session state"""
+    job_id = st.session_state.active_jobs.get(slot)
+    if job_id is None:
+        return None
+    job = get_job_queue().get(job_id)
+    if job is None:
+        # Evicted from the queue, e.g. after a server restart
+        del st.session_state.active_jobs[slot]
+        return None
+    if not job.finished:
+        return None
+    del st.session_state.active_jobs[slot]
+    if job.status == DONE:
+        st.session_state.job_results[job.id] = job.result
+    return job
+
+def show_job_failure(job, label):
+    if job.status == CANCELLED:
+        st.info(f"{label} was cancelled.")
+    else:
+        st.error(f"{label} failed: {job.error}")
+
+@st.fragment(run_every=1)
+def render_job_progress(slot):
+    """Poll the job in slot and rerun the page once it has finished"""
+    job = get_job_queue().get(st.session_state.active_jobs.get(slot))
+    if job is None or job.finished:
+        st.rerun()
+    st.progress(job.progress, text=f"{job.message} ({job.elapsed():.0f}s)")
+    if job.partial:
+        st.markdown(job.partial)
+    if st.button("✖️ Cancel", key=f"cancel_{slot}", disabled=job.cancel_requested):
+        get_job_queue().cancel(job.id)
+        st.rerun()
+
+@st.fragment(run_every=2)
+def render_rfp_progress():
+    """Poll the background RFP node and rerun the page once it is ready"""
+    if st.session_state.workflow_run.done('rfp'):
+        st.rerun()
+    st.info("⏳ Drafting the RFP in the background. You can continue to vendor matching meanwhile.")
+
+def render_telemetry_panel():
+    """Sidebar panel with per-step LLM latency, token and cache stats for this process"""
+    st.markdown("### 📈 LLM Telemetry")
+    tracer = get_default_tracer()
+    summary = tracer.summary()
+    if not summary:
+        st.caption("No LLM calls yet.")
+        return
+    
+    st.dataframe(summary, hide_index=True, use_container_width=True)
+    tiers = tracer.tier_summary()
+    if tiers:
+        st.caption("By model tier (cost estimated from list prices)")
+        st.dataframe(tiers, hide_index=True, use_container_width=True)
+    stats = get_default_cache().stats()
+    st.caption(f"Cache: {stats['hits']} hits / {stats['misses']} misses ({stats['hit_rate']:.0%} hit rate)")
+    guard = get_default_guard().stats()
+    open_circuits = [model for model, state in guard["circuits"].items() if state != "closed"]
+    st.caption(f"Provider: {guard['retries']} retries, {guard['coalesced']} coalesced, "
+               f"{guard['throttled_s']}s throttled"
+               + (f" — circuit open for {', '.join(open_circuits)}" if open_circuits else ""))
+    
+    compaction = tracer.compaction_reports()
+    if compaction:
+        before = sum(r["tokens_before"] for r in compaction)
+        after = sum(r["tokens_after"] for r in compaction)
+        estimate = "" if all(r["exact"] for r in compaction) else " (estimated)"
+        st.caption(f"Prompt payloads: {before} → {after} tokens{estimate}")
+    
+    with st.expander("Recent calls"):
+        columns = ["step", "tier", "model", "cache", "wall_ms", "prompt_tokens", "completion_tokens", "status"]
+        recent = [{column: record.get(column) for column in columns} for record in tracer.records()[-15:]]
+        st.dataframe(list(reversed(recent)), hide_index=True, use_container_width=True)
 
 def render_marketplace():
     """Render the marketplace with all SaaS tools"""
     st.header("🏪 SaaS Marketplace")
     st.markdown("*Discover and explore top enterprise SaaS tools*")
     
-    # Get marketplace data
-    tools = get_marketplace_data()
+    # Prebuilt index shared across reruns and sessions
+    index = get_marketplace_index()
+    tools = index.tools
     
     # Filters
     st.subheader("🔍 Filters")
     col_filter1, col_filter2, col_filter3 = st.columns(3)
     
     with col_filter1:
-        # Get unique categories
-        categories = sorted(list(set([tool['category'] for tool in tools])))
-        selected_category = st.selectbox("Category", ["All"] + categories)
+        category_counts = index.facet_counts['category']
+        selected_category = st.selectbox(
+            "Category",
+            ["All"] + index.facet_values('category'),
+            format_func=lambda c: f"{c} ({len(tools) if c == 'All' else category_counts[c]})"
+        )
     
     with col_filter2:
-        # Get unique countries
-        countries = sorted(list(set([tool['country'] for tool in tools])))
-        selected_country = st.selectbox("Country", ["All"] + countries)
+        country_counts = index.facet_counts['country']
+        selected_country = st.selectbox(
+            "Country",
+            ["All"] + index.facet_values('country'),
+            format_func=lambda c: f"{c} ({len(tools) if c == 'All' else country_counts[c]})"
+        )
     
     with col_filter3:
         # Search
         search_term = st.text_input("🔍 Search", placeholder="Search by name or description...")
+        semantic = st.toggle("🧠 Semantic search", help="Rank tools by meaning instead of matching words")
     
     # Filter tools
-    filtered_tools = tools
-    if selected_category != "All":
-        filtered_tools = [t for t in filtered_tools if t['category'] == selected_category]
-    if selected_country != "All":
-        filtered_tools = [t for t in filtered_tools if t['country'] == selected_country]
-    if search_term:
-        search_lower = search_term.lower()
-        filtered_tools = [t for t in filtered_tools if search_lower in t['name'].lower() or search_lower in t['description'].lower()]
+    filters = {
+        'category': None if selected_category == "All" else selected_category,
+        'country': None if selected_country == "All" else selected_country
+    }
+    if semantic and search_term.strip():
+        # Closest tools by embedding similarity, restricted to the facet filters
+        allowed = {tool['name']: tool for tool in index.search("", filters)}
+        hits = get_catalog().semantic_search(search_term, k=SEMANTIC_SEARCH_K)
+        filtered_tools = [allowed[record.name] for record, score in hits if score > 0 and record.name in allowed]
+    else:
+        filtered_tools = index.search(search_term, filters)
+    
+    # View controls
+    col_view1, col_view2, col_view3 = st.columns([2, 1, 1])
+    with col_view1:
+        view_mode = st.radio("View", ["Grid", "List"], horizontal=True, label_visibility="collapsed")
+    with col_view2:
+        page_size = st.selectbox("Per page", MARKETPLACE_PAGE_SIZES, index=0)
+    page_count = max(1, -(-len(filtered_tools) // page_size))
+    if st.session_state.get('marketplace_page', 1) > page_count:
+        st.session_state.marketplace_page = 1
+    with col_view3:
+        page = st.number_input("Page", min_value=1, max_value=page_count, step=1, key='marketplace_page')
+    page_tools = paginate(filtered_tools, page, page_size)
     
     # Stats
-    st.markdown(f"**Showing {len(filtered_tools)} of {len(tools)} tools**")
+    offset = (page - 1) * page_size
+    st.markdown(f"**Showing {offset + 1 if page_tools else 0}-{offset + len(page_tools)} of "
+                f"{len(filtered_tools)} matching tools ({len(tools)} total) · page {page} of {page_count}**")
     st.divider()
     
-    # Display tools in grid layout (3 per row)
-    for i in range(0, len(filtered_tools), 3):
-        cols = st.columns(3)
-        for j in range(3):
-            if i + j < len(filtered_tools):
-                tool = filtered_tools[i + j]
-                with cols[j]:
-                    # Create app-store style card
-                    st.markdown(f"""
-                    <div style="
-                        border: 1px solid #ddd;
-                        border-radius: 12px;
-                        padding: 20px;
-                        height: 280px;
-                        background: linear-gradient(135deg, #f5f7fa 0%, #c3cfe2 100%);
-                        box-shadow: 0 4px 6px rgba(0,0,0,0.1);
-                    ">
-                        <div style="font-size: 48px; text-align: center; margin-bottom: 10px;">
-                            {tool['icon']}
-                        </div>
-                        <h3 style="text-align: center; margin: 10px 0; color: #1f2937;">
-                            {tool['name']}
-                        </h3>
-                        <p style="text-align: center; color: #6b7280; font-size: 14px; margin: 8px 0;">
-                            {tool['description']}
-                        </p>
-                        <div style="margin-top: 15px; padding-top: 15px; border-top: 1px solid #e5e7eb;">
-                            <div style="display: flex; justify-content: space-between; margin: 5px 0;">
-                                <span style="color: #6b7280; font-size: 12px;">💰 Funding:</span>
-                                <span style="color: #1f2937; font-weight: bold; font-size: 12px;">{tool['funding']}</span>
-                            </div>
-                            <div style="display: flex; justify-content: space-between; margin: 5px 0;">
-                                <span style="color: #6b7280; font-size: 12px;">📅 Founded:</span>
-                                <span style="color: #1f2937; font-weight: bold; font-size: 12px;">{tool['year']}</span>
-                            </div>
-                            <div style="display: flex; justify-content: space-between; margin: 5px 0;">
-                                <span style="color: #6b7280; font-size: 12px;">📍 Location:</span>
-                                <span style="color: #1f2937; font-weight: bold; font-size: 12px;">{tool['city']}, {tool['country'][:2]}</span>
-                            </div>
-                            <div style="text-align: center; margin-top: 10px;">
-                                <span style="
-                                    background: #3b82f6;
-                                    color: white;
-                                    padding: 4px 12px;
-                                    border-radius: 12px;
-                                    font-size: 11px;
-                                    font-weight: 500;
-                                ">{tool['category']}</span>
-                            </div>
-                        </div>
-                    </div>
-                    """, unsafe_allow_html=True)
-                    
-                    # Add some spacing
-                    st.markdown("<br>", unsafe_allow_html=True)
+    # Render the whole page as one element with shared CSS instead of one block per card
+    st.markdown(MARKETPLACE_CSS, unsafe_allow_html=True)
+    if view_mode == "Grid":
+        cards = "".join(render_tool_card(tool) for tool in page_tools)
+        st.markdown(f'<div class="mp-grid">{cards}</div>', unsafe_allow_html=True)
+    else:
+        rows = "".join(render_tool_row(tool) for tool in page_tools)
+        st.markdown(f'<div class="mp-list">{rows}</div>', unsafe_allow_html=True)
+
+def paginate(items, page, page_size):
+    """Return the 1-indexed page of items"""
+    start = (page - 1) * page_size
+    return items[start:start + page_size]
+
+def render_tool_card(tool):
+    """App-store style card markup for one tool"""
+    return (
+        '<div class="mp-card">'
+        f'<div class="mp-icon">{tool["icon"]}</div>'
+        f'<h3>{escape(tool["name"])}</h3>'
+        f'<p class="mp-desc">{escape(tool["description"])}</p>'
+        '<div class="mp-meta">'
+        f'<div class="mp-row"><span>💰 Funding:</span><b>{escape(tool["funding"])}</b></div>'
+        f'<div class="mp-row"><span>📅 Founded:</span><b>{tool["year_founded"]}</b></div>'
+        f'<div class="mp-row"><span>📍 Location:</span><b>{escape(tool["city"])}, {escape(tool["country"][:2])}</b></div>'
+        f'<div class="mp-tag-row"><span class="mp-tag">{escape(tool["category"])}</span></div>'
+        '</div></div>'
+    )
+
+def render_tool_row(tool):
+    """Compact single-line markup for list mode"""
+    return (
+        '<div class="mp-list-row">'
+        f'<span class="mp-list-icon">{tool["icon"]}</span>'
+        f'<b>{escape(tool["name"])}</b>'
+        f'<span class="mp-desc">{escape(tool["description"])}</span>'
+        f'<span class="mp-tag">{escape(tool["category"])}</span>'
+        f'<span>{escape(tool["funding"])} · {tool["year_founded"]} · {escape(tool["city"])}</span>'
+        '</div>'
+    )
 
 if __name__ == "__main__":
     main()
@@ -0,0 +1,75 @@
+"""
+Cold-start import budget check.
+
+Runs each target import in a fresh interpreter with `-X importtime` and fails
+when its cumulative import time, net of interpreter startup, exceeds the
+budget. Usage:
+
+    python -m benchmarks.import_time            # check budgets
+    python -m benchmarks.import_time --top 15   # also list the slowest modules
+"""
+import argparse
+import os
+import statistics
+import subprocess
+import sys
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Import statement -> budget in milliseconds (median, net of a bare interpreter)
+BUDGETS = {
+    # Everything app.py imports before the first paint
+    "import streamlit, dotenv, agents.incremental, agents.instrumentation, agents.jobs, agents.llm_backend, agents.llm_cache, agents.rate_limit, "
+    "agents.registry, agents.run_store, agents.workflow, catalog.store": 1200,
+    # Must stay free of langchain/openai so the marketplace tab and registry load fast
+    "import agents.instrumentation, agents.llm_cache, agents.registry, catalog.store": 60,
+    # Paid once, on the first workflow step that needs an agent
+    "import agents.requirements_agent": 3000,
+}
+
+def measure(statement, python=sys.executable):
+    """Return (total_ms, [(module, cumulative_ms), ...]) for one cold import"""
+    result = subprocess.run(
+        [python, "-X", "importtime", "-c", statement],
+        cwd=REPO_ROOT, capture_output=True, text=True, check=True
+    )
+    modules = []
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+        _, cumulative, name = line[len("import time:"):].split("|")
+        # Only top-level entries (no leading indentation) add up to the total
+        if not name.startswith("  "):
+            modules.append((name.strip(), int(cumulative) / 1000))
+    return sum(ms for _, ms in modules), modules
+
+def slowest_modules(statement, top):
+    _, modules = measure(statement)
+    return sorted(modules, key=lambda m: m[1], reverse=True)[:top]
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--runs", type=int, default=5, help="cold imports per target (median is reported)")
+    parser.add_argument("--top", type=int, default=0, help="show the N slowest top-level imports per target")
+    args = parser.parse_args()
+
+    baseline = statistics.median(measure("pass")[0] for _ in range(args.runs))
+    print(f"interpreter startup baseline: {baseline:.1f} ms\n")
+
+    failures = 0
+    for statement, budget in BUDGETS.items():
+        timings = [measure(statement)[0] - baseline for _ in range(args.runs)]
+        median = statistics.median(timings)
+        ok = median <= budget
+        failures += not ok
+        print(f"{'PASS' if ok else 'FAIL'}  {median:8.1f} ms  (budget {budget} ms)  {statement}")
+        if args.top:
+            for name, ms in slowest_modules(statement, args.top):
+                print(f"          {ms:8.1f} ms  {name}")
+
+    if failures:
+        print(f"\n{failures} import budget(s) exceeded")
+        sys.exit(1)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,319 @@
+"""
+End-to-end benchmark suite for the consultant workflow and marketplace.
+
+Runs against the offline stub backend with simulated model latency, so
+results are reproducible and need no API key. Measures:
+
+  agent.*        latency distribution (p50/p95/p99) of each agent method
+  pipeline.*     full pipeline throughput with N concurrent sessions
+  marketplace.*  index build and filter/search time versus catalog size
+
+Results are written as JSON; --compare checks them against an earlier
+results file and exits non-zero on regressions. Usage:
+
+    python -m benchmarks.suite -o benchmarks/results/baseline.json
+    python -m benchmarks.suite --compare benchmarks/results/baseline.json
+    python -m benchmarks.suite --quick --only marketplace
+"""
+import argparse
+import json
+import os
+import platform
+import random
+import subprocess
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+DEFAULT_OUTPUT = os.path.join("benchmarks", "results", "latest.json")
+
+SUITES = ("agents", "pipeline", "marketplace")
+
+DETAILED_INPUT = {
+    "organization": {"company_name": "Acme Corp", "industry": "Financial Services", "company_size": "1000-5000"},
+    "requirements": {
+        "description": "Centralize customer support across email and chat with AI-assisted triage",
+        "use_case": ["Customer support automation", "Ticket triage"],
+        "integrations": "Salesforce, Slack, Jira",
+        "compliance": ["SOC 2", "GDPR"]
+    },
+    "budget_timeline": {"budget_range": "$100k-$250k", "timeline": "3 months"}
+}
+
+MARKETPLACE_QUERIES = ["", "data", "analytics platform", "secrity", "customer support ai"]
+
+def percentiles(samples_ms):
+    """Summary of a list of millisecond timings (nearest-rank percentiles, like the tracer)"""
+    ordered = sorted(samples_ms)
+
+    def rank(percent):
+        return ordered[min(len(ordered) - 1, max(0, -(-percent * len(ordered) // 100) - 1))]
+
+    return {
+        "samples": len(ordered),
+        "p50_ms": round(rank(50), 3),
+        "p95_ms": round(rank(95), 3),
+        "p99_ms": round(rank(99), 3),
+        "mean_ms": round(sum(ordered) / len(ordered), 3),
+        "max_ms": round(ordered[-1], 3)
+    }
+
+def timed(func, iterations, warmup=1):
+    """Millisecond timings of func(i) over iterations calls, after warmup untimed calls"""
+    for i in range(warmup):
+        func(i)
+    samples = []
+    for i in range(iterations):
+        started = time.perf_counter()
+        func(i)
+        samples.append((time.perf_counter() - started) * 1000)
+    return samples
+
+def configure_offline(latency, tokens_per_s, jitter, seed):
+    """Point every agent at the stub backend, without rate limits or a trace file"""
+    from agents.instrumentation import Tracer, set_default_tracer
+    from agents.llm_backend import LatencyProfile, StubBackend, set_default_backend
+    from agents.rate_limit import ProviderGuard, set_default_guard
+
+    set_default_backend(StubBackend(LatencyProfile(latency, tokens_per_s, jitter), seed))
+    # Limits would measure the token bucket rather than the code under test
+    set_default_guard(ProviderGuard(rpm=10**9, tpm=10**12))
+    set_default_tracer(Tracer())
+
+def request_text(i):
+    """Compiled form text for a session, varied so no two prompts are identical"""
+    from agents.workflow import compile_request_text
+    detailed_input = json.loads(json.dumps(DETAILED_INPUT))
+    detailed_input["organization"]["company_name"] = f"Acme Corp {i}"
+    return compile_request_text(detailed_input), detailed_input
+
+def run_pipeline(agents, i):
+    from agents.workflow import build_consultant_workflow
+    text, detailed_input = request_text(i)
+    return build_consultant_workflow(agents).run(
+        {"request_text": text, "detailed_input": detailed_input},
+        targets=["recommendation", "confidence", "rfp"]
+    )
+
+def bench_agents(iterations):
+    """Latency distribution of each agent method, fed with one pipeline run's outputs"""
+    from agents.registry import AgentRegistry
+    from agents.rubric_scoring import rank_vendors
+    from agents.workflow import split_evaluations, vendor_names
+
+    agents = AgentRegistry("offline")
+    context = run_pipeline(agents, 0)
+    requirements, vendor_matches, rubric = context["requirements"], context["vendor_matches"], context["rubric"]
+    evaluations, _ = split_evaluations(context["evaluations"])
+    names = vendor_names(vendor_matches)
+
+    requirements_agent = agents["requirements"]
+    matching_agent = agents["vendor_matching"]
+    poc_agent = agents["poc_evaluation"]
+    recommendation_agent = agents["recommendation"]
+
+    # i varies the input on every call, so no response is shared between calls
+    cases = {
+        "gather_requirements": lambda i: requirements_agent.gather_requirements(request_text(i)[0]),
+        "update_requirements": lambda i: requirements_agent.update_requirements(
+            requirements, request_text(i)[0], ["budget_and_timeline"]),
+        "generate_rfp": lambda i: requirements_agent.generate_rfp({**requirements, "run": i}),
+        "match_vendors": lambda i: matching_agent.match_vendors({**requirements, "run": i}),
+        "generate_vendor_comparison": lambda i: matching_agent.generate_vendor_comparison(
+            {**vendor_matches, "run": i}),
+        "create_poc_rubric": lambda i: poc_agent.create_poc_rubric({**requirements, "run": i}, vendor_matches),
+        "simulate_poc_evaluation": lambda i: poc_agent.simulate_poc_evaluation(rubric, f"{names[i % len(names)]} {i}"),
+        "simulate_poc_evaluations": lambda i: poc_agent.simulate_poc_evaluations(
+            rubric, [f"{name} {i}" for name in names]),
+        "synthesize_evaluations": lambda i: poc_agent.synthesize_evaluations(
+            {**evaluations, f"Run {i}": next(iter(evaluations.values()))}, rubric),
+        "generate_final_recommendation": lambda i: recommendation_agent.generate_final_recommendation(
+            {**requirements, "run": i}, vendor_matches, evaluations),
+        "generate_adoption_prediction": lambda i: recommendation_agent.generate_adoption_prediction(
+            f"{names[0]} {i}", requirements),
+        "calculate_confidence_score": lambda i: recommendation_agent.calculate_confidence_score(evaluations, rubric),
+        "rank_vendors": lambda i: rank_vendors(rubric, evaluations)
+    }
+    return {f"agent.{name}": percentiles(timed(case, iterations)) for name, case in cases.items()}
+
+def bench_pipeline(session_counts, sessions_per_worker):
+    """Sessions per second and per-session latency with N sessions running at once"""
+    from agents.registry import AgentRegistry
+
+    # One registry shared by all sessions, like the app's cached agents
+    agents = AgentRegistry("offline")
+    run_pipeline(agents, 0)
+    results = {}
+    for concurrency in session_counts:
+        total = concurrency * sessions_per_worker
+        samples = []
+
+        def session(i):
+            started = time.perf_counter()
+            run_pipeline(agents, i)
+            samples.append((time.perf_counter() - started) * 1000)
+
+        started = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=concurrency) as pool:
+            list(pool.map(session, range(1, total + 1)))
+        wall_s = time.perf_counter() - started
+        results[f"pipeline.sessions_{concurrency}"] = {
+            **percentiles(samples),
+            "concurrency": concurrency,
+            "wall_s": round(wall_s, 3),
+            "sessions_per_s": round(total / wall_s, 3)
+        }
+    return results
+
+def synthetic_tools(size, seed=0):
+    """Marketplace tool dicts grown from the listed catalog vendors to size entries"""
+    from catalog.store import get_catalog
+
+    base = [record.to_dict() for record in get_catalog().listed()]
+    rng = random.Random(seed)
+    words = sorted({word for tool in base for word in tool.get("description", "").split()})
+    countries = sorted({tool["country"] for tool in base if tool.get("country")})
+    tools = []
+    for i in range(size):
+        tool = dict(base[i % len(base)])
+        if i >= len(base):
+            tool["name"] = f"{tool['name']} {i}"
+            tool["description"] = " ".join(rng.sample(words, min(12, len(words))))
+            tool["country"] = rng.choice(countries)
+        tools.append(tool)
+    return tools
+
+def bench_marketplace(sizes, iterations):
+    """CatalogIndex build time and filter/search latency per catalog size"""
+    from catalog.search_index import CatalogIndex
+
+    results = {}
+    for size in sizes:
+        tools = synthetic_tools(size)
+        results[f"marketplace.build_index.n{size}"] = percentiles(
+            timed(lambda i: CatalogIndex(tools), max(3, iterations // 5)))
+        index = CatalogIndex(tools)
+        categories, countries = index.facet_values("category"), index.facet_values("country")
+        rng = random.Random(size)
+
+        def filtered(i):
+            index.search("", {"category": rng.choice(categories), "country": rng.choice(countries)})
+
+        def search(i):
+            # A fresh index per round would time construction; clear the term cache instead
+            index.term_matches.cache_clear()
+            index.search(MARKETPLACE_QUERIES[i % len(MARKETPLACE_QUERIES)], {"category": rng.choice(categories + [None])})
+
+        results[f"marketplace.filter.n{size}"] = percentiles(timed(filtered, iterations))
+        results[f"marketplace.search.n{size}"] = percentiles(timed(search, iterations))
+    return results
+
+def git_commit():
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], cwd=REPO_ROOT, capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+def compare(current, baseline, tolerance, min_delta_ms=0.5):
+    """[(name, metric, before, after, change)] for metrics worse than baseline by more than tolerance
+
+    Latencies regress when they grow, throughput when it shrinks. Latency
+    changes under min_delta_ms are timer noise on sub-millisecond cases and
+    are ignored.
+    """
+    regressions = []
+    for name, result in current["benchmarks"].items():
+        before = baseline.get("benchmarks", {}).get(name)
+        if before is None:
+            continue
+        for metric in ("p50_ms", "p95_ms", "sessions_per_s"):
+            if metric not in result or not before.get(metric):
+                continue
+            change = (result[metric] - before[metric]) / before[metric]
+            worse = -change if metric == "sessions_per_s" else change
+            if metric != "sessions_per_s" and result[metric] - before[metric] < min_delta_ms:
+                continue
+            if worse > tolerance:
+                regressions.append((name, metric, before[metric], result[metric], change))
+    return regressions
+
+def _int_list(value):
+    return [int(item) for item in value.split(",") if item.strip()]
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("-o", "--output", default=DEFAULT_OUTPUT, help="JSON results file")
+    parser.add_argument("--only", default=",".join(SUITES), help="comma-separated suites to run")
+    parser.add_argument("--iterations", type=int, default=30, help="timed calls per agent method / search case")
+    parser.add_argument("--sessions", type=_int_list, default=[1, 4, 8], help="concurrent session counts")
+    parser.add_argument("--sessions-per-worker", type=int, default=3, help="pipelines each session worker runs")
+    parser.add_argument("--catalog-sizes", type=_int_list, default=[100, 1000, 10000], help="marketplace sizes")
+    parser.add_argument("--latency", type=float, default=0.05, help="simulated seconds to first token")
+    parser.add_argument("--tokens-per-s", type=float, default=2000, help="simulated generation speed")
+    parser.add_argument("--jitter", type=float, default=0.1, help="+/- fraction applied to simulated delays")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--quick", action="store_true", help="few iterations, for a smoke run")
+    parser.add_argument("--compare", help="earlier results file to check for regressions")
+    parser.add_argument("--tolerance", type=float, default=0.2, help="allowed slowdown before failing --compare")
+    parser.add_argument("--min-delta-ms", type=float, default=0.5, help="ignore latency changes smaller than this")
+    args = parser.parse_args()
+
+    if args.quick:
+        args.iterations, args.sessions, args.sessions_per_worker = 5, [1, 4], 1
+        args.catalog_sizes = [size for size in args.catalog_sizes if size <= 1000]
+    suites = [suite for suite in args.only.split(",") if suite in SUITES]
+
+    baseline = None
+    if args.compare:
+        # Read before --output is written: they may be the same file
+        with open(args.compare, encoding="utf-8") as f:
+            baseline = json.load(f)
+
+    configure_offline(args.latency, args.tokens_per_s, args.jitter, args.seed)
+    benchmarks = {}
+    for suite in suites:
+        started = time.perf_counter()
+        if suite == "agents":
+            benchmarks.update(bench_agents(args.iterations))
+        elif suite == "pipeline":
+            benchmarks.update(bench_pipeline(args.sessions, args.sessions_per_worker))
+        else:
+            benchmarks.update(bench_marketplace(args.catalog_sizes, args.iterations))
+        print(f"{suite}: {time.perf_counter() - started:.1f}s", file=sys.stderr)
+
+    results = {
+        "meta": {
+            "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S%z"),
+            "commit": git_commit(),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "config": {key: value for key, value in vars(args).items() if key not in ("output", "compare", "tolerance", "min_delta_ms")}
+        },
+        "benchmarks": benchmarks
+    }
+
+    for name, result in benchmarks.items():
+        extra = f"  {result['sessions_per_s']:.2f} sessions/s" if "sessions_per_s" in result else ""
+        print(f"{name:45} p50 {result['p50_ms']:9.2f} ms  p95 {result['p95_ms']:9.2f} ms  "
+              f"p99 {result['p99_ms']:9.2f} ms{extra}")
+
+    if os.path.dirname(args.output):
+        os.makedirs(os.path.dirname(args.output), exist_ok=True)
+    with open(args.output, "w", encoding="utf-8") as f:
+        json.dump(results, f, indent=2)
+    print(f"\nresults written to {args.output}")
+
+    if baseline is not None:
+        regressions = compare(results, baseline, args.tolerance, args.min_delta_ms)
+        for name, metric, before, after, change in regressions:
+            print(f"REGRESSION  {name} {metric}: {before} -> {after} ({change:+.0%})")
+        if regressions:
+            print(f"\n{len(regressions)} regression(s) beyond {args.tolerance:.0%} of {args.compare}")
+            sys.exit(1)
+        print(f"no regressions beyond {args.tolerance:.0%} of {args.compare}")
+
+if __name__ == "__main__":
+    main()
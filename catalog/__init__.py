@@ -0,0 +1 @@
+# Vendor catalog and marketplace search
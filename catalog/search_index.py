@@ -0,0 +1,86 @@
+import bisect
+import difflib
+import functools
+import re
+from collections import Counter, defaultdict
+
+# Query tokens whose matches each index remembers
+TERM_CACHE_SIZE = 1024
+
+def tokenize(text):
+    """Lowercase alphanumeric tokens"""
+    return re.findall(r"[a-z0-9]+", str(text).lower())
+
+class CatalogIndex:
+    """Prebuilt inverted index and facet counts over marketplace tools"""
+
+    def __init__(self, tools, text_fields=("name", "description"), facets=("category", "country")):
+        self.tools = list(tools)
+        self._postings = defaultdict(set)
+        self._facet_ids = {facet: defaultdict(dict) for facet in facets}
+        # Per-instance, bounded and thread-safe (lru_cache locks internally)
+        self.term_matches = functools.lru_cache(maxsize=TERM_CACHE_SIZE)(self.term_matches)
+
+        for doc_id, tool in enumerate(self.tools):
+            for field in text_fields:
+                for token in tokenize(tool.get(field, "")):
+                    self._postings[token].add(doc_id)
+            for facet in facets:
+                # Insertion-ordered dict keys double as an ordered id set
+                self._facet_ids[facet][tool.get(facet)][doc_id] = None
+
+        self.vocabulary = sorted(self._postings)
+        self.facet_counts = {
+            facet: Counter({value: len(ids) for value, ids in values.items()})
+            for facet, values in self._facet_ids.items()
+        }
+
+    def facet_values(self, facet):
+        """Sorted distinct values of a facet"""
+        return sorted(value for value in self.facet_counts[facet] if value is not None)
+
+    def _prefix_matches(self, token):
+        start = bisect.bisect_left(self.vocabulary, token)
+        matches = set()
+        for term in self.vocabulary[start:]:
+            if not term.startswith(token):
+                break
+            matches |= self._postings[term]
+        return matches
+
+    def _fuzzy_matches(self, token, cutoff=0.8):
+        # Only compare against terms of similar length sharing the first letter
+        candidates = [
+            term for term in self.vocabulary
+            if term[0] == token[0] and abs(len(term) - len(token)) <= 2
+        ]
+        matches = set()
+        for term in difflib.get_close_matches(token, candidates, n=5, cutoff=cutoff):
+            matches |= self._postings[term]
+        return matches
+
+    def term_matches(self, token):
+        """Document ids matching a query token by prefix, falling back to fuzzy matching"""
+        return frozenset(self._prefix_matches(token) or self._fuzzy_matches(token))
+
+    def search(self, query="", filters=None):
+        """Tools matching every query token and every facet filter, in catalog order"""
+        candidate_sets = [
+            self._facet_ids[facet].get(value, {}).keys()
+            for facet, value in (filters or {}).items()
+            if value is not None
+        ]
+        candidate_sets.extend(self.term_matches(token) for token in tokenize(query))
+        if not candidate_sets:
+            return list(self.tools)
+        if len(candidate_sets) == 1 and not query.strip():
+            # Facet sets are built in catalog order, so a lone facet needs no sort
+            return [self.tools[doc_id] for doc_id in candidate_sets[0]]
+
+        candidate_sets.sort(key=len)
+        ids = set(candidate_sets[0])
+        for other in candidate_sets[1:]:
+            ids.intersection_update(other)
+            if not ids:
+                break
+        return [self.tools[doc_id] for doc_id in sorted(ids)]
@@ -0,0 +1,197 @@
+import hashlib
+import json
+import os
+import threading
+from dataclasses import dataclass, fields
+
+from catalog.search_index import tokenize
+
+DEFAULT_CATALOG_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "data", "vendors.jsonl")
+VECTOR_INDEX_DIR = os.path.join(".cache", "vectors")
+
+def normalize(value):
+    """Index key for names, categories, compliance standards and integrations"""
+    return " ".join(tokenize(value))
+
+@dataclass(frozen=True, slots=True)
+class VendorRecord:
+    """One vendor as stored in the catalog file"""
+    name: str
+    category: str
+    description: str | None = None
+    icon: str | None = None
+    website: str | None = None
+    funding: str | None = None
+    year_founded: int | None = None
+    city: str | None = None
+    country: str | None = None
+    pricing_model: str | None = None
+    adoption_score: int | None = None
+    enterprise_fit: int | None = None
+    strengths: tuple = ()
+    integrations: tuple = ()
+    compliance: tuple = ()
+    pros: tuple = ()
+    cons: tuple = ()
+    # Shown in the marketplace tab; unlisted vendors are only used for matching
+    listed: bool = False
+
+    @classmethod
+    def from_dict(cls, data):
+        known = {f.name: f for f in fields(cls)}
+        values = {
+            key: tuple(value) if isinstance(value, list) else value
+            for key, value in data.items() if key in known
+        }
+        return cls(**values)
+
+    @property
+    def location(self):
+        return ", ".join(part for part in (self.city, self.country) if part) or None
+
+    def embedding_text(self):
+        """Text embedded for semantic retrieval"""
+        parts = [self.name, self.category, self.description or "", " ".join(self.strengths)]
+        return ". ".join(part for part in parts if part)
+
+    def to_dict(self):
+        """Plain dict for prompts and the UI, without empty fields or catalog metadata"""
+        data = {}
+        for f in fields(self):
+            value = getattr(self, f.name)
+            if f.name == "listed" or value is None or value == ():
+                continue
+            data[f.name] = list(value) if isinstance(value, tuple) else value
+        if self.location:
+            data["location"] = self.location
+        return data
+
+class VendorCatalog:
+    """Vendor catalog loaded from a JSON-lines file on first use
+
+    Records are indexed by name, category, compliance standard and
+    integration; lookups normalize case and punctuation.
+    """
+
+    def __init__(self, path=DEFAULT_CATALOG_PATH, index_path=None):
+        self.path = path
+        # One saved vector index per catalog file
+        self.index_path = index_path or os.path.join(
+            VECTOR_INDEX_DIR, hashlib.sha1(os.path.abspath(path).encode("utf-8")).hexdigest()[:12] + ".npz"
+        )
+        self._records = None
+        self._vector_index = None
+        self._columns = {}
+        self._lock = threading.Lock()
+
+    def _ensure_loaded(self):
+        if self._records is not None:
+            return self._records
+        with self._lock:
+            if self._records is None:
+                records = []
+                with open(self.path, encoding="utf-8") as f:
+                    for line in f:
+                        if line.strip():
+                            records.append(VendorRecord.from_dict(json.loads(line)))
+                self._build_indexes(records)
+                self._records = records
+        return self._records
+
+    def _build_indexes(self, records):
+        self._by_name = {}
+        self._by_category = {}
+        self._by_compliance = {}
+        self._by_integration = {}
+        for record in records:
+            self._by_name[normalize(record.name)] = record
+            self._by_category.setdefault(normalize(record.category), []).append(record)
+            for standard in record.compliance:
+                self._by_compliance.setdefault(normalize(standard), []).append(record)
+            for integration in record.integrations:
+                self._by_integration.setdefault(normalize(integration), []).append(record)
+
+    def __len__(self):
+        return len(self._ensure_loaded())
+
+    def all(self):
+        return list(self._ensure_loaded())
+
+    def listed(self):
+        """Vendors shown in the marketplace, in catalog order"""
+        return [record for record in self._ensure_loaded() if record.listed]
+
+    def get(self, name):
+        self._ensure_loaded()
+        return self._by_name.get(normalize(name))
+
+    def categories(self):
+        self._ensure_loaded()
+        return sorted({records[0].category for records in self._by_category.values()})
+
+    def by_category(self, category):
+        self._ensure_loaded()
+        return list(self._by_category.get(normalize(category), []))
+
+    def with_compliance(self, standard):
+        self._ensure_loaded()
+        return list(self._by_compliance.get(normalize(standard), []))
+
+    def with_integration(self, integration):
+        self._ensure_loaded()
+        return list(self._by_integration.get(normalize(integration), []))
+
+    def query(self, category=None, compliance=(), integrations=()):
+        """Vendors matching the category and offering every listed standard and integration"""
+        candidate_lists = []
+        if category:
+            candidate_lists.append(self.by_category(category))
+        candidate_lists.extend(self.with_compliance(standard) for standard in compliance)
+        candidate_lists.extend(self.with_integration(integration) for integration in integrations)
+        if not candidate_lists:
+            return self.all()
+        names = set.intersection(*({record.name for record in records} for records in candidate_lists))
+        return [record for record in self._ensure_loaded() if record.name in names]
+
+    def numeric_column(self, name, default):
+        """One numeric field across all records as a cached float array, in catalog order"""
+        key = (name, default)
+        if key not in self._columns:
+            import numpy as np
+            values = (getattr(record, name) for record in self._ensure_loaded())
+            self._columns[key] = np.fromiter(
+                (default if value is None else value for value in values), dtype=float, count=len(self._records)
+            )
+        return self._columns[key]
+
+    def vector_index(self):
+        """Semantic index over vendor texts, reused from index_path while the catalog is unchanged"""
+        records = self._ensure_loaded()
+        if self._vector_index is None:
+            # numpy is only imported once semantic search is used
+            from catalog.vector_index import VectorIndex, build_embedder_from_env
+            with self._lock:
+                if self._vector_index is None:
+                    self._vector_index = VectorIndex.load_or_build(
+                        self.index_path,
+                        build_embedder_from_env(),
+                        [record.name for record in records],
+                        [record.embedding_text() for record in records]
+                    )
+        return self._vector_index
+
+    def semantic_search(self, query, k=10):
+        """[(record, similarity)] for the k vendors closest in meaning to the query text"""
+        self._ensure_loaded()
+        return [(self._by_name[normalize(name)], score) for name, score in self.vector_index().search(query, k)]
+
+_default_catalog = None
+_default_catalog_lock = threading.Lock()
+
+def get_catalog():
+    """Process-wide catalog read from SAASITIS_CATALOG_PATH or the bundled data file"""
+    global _default_catalog
+    with _default_catalog_lock:
+        if _default_catalog is None:
+            _default_catalog = VendorCatalog(os.getenv("SAASITIS_CATALOG_PATH") or DEFAULT_CATALOG_PATH)
+        return _default_catalog
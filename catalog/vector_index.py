@@ -0,0 +1,152 @@
+import hashlib
+import math
+import os
+import zlib
+
+import numpy as np
+
+from catalog.search_index import tokenize
+
+# Frequent words that would otherwise dominate hashed vectors
+STOPWORDS = {
+    "a", "an", "and", "are", "as", "at", "be", "by", "for", "from", "in", "is", "it", "of", "on",
+    "or", "our", "that", "the", "to", "we", "with", "need", "needs", "tool", "tools"
+}
+
+class HashingEmbedder:
+    """Offline embedder: signed feature hashing of word unigrams and bigrams
+
+    No model or network is needed, so vectors are deterministic across
+    processes and machines. Similar wording gives similar vectors, which is
+    enough to pre-filter candidates before the LLM sees them.
+    """
+
+    def __init__(self, dim=256):
+        self.dim = dim
+        self.name = f"hashing-{dim}"
+
+    def _features(self, text):
+        tokens = [t for t in tokenize(text) if t not in STOPWORDS]
+        return tokens + [f"{a} {b}" for a, b in zip(tokens, tokens[1:])]
+
+    def embed(self, texts):
+        vectors = np.zeros((len(texts), self.dim), dtype=np.float32)
+        for row, text in enumerate(texts):
+            counts = {}
+            for feature in self._features(text):
+                h = zlib.crc32(feature.encode("utf-8"))
+                bucket = h % self.dim
+                sign = 1.0 if h & 0x80000000 else -1.0
+                counts[bucket] = counts.get(bucket, 0.0) + sign
+            for bucket, count in counts.items():
+                # Sublinear term frequency keeps repeated words from dominating
+                vectors[row, bucket] = math.copysign(1 + math.log(abs(count)), count) if count else 0.0
+        return _normalize(vectors)
+
+class OpenAIEmbedder:
+    """Embeddings from the OpenAI API, batched"""
+
+    def __init__(self, api_key=None, model="text-embedding-3-small", batch_size=256):
+        from openai import OpenAI
+        self.client = OpenAI(api_key=api_key or os.getenv("OPENAI_API_KEY"))
+        self.model = model
+        self.batch_size = batch_size
+        self.name = f"openai-{model}"
+
+    def embed(self, texts):
+        vectors = []
+        for start in range(0, len(texts), self.batch_size):
+            response = self.client.embeddings.create(model=self.model, input=texts[start:start + self.batch_size])
+            vectors.extend(item.embedding for item in response.data)
+        return _normalize(np.asarray(vectors, dtype=np.float32))
+
+def _normalize(vectors):
+    norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+    norms[norms == 0] = 1.0
+    return vectors / norms
+
+def build_embedder_from_env():
+    """Embedder selected by SAASITIS_EMBEDDER (hashing or openai)"""
+    if os.getenv("SAASITIS_EMBEDDER", "hashing").lower() == "openai":
+        return OpenAIEmbedder()
+    return HashingEmbedder()
+
+def fingerprint(embedder, ids, texts):
+    """Identifies the embedder and corpus a saved index was built from"""
+    digest = hashlib.sha256(embedder.name.encode("utf-8"))
+    for doc_id, text in zip(ids, texts):
+        digest.update(b"\0" + str(doc_id).encode("utf-8") + b"\0" + text.encode("utf-8"))
+    return digest.hexdigest()
+
+class VectorIndex:
+    """Exact cosine-similarity index over a dense float32 matrix
+
+    Vectors are L2-normalized, so one matrix-vector product scores every
+    document and argpartition picks the top k without a full sort. The
+    matrix is stored column-major: hashed query vectors have only a handful
+    of non-zero dimensions, and scoring just those contiguous columns is an
+    order of magnitude cheaper than the full product.
+    """
+
+    def __init__(self, embedder, ids=(), vectors=None, fingerprint=None):
+        self.embedder = embedder
+        self.ids = list(ids)
+        vectors = vectors if vectors is not None else np.zeros((0, 0), dtype=np.float32)
+        self.vectors = np.asfortranarray(vectors, dtype=np.float32)
+        self.fingerprint = fingerprint
+
+    @classmethod
+    def build(cls, embedder, ids, texts):
+        ids, texts = list(ids), list(texts)
+        return cls(embedder, ids, embedder.embed(texts), fingerprint(embedder, ids, texts))
+
+    def __len__(self):
+        return len(self.ids)
+
+    def search(self, query, k=10):
+        """[(id, similarity)] of the k documents closest to the query text, best first"""
+        if not self.ids or not query.strip():
+            return []
+        return self.search_vector(self.embedder.embed([query])[0], k)
+
+    def search_vector(self, vector, k=10):
+        nonzero = np.flatnonzero(vector)
+        if len(nonzero) * 4 <= len(vector):
+            scores = self.vectors[:, nonzero] @ vector[nonzero]
+        else:
+            scores = self.vectors @ vector
+        k = min(k, len(scores))
+        top = np.argpartition(-scores, k - 1)[:k]
+        top = top[np.argsort(-scores[top])]
+        return [(self.ids[i], float(scores[i])) for i in top]
+
+    def save(self, path):
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        # Write then rename so a concurrent reader never sees a partial file
+        tmp_path = f"{path}.tmp.npz"
+        np.savez(tmp_path, ids=np.array(self.ids, dtype=str), vectors=self.vectors,
+                 embedder=self.embedder.name, fingerprint=self.fingerprint or "")
+        os.replace(tmp_path, path)
+
+    @classmethod
+    def load(cls, path, embedder):
+        """Load a saved index, or None if it is missing or was built by another embedder"""
+        if not os.path.exists(path):
+            return None
+        with np.load(path) as data:
+            if str(data["embedder"]) != embedder.name:
+                return None
+            return cls(embedder, data["ids"].tolist(), data["vectors"], str(data["fingerprint"]))
+
+    @classmethod
+    def load_or_build(cls, path, embedder, ids, texts):
+        """Reuse the index saved at path when it matches this corpus, else rebuild and save it"""
+        ids, texts = list(ids), list(texts)
+        index = cls.load(path, embedder)
+        if index is not None and index.fingerprint == fingerprint(embedder, ids, texts):
+            return index
+        index = cls.build(embedder, ids, texts)
+        index.save(path)
+        return index
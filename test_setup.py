@@ -1,40 +1,30 @@
 """
 Quick test script to verify the setup before running the full app
 """
+import importlib.util
 import os
 import sys
 
 def test_imports():
-    """Test if all required packages can be imported"""
-    print("Testing imports...")
+    """Test if all required packages are installed
     
-    try:
-        import streamlit
-        print("✅ Streamlit imported successfully")
-    except ImportError as e:
-        print(f"❌ Streamlit import failed: {e}")
-        return False
+    Uses find_spec rather than importing, so the check doesn't pay the
+    multi-second cost of loading streamlit and langchain; the offline
+    pipeline test imports the agent stack for real.
+    """
+    print("Testing imports...")
     
-    try:
-        import openai
-        print("✅ OpenAI imported successfully")
-    except ImportError as e:
-        print(f"❌ OpenAI import failed: {e}")
-        return False
+    packages = [
+        ("streamlit", "Streamlit"),
+        ("openai", "OpenAI"),
+        ("langchain_openai", "LangChain"),
+    ]
     
-    try:
-        from langchain_openai import ChatOpenAI
-        print("✅ LangChain imported successfully")
-    except ImportError as e:
-        print(f"❌ LangChain import failed: {e}")
-        return False
-    
-    try:
-        from crewai import Agent, Task, Crew
-        print("✅ CrewAI imported successfully")
-    except ImportError as e:
-        print(f"❌ CrewAI import failed: {e}")
-        return False
+    for module, label in packages:
+        if importlib.util.find_spec(module) is None:
+            print(f"❌ {label} is not installed")
+            return False
+        print(f"✅ {label} found")
     
     return True
 
@@ -43,6 +33,9 @@ def test_api_key():
     print("\nTesting API key...")
     
     api_key = os.getenv("OPENAI_API_KEY")
+    if not api_key and os.getenv("SAASITIS_LLM_BACKEND", "openai").lower() in ("stub", "replay"):
+        print("✅ No key needed for the offline backend")
+        return True
     if not api_key:
         print("❌ OPENAI_API_KEY not found in environment")
         print("\n📝 To set your API key:")
@@ -80,6 +73,31 @@ def test_agent_files():
     
     return all_exist
 
+def test_offline_pipeline():
+    """Run the whole pipeline against the stub backend (no API key or network)"""
+    print("\nTesting offline pipeline...")
+    
+    try:
+        from agents.llm_backend import StubBackend, set_default_backend
+        from agents.registry import AgentRegistry
+        from agents.workflow import build_consultant_workflow, compile_request_text
+        
+        set_default_backend(StubBackend())
+        detailed_input = {"requirements": {"description": "Customer support automation", "use_case": ["Ticket triage"]}}
+        results = build_consultant_workflow(AgentRegistry("offline")).run(
+            {"request_text": compile_request_text(detailed_input), "detailed_input": detailed_input},
+            targets=["recommendation", "confidence"]
+        )
+    except ImportError as e:
+        print(f"❌ Agent dependencies failed to import: {e}")
+        return False
+    except Exception as e:
+        print(f"❌ Pipeline failed: {e!r}")
+        return False
+    
+    print(f"✅ Pipeline ran ({len(results['evaluations'])} vendors evaluated)")
+    return True
+
 def main():
     print("=" * 60)
     print("SaaSItIs MVP Setup Verification")
@@ -91,6 +109,7 @@ def main():
     results.append(("Imports", test_imports()))
     results.append(("API Key", test_api_key()))
     results.append(("Agent Files", test_agent_files()))
+    results.append(("Offline Pipeline", test_offline_pipeline()))
     
     # Summary
     print("\n" + "=" * 60)
@@ -0,0 +1,11 @@
+import pytest
+
+from agents.llm_backend import StubBackend, set_default_backend
+
+@pytest.fixture
+def stub_backend():
+    """Offline stub backend as the process default for one test"""
+    backend = StubBackend()
+    set_default_backend(backend)
+    yield backend
+    set_default_backend(None)
@@ -0,0 +1,27 @@
+from langchain_core.messages import HumanMessage
+from pydantic import BaseModel
+
+from agents.base_agent import BaseAgent
+from agents.instrumentation import Tracer
+from agents.llm_backend import StubBackend
+from agents.llm_cache import MemoryCache
+from agents.model_router import FAST
+
+MESSAGES = [HumanMessage(content="Score this vendor")]
+
+class Score(BaseModel):
+    score: int
+
+def cache_hits(tracer):
+    return [record for record in tracer.records() if record.get("cache") == "hit"]
+
+def test_unparseable_cached_output_is_not_a_cache_hit():
+    agent = BaseAgent(None, cache=MemoryCache(), tracer=Tracer(), backend=StubBackend())
+    key, _ = agent._lookup(MESSAGES, "score", FAST)
+    agent.cache.set(key, "not json")
+    assert agent._cached_structured(MESSAGES, Score, "score", FAST) == (key, None)
+    assert cache_hits(agent.tracer) == []
+
+    agent.cache.set(key, '{"score": 7}')
+    assert agent._cached_structured(MESSAGES, Score, "score", FAST) == (key, {"score": 7})
+    assert len(cache_hits(agent.tracer)) == 1
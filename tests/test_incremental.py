@@ -0,0 +1,22 @@
+from agents.incremental import backfill_fingerprints, changed_sections, check_artifacts, input_fingerprints
+
+VALUES = {"requirements": {"primary_use_case": "Support"}, "rfp": "# RFP", "vendors": {"top_matches": []}}
+
+def test_artifacts_without_fingerprints_are_kept():
+    assert check_artifacts(VALUES, {}) == ([], [])
+
+def test_backfilled_fingerprints_detect_later_edits():
+    recorded = backfill_fingerprints(VALUES, {})
+    edited = {**VALUES, "requirements": {"primary_use_case": "Sales"}}
+    assert check_artifacts(edited, recorded) == (["rfp", "vendors"], [])
+
+def test_raw_form_copy_is_not_a_change():
+    recorded = {"rfp": input_fingerprints("rfp", VALUES)}
+    resaved = {**VALUES, "requirements": {**VALUES["requirements"], "detailed_input": {"budget": "$1"}}}
+    assert check_artifacts(resaved, recorded) == ([], [])
+
+def test_budget_edit_only_touches_budget_section():
+    old = {"budget_timeline": {"budget_range": "< $10K"}, "requirements": {"description": "x"}}
+    new = {"budget_timeline": {"budget_range": "$500K+"}, "requirements": {"description": "x"}}
+    assert changed_sections(old, new) == ["budget_and_timeline"]
+    assert changed_sections(old, {**new, "requirements": {"description": "y"}}) is None
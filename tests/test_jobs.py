@@ -0,0 +1,63 @@
+import threading
+import time
+from concurrent.futures import wait
+
+from agents.jobs import CANCELLED, DONE, FAILED, JobQueue, wait_for_nodes
+from agents.workflow import Workflow
+
+def finish(queue, job_id):
+    wait([queue.get(job_id).future], timeout=5)
+    return queue.get(job_id)
+
+def test_job_reports_progress_and_result():
+    queue = JobQueue(max_workers=1)
+    seen = []
+
+    def work(job, n):
+        job.set_progress(0.5, "Halfway")
+        seen.append((job.progress, job.message))
+        return n * 2
+
+    job = finish(queue, queue.submit("double", work, 21))
+    assert (job.status, job.result, job.progress) == (DONE, 42, 1.0)
+    assert seen == [(0.5, "Halfway")]
+
+def test_failed_job_keeps_the_error():
+    queue = JobQueue(max_workers=1)
+    job = finish(queue, queue.submit("boom", lambda job: 1 / 0))
+    assert job.status == FAILED
+    assert "ZeroDivisionError" in job.error
+
+def test_cancel_stops_running_and_queued_jobs():
+    queue = JobQueue(max_workers=1)
+    started, release = threading.Event(), threading.Event()
+
+    def work(job):
+        started.set()
+        release.wait(5)
+        job.check_cancelled()
+        return "finished anyway"
+
+    running = queue.submit("running", work)
+    queued = queue.submit("queued", lambda job: "never runs")
+    started.wait(5)
+    assert queue.cancel(queued) and queue.cancel(running)
+    release.set()
+    assert finish(queue, running).status == CANCELLED
+    assert queue.get(queued).status == CANCELLED
+    assert queue.cancel(running) is False
+
+def test_wait_for_nodes_returns_results_and_honours_cancel():
+    queue = JobQueue(max_workers=1)
+    release = threading.Event()
+    workflow = Workflow().add("a", lambda x: x + 1, deps=("x",)).add("b", lambda a: release.wait(5) and a, deps=("a",))
+
+    job = finish(queue, queue.submit("nodes", lambda job: wait_for_nodes(job, workflow.start({"x": 1}), ["a"])))
+    assert job.result == {"a": 2}
+
+    blocked = queue.submit("blocked", lambda job: wait_for_nodes(job, workflow.start({"x": 1}), ["b"], 0.05))
+    while queue.get(blocked).message != "Waiting for b":
+        time.sleep(0.01)
+    queue.cancel(blocked)
+    assert finish(queue, blocked).status == CANCELLED
+    release.set()
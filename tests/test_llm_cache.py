@@ -0,0 +1,55 @@
+import itertools
+
+import pytest
+
+from agents import llm_cache
+from agents.instrumentation import Tracer
+from agents.llm_backend import StubBackend
+from agents.llm_cache import MemoryCache, SQLiteCache, TieredCache
+from agents.requirements_agent import RequirementsAgent
+
+@pytest.fixture
+def clock(monkeypatch):
+    """Strictly increasing time.time() so LRU order never ties"""
+    ticks = itertools.count(1_000_000)
+    monkeypatch.setattr(llm_cache.time, "time", lambda: float(next(ticks)))
+
+def test_sqlite_eviction_keeps_max_entries_most_recently_used(tmp_path, clock):
+    cache = SQLiteCache(str(tmp_path / "cache.sqlite"), max_entries=2)
+    cache.set("a", "1")
+    cache.set("b", "2")
+    assert cache.get("a") == "1"
+    cache.set("c", "3")
+    assert len(cache) == 2
+    assert cache.get("b") is None
+    assert (cache.get("a"), cache.get("c")) == ("1", "3")
+
+def test_memory_cache_evicts_least_recently_used():
+    cache = MemoryCache(max_entries=2)
+    cache.set("a", "1")
+    cache.set("b", "2")
+    cache.get("a")
+    cache.set("c", "3")
+    assert cache.get("b") is None
+    assert len(cache) == 2
+
+def test_entries_expire_after_ttl(tmp_path, clock):
+    # Every clock read advances one second, past the half-second TTL
+    for cache in (MemoryCache(ttl=0.5), SQLiteCache(str(tmp_path / "cache.sqlite"), ttl=0.5)):
+        cache.set("a", "1")
+        assert cache.get("a") is None
+
+def test_tiered_cache_promotes_disk_hits_to_memory(tmp_path):
+    memory, disk = MemoryCache(), SQLiteCache(str(tmp_path / "cache.sqlite"))
+    disk.set("key", "value")
+    cache = TieredCache([memory, disk])
+    assert cache.get("key") == "value"
+    assert memory.get("key") == "value"
+    assert cache.stats()["hits"] == 1
+
+def test_repeated_agent_call_is_served_from_cache():
+    tracer = Tracer()
+    agent = RequirementsAgent(None, cache=MemoryCache(), tracer=tracer, backend=StubBackend())
+    first = agent.gather_requirements("We need a CRM for 50 sales reps")
+    assert agent.gather_requirements("We need a CRM for 50 sales reps") == first
+    assert [record.get("cache") for record in tracer.records()].count("hit") == 1
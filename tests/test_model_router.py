@@ -0,0 +1,15 @@
+import pytest
+
+from agents.model_router import FAST, LARGE, build_router_from_env
+
+def test_wildcard_route_sets_every_step(monkeypatch):
+    monkeypatch.setenv("SAASITIS_MODEL_ROUTES", "*=large,generate_rfp=fast")
+    router = build_router_from_env()
+    assert router.tier("match_vendors") == LARGE
+    assert router.tier("generate_rfp") == FAST
+
+@pytest.mark.parametrize("routes", ["*=larg", "match_vendors=huge"])
+def test_unknown_tier_fails_at_startup(monkeypatch, routes):
+    monkeypatch.setenv("SAASITIS_MODEL_ROUTES", routes)
+    with pytest.raises(ValueError, match="unknown tier"):
+        build_router_from_env()
@@ -0,0 +1,50 @@
+import pytest
+from langchain_core.language_models.fake_chat_models import FakeListChatModel
+from langchain_core.prompts import ChatPromptTemplate
+from pydantic import BaseModel
+
+from agents.base_agent import BaseAgent
+from agents.instrumentation import Tracer
+from agents.llm_cache import NullCache
+from agents.model_router import ModelRouter
+from agents.output_parsing import OutputParseError, extract_json, parse_structured
+from agents.rate_limit import ProviderGuard
+
+class Score(BaseModel):
+    vendor: str
+    score: int
+
+class ScriptedBackend:
+    """Backend whose model returns the given responses in order"""
+    use_cache = False
+
+    def __init__(self, responses):
+        self.model = FakeListChatModel(responses=responses)
+
+    def chat_model(self, model, temperature, api_key):
+        return self.model
+
+@pytest.mark.parametrize("text", [
+    '```json\n{"vendor": "Acme", "score": 4}\n```',
+    'Here is the evaluation: {"vendor": "Acme", "score": 4} Let me know if you need more.',
+])
+def test_json_is_recovered_from_wrapped_output(text):
+    assert parse_structured(text, Score) == {"vendor": "Acme", "score": 4}
+
+def test_braces_inside_strings_do_not_end_the_object():
+    assert extract_json('Result: {"vendor": "Acme } Corp", "score": 4}.') == {"vendor": "Acme } Corp", "score": 4}
+
+def test_schema_mismatch_and_missing_json_raise_with_raw_output():
+    with pytest.raises(OutputParseError) as error:
+        parse_structured('{"vendor": "Acme", "score": "high"}', Score)
+    assert error.value.raw_output == '{"vendor": "Acme", "score": "high"}'
+    with pytest.raises(OutputParseError):
+        extract_json("no json here")
+
+def test_invalid_output_is_repaired_by_the_model():
+    backend = ScriptedBackend(["Sorry, I can't format that.", '{"vendor": "Acme", "score": 4}'])
+    agent = BaseAgent(None, cache=NullCache(), tracer=Tracer(), router=ModelRouter(cascade=False),
+                      guard=ProviderGuard(rpm=0, tpm=0), backend=backend)
+    prompt = ChatPromptTemplate.from_template("Score {vendor}")
+    assert agent._invoke_structured(prompt, {"vendor": "Acme"}, Score, "score") == {"vendor": "Acme", "score": 4}
+    assert [record.get("repair_attempt") for record in agent.tracer.records()] == [None, 1]
@@ -0,0 +1,15 @@
+import json
+
+from agents.prompt_compaction import compact_payloads
+
+REQUIREMENTS = {"organization": {"country": "Germany"}, "success_criteria": [f"criterion {i}" for i in range(20)]}
+VENDORS = {"top_matches": [{"name": "Acme", "country": "US", "city": "Austin"}]}
+
+def test_vendor_only_keys_are_kept_in_requirements():
+    inputs, _ = compact_payloads("create_poc_rubric", {"requirements": REQUIREMENTS, "vendors": VENDORS})
+    assert json.loads(inputs["requirements"])["organization"] == {"country": "Germany"}
+    assert json.loads(inputs["vendors"]) == {"top_matches": [{"name": "Acme"}]}
+
+def test_payloads_are_not_clipped_by_default():
+    inputs, _ = compact_payloads("create_poc_rubric", {"requirements": REQUIREMENTS})
+    assert len(json.loads(inputs["requirements"])["success_criteria"]) == 20
@@ -0,0 +1,110 @@
+import asyncio
+import threading
+import time
+
+import pytest
+
+from agents.rate_limit import CircuitBreaker, CircuitOpenError, ProviderGuard, TokenBucket
+
+class ProviderError(Exception):
+    """Stands in for an HTTP error from the provider"""
+
+    def __init__(self, status_code):
+        super().__init__(f"HTTP {status_code}")
+        self.status_code = status_code
+
+def test_token_bucket_makes_callers_wait_once_empty():
+    bucket = TokenBucket(per_minute=60)
+    assert bucket.reserve(60) == 0.0
+    assert bucket.reserve(1) == pytest.approx(1.0, abs=0.05)
+    assert TokenBucket(per_minute=0).reserve(10**6) == 0.0
+
+def test_breaker_opens_after_threshold_and_lets_one_trial_through():
+    breaker = CircuitBreaker(failure_threshold=3, reset_timeout=0.05)
+    for _ in range(3):
+        breaker.before_call("model")
+        breaker.record_failure()
+    assert breaker.state == "open"
+    with pytest.raises(CircuitOpenError):
+        breaker.before_call("model")
+    time.sleep(0.06)
+    breaker.before_call("model")
+    with pytest.raises(CircuitOpenError):
+        breaker.before_call("model")
+    breaker.record_success()
+    assert breaker.state == "closed"
+
+def test_guard_retries_transient_errors_then_short_circuits():
+    guard = ProviderGuard(rpm=0, tpm=0, max_retries=1, base_delay=0, failure_threshold=2, reset_timeout=60)
+    calls = []
+
+    def flaky():
+        calls.append(1)
+        raise ProviderError(503)
+
+    with pytest.raises(ProviderError):
+        guard.call("model", flaky)
+    assert len(calls) == 2
+    with pytest.raises(CircuitOpenError):
+        guard.call("model", flaky)
+    assert len(calls) == 2
+    assert guard.stats()["circuits"] == {"model": "open"}
+
+def test_client_errors_are_not_retried():
+    guard = ProviderGuard(rpm=0, tpm=0, base_delay=0)
+    calls = []
+
+    def bad_request():
+        calls.append(1)
+        raise ProviderError(400)
+
+    with pytest.raises(ProviderError):
+        guard.call("model", bad_request)
+    assert len(calls) == 1
+
+def test_identical_concurrent_calls_hit_the_provider_once():
+    guard = ProviderGuard(rpm=0, tpm=0)
+    release = threading.Event()
+    calls = []
+
+    def request():
+        calls.append(1)
+        release.wait(5)
+        return "answer"
+
+    results = []
+    threads = [threading.Thread(target=lambda: results.append(guard.call("model", request, key="same")))
+               for _ in range(3)]
+    threads[0].start()
+    while not calls:
+        time.sleep(0.01)
+    for thread in threads[1:]:
+        thread.start()
+    while guard.stats()["coalesced"] < 2:
+        time.sleep(0.01)
+    release.set()
+    for thread in threads:
+        thread.join(5)
+    assert len(calls) == 1
+    assert sorted(results) == [("answer", False), ("answer", True), ("answer", True)]
+
+def test_cancelled_leader_hands_the_call_to_a_follower():
+    guard = ProviderGuard(rpm=0, tpm=0)
+    calls = []
+
+    async def request():
+        calls.append(len(calls))
+        if len(calls) == 1:
+            await asyncio.sleep(60)
+        return "answer"
+
+    async def scenario():
+        leader = asyncio.create_task(guard.acall("model", request, key="same"))
+        await asyncio.sleep(0)
+        follower = asyncio.create_task(guard.acall("model", request, key="same"))
+        await asyncio.sleep(0)
+        leader.cancel()
+        return await asyncio.wait_for(follower, timeout=5)
+
+    assert asyncio.run(scenario()) == ("answer", False)
+    assert len(calls) == 2
@@ -0,0 +1,52 @@
+from agents.llm_backend import StubBackend
+from agents.recommendation_agent import RecommendationAgent
+from agents.rubric_scoring import rank_vendors, score_evaluations
+
+# "Security" is scored under two categories with different thresholds
+RUBRIC = {
+    "categories": [
+        {"name": "Integration", "weight": 50, "criteria": [
+            {"name": "Security", "threshold": 3}, {"name": "APIs", "threshold": 3}
+        ]},
+        {"name": "Compliance", "weight": 50, "criteria": [{"name": "Security", "threshold": 4}]}
+    ]
+}
+
+def test_duplicate_criterion_names_are_scored_per_category():
+    evaluations = {
+        "Acme": {"criterion_scores": [
+            {"criterion": "Security", "category": "Integration", "score": 5},
+            {"criterion": "APIs", "category": "Integration", "score": 3},
+            {"criterion": "Security", "category": "Compliance", "score": 3}
+        ]}
+    }
+    scores = score_evaluations(RUBRIC, evaluations)["Acme"]
+    assert scores["category_scores"] == {"Integration": 4.0, "Compliance": 3.0}
+    assert scores["weighted_total"] == 3.5
+    assert scores["threshold_failures"] == ["Compliance / Security"]
+
+def test_duplicate_criterion_names_without_categories_follow_rubric_order():
+    evaluations = {
+        "Acme": {"criterion_scores": [
+            {"criterion": "Security", "score": 4}, {"criterion": "APIs", "score": 4}, {"criterion": "Security", "score": 5}
+        ]},
+        "Globex": {"criterion_scores": [
+            {"criterion": "Security", "score": 4}, {"criterion": "APIs", "score": 2}, {"criterion": "Security", "score": 4}
+        ]}
+    }
+    ranking = rank_vendors(RUBRIC, evaluations)
+    assert [row["vendor"] for row in ranking] == ["Acme", "Globex"]
+    assert ranking[0]["meets_thresholds"]
+    assert ranking[1]["threshold_failures"] == ["APIs"]
+
+def test_confidence_counts_repeated_criterion_names_per_category():
+    evaluations = {
+        "Acme": {"criterion_scores": [
+            {"criterion": "Security", "category": "Integration", "score": 5},
+            {"criterion": "APIs", "category": "Integration", "score": 3}
+        ]}
+    }
+    agent = RecommendationAgent(None, backend=StubBackend())
+    factors = agent.calculate_confidence_score(evaluations, RUBRIC)["contributing_factors"]
+    # Compliance / Security was never scored
+    assert factors["evaluation_completeness"] == 66.7
@@ -0,0 +1,21 @@
+from agents.registry import AgentRegistry
+from agents.run import run_request
+from agents.run_store import SQLiteRunStore
+
+DETAILED_INPUT = {"requirements": {"description": "Customer support automation"}}
+
+def test_unparsed_step_is_partial_and_not_checkpointed(tmp_path, stub_backend):
+    agents = AgentRegistry("offline")
+    agents['vendor_matching'].match_vendors = lambda requirements: {"vendor_analysis": "?", "parse_error": "bad"}
+    store = SQLiteRunStore(str(tmp_path / "runs.sqlite"))
+
+    record = run_request(agents, store, "1", DETAILED_INPUT)
+    assert record["status"] == "partial"
+    assert sorted(store.load(record["run_id"])) == ["requirements"]
+
+def test_complete_run_is_ok_and_checkpointed(tmp_path, stub_backend):
+    store = SQLiteRunStore(str(tmp_path / "runs.sqlite"))
+
+    record = run_request(AgentRegistry("offline"), store, "1", DETAILED_INPUT)
+    assert record["status"] == "ok"
+    assert {"requirements", "vendor_matches", "rubric", "evaluations"} <= set(store.load(record["run_id"]))
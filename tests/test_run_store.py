@@ -0,0 +1,38 @@
+import pytest
+
+from agents.registry import AgentRegistry
+from agents.run_store import MemoryRunStore, SQLiteRunStore
+from agents.workflow import build_consultant_workflow, compile_request_text
+
+@pytest.fixture(params=["memory", "sqlite"])
+def store(request, tmp_path):
+    return MemoryRunStore() if request.param == "memory" else SQLiteRunStore(str(tmp_path / "runs.sqlite"))
+
+def test_saved_checkpoints_load_back(store):
+    run_id = store.create_run(title="CRM")
+    store.save_many(run_id, {"step": 2, "requirements": {"primary_use_case": "Sales"}})
+    store.save(run_id, "step", 3)
+    assert store.load(run_id) == {"step": 3, "requirements": {"primary_use_case": "Sales"}}
+    assert store.load("unknown") is None
+
+def test_list_runs_only_returns_the_given_runs(store):
+    mine, other = store.create_run(title="Mine"), store.create_run(title="Other")
+    assert [run["title"] for run in store.list_runs(run_ids=[mine])] == ["Mine"]
+    assert store.list_runs(run_ids=[]) == []
+    assert {run["run_id"] for run in store.list_runs()} == {mine, other}
+
+def test_resumed_run_skips_checkpointed_steps(store, stub_backend):
+    agents = AgentRegistry("offline")
+    detailed_input = {"requirements": {"description": "Customer support automation"}}
+    values = {"request_text": compile_request_text(detailed_input), "detailed_input": detailed_input}
+    run_id = store.create_run(title="Support")
+    first = build_consultant_workflow(agents).run(values, targets=["vendor_matches"])
+    store.save_many(run_id, {name: first[name] for name in ("requirements", "vendor_matches")})
+
+    def not_again(*args):
+        raise AssertionError("checkpointed step was recomputed")
+
+    agents['requirements'].gather_requirements = agents['vendor_matching'].match_vendors = not_again
+    resumed = build_consultant_workflow(agents).run({**values, **store.load(run_id)}, targets=["rubric"])
+    assert resumed["vendor_matches"] == first["vendor_matches"]
+    assert resumed["rubric"]
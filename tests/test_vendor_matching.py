@@ -0,0 +1,16 @@
+import pandas as pd
+
+from agents.llm_backend import StubBackend
+from agents.vendor_matching_agent import VendorMatchingAgent
+
+REQUIREMENTS = {"primary_use_case": "Support"}
+
+def test_missing_scores_in_dataframe_default_to_70():
+    agent = VendorMatchingAgent(None, catalog=[], backend=StubBackend())
+    vendors = [
+        {"name": "Gap", "adoption_score": None, "enterprise_fit": None},
+        {"name": "Default", "adoption_score": 70, "enterprise_fit": 70},
+    ]
+    predictions = agent.predict_adoption_success_batch(pd.DataFrame(vendors), REQUIREMENTS)
+    assert predictions[0]["adoption_probability"] == predictions[1]["adoption_probability"]
+    assert predictions[0]["adoption_probability"] == agent.predict_adoption_success(vendors[1], REQUIREMENTS)["adoption_probability"]
@@ -0,0 +1,68 @@
+import threading
+
+import pytest
+
+from agents.workflow import Workflow, WorkflowError, build_consultant_workflow, compile_request_text
+
+def test_nodes_run_after_their_dependencies():
+    order = []
+
+    def step(name):
+        def run(**deps):
+            order.append(name)
+            return name + "(" + ",".join(str(deps[dep]) for dep in sorted(deps)) + ")"
+        return run
+
+    workflow = (
+        Workflow()
+        .add("b", step("b"), deps=("a",))
+        .add("c", step("c"), deps=("a",))
+        .add("d", step("d"), deps=("b", "c"))
+        .add("a", step("a"), deps=("x",))
+    )
+    results = workflow.run({"x": 1}, targets=["d"])
+    assert results["d"] == "d(b(a(1)),c(a(1)))"
+    assert order[0] == "a" and order[-1] == "d"
+
+def test_failing_node_surfaces_its_error_and_skips_dependents():
+    def fail(a):
+        raise RuntimeError("provider down")
+
+    run = Workflow().add("a", lambda x: x, deps=("x",)).add("b", fail, deps=("a",)).add("c", lambda b: b, deps=("b",)).start(
+        {"x": 1}
+    )
+    with pytest.raises(RuntimeError, match="provider down"):
+        run.wait(timeout=5)
+    assert isinstance(run.futures["c"].exception(), WorkflowError)
+    assert run.status() == {"a": "done", "b": "failed", "c": "failed"}
+    assert run.results()["a"] == 1
+
+def test_background_node_does_not_block_wait():
+    release = threading.Event()
+    workflow = (
+        Workflow()
+        .add("fast", lambda x: x, deps=("x",))
+        .add("slow", lambda fast: release.wait(5), deps=("fast",), background=True)
+    )
+    run = workflow.start({"x": 1})
+    run.wait(timeout=5)
+    assert not run.done("slow")
+    release.set()
+    run.wait(timeout=5, include_background=True)
+    assert run.result("slow") is True
+
+def test_seeded_results_are_not_recomputed():
+    calls = []
+    workflow = Workflow().add("a", lambda x: calls.append("a") or "fresh", deps=("x",)).add("b", lambda a: a, deps=("a",))
+    assert workflow.run({"x": 1, "a": "seeded"})["b"] == "seeded"
+    assert calls == []
+
+def test_consultant_pipeline_runs_offline(stub_backend):
+    from agents.registry import AgentRegistry
+
+    detailed_input = {"requirements": {"description": "Customer support automation"}}
+    results = build_consultant_workflow(AgentRegistry("offline")).run(
+        {"request_text": compile_request_text(detailed_input), "detailed_input": detailed_input},
+        targets=["recommendation", "confidence"]
+    )
+    assert results["evaluations"] and "confidence_score" in results["confidence"]